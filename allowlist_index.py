@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Compact Allowlist Index for SiteOptz.ai
+Stores the sitemap allowlist as an interned, path-only sorted array with bisect
+lookups and an optional Bloom-filter prefilter. The index serializes to a
+memory-mappable file so every pipeline stage can share it without re-parsing
+siteoptz_allowlist.txt.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left
+from urllib.parse import urlparse
+
+MAGIC = b'SOALLOW1'
+# magic, count, blob length, bloom bits, bloom hashes, reserved
+HEADER = struct.Struct('<8sQQQII')
+
+
+def url_to_key(url):
+    """Reduce a URL (or bare path) to the lowercase path-only lookup key"""
+    url = url.strip().lower()
+    if '://' in url:
+        parsed = urlparse(url)
+        key = parsed.path or '/'
+        if parsed.query:
+            key += '?' + parsed.query
+        return key
+    return url or '/'
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a blake2b digest"""
+
+    def __init__(self, num_bits, num_hashes, bits=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        num_bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class _MappedPaths:
+    """Read-only sequence of encoded paths backed by a memory-mapped blob"""
+
+    def __init__(self, buffer, offsets_start, count, blob_start):
+        self._buffer = buffer
+        self._offsets = buffer[offsets_start:offsets_start + 8 * (count + 1)].cast('Q')
+        self._blob_start = blob_start
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        start = self._blob_start + self._offsets[i]
+        end = self._blob_start + self._offsets[i + 1]
+        return bytes(self._buffer[start:end])
+
+
+class AllowlistIndex:
+    """Sorted path-only allowlist supporting `url in index` and `path in index`"""
+
+    def __init__(self, paths, bloom=None, mapped=False):
+        self._paths = paths
+        self._bloom = bloom
+        self._mapped = mapped
+        self._mmap = None
+
+    @classmethod
+    def from_urls(cls, urls, with_bloom=True, error_rate=0.01):
+        """Build an index from full URLs or paths"""
+        paths = sorted(set(sys.intern(url_to_key(u)) for u in urls if u.strip()))
+        bloom = None
+        if with_bloom:
+            bloom = BloomFilter.for_capacity(len(paths), error_rate)
+            for path in paths:
+                bloom.add(path.encode('utf-8'))
+        return cls(paths, bloom)
+
+    @classmethod
+    def from_text_file(cls, filename, with_bloom=True):
+        """Build an index from a one-URL-per-line allowlist file"""
+        with open(filename, 'r') as f:
+            return cls.from_urls(f, with_bloom=with_bloom)
+
+    @classmethod
+    def load(cls, filename):
+        """Memory-map a serialized index; no parsing is done up front"""
+        with open(filename, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(mm)
+        magic, count, blob_len, bloom_bits, bloom_hashes, _ = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not an allowlist index")
+
+        offsets_start = HEADER.size
+        blob_start = offsets_start + 8 * (count + 1)
+        bloom = None
+        if bloom_bits:
+            bloom_start = blob_start + blob_len
+            bloom = BloomFilter(bloom_bits, bloom_hashes,
+                                buffer[bloom_start:bloom_start + (bloom_bits + 7) // 8])
+
+        index = cls(_MappedPaths(buffer, offsets_start, count, blob_start), bloom, mapped=True)
+        index._mmap = mm
+        return index
+
+    def save(self, filename):
+        """Serialize to the memory-mappable on-disk format"""
+        encoded = [p if isinstance(p, bytes) else p.encode('utf-8') for p in self]
+        offsets = [0]
+        for path in encoded:
+            offsets.append(offsets[-1] + len(path))
+
+        bloom_bits = self._bloom.num_bits if self._bloom else 0
+        bloom_hashes = self._bloom.num_hashes if self._bloom else 0
+        tmp_name = filename + '.tmp'
+        with open(tmp_name, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(encoded), offsets[-1], bloom_bits, bloom_hashes, 0))
+            f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+            for path in encoded:
+                f.write(path)
+            if self._bloom:
+                f.write(bytes(self._bloom.bits))
+        os.replace(tmp_name, filename)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __iter__(self):
+        for i in range(len(self._paths)):
+            path = self._paths[i]
+            yield path.decode('utf-8') if self._mapped else path
+
+    def iter_prefix(self, prefix):
+        """Yield allowlisted paths starting with prefix, via bisect on the sorted array"""
+        paths = self._paths
+        probe = prefix.encode('utf-8') if self._mapped else prefix
+        for i in range(bisect_left(paths, probe), len(paths)):
+            path = paths[i]
+            if not path.startswith(probe):
+                break
+            yield path.decode('utf-8') if self._mapped else path
+
+    def __contains__(self, url):
+        key = url_to_key(url)
+        probe = key.encode('utf-8')
+        if self._bloom is not None and probe not in self._bloom:
+            return False
+        if self._mapped:
+            key = probe
+        paths = self._paths
+        i = bisect_left(paths, key)
+        return i < len(paths) and paths[i] == key
+
+
+def index_filename(text_filename):
+    return os.path.splitext(text_filename)[0] + '.idx'
+
+
+def load_or_build(filename, with_bloom=True):
+    """Open the .idx next to an allowlist text file, rebuilding it when stale"""
+    if filename.endswith('.idx'):
+        return AllowlistIndex.load(filename)
+
+    idx_file = index_filename(filename)
+    if os.path.exists(idx_file) and os.path.getmtime(idx_file) >= os.path.getmtime(filename):
+        return AllowlistIndex.load(idx_file)
+
+    index = AllowlistIndex.from_text_file(filename, with_bloom=with_bloom)
+    index.save(idx_file)
+    return index
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'siteoptz_allowlist.txt'
+    print("=" * 60)
+    print("Building Allowlist Index")
+    print("=" * 60)
+
+    index = AllowlistIndex.from_text_file(source)
+    idx_file = index_filename(source)
+    index.save(idx_file)
+
+    print(f"\n✓ Indexed {len(index)} paths from {source}")
+    print(f"✓ Saved {idx_file} ({os.path.getsize(idx_file) / 1024:.1f} KB)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Analyze Structured Data Errors for SiteOptz.ai
+Streams the structured_data_that_contains_markup_errors crawler export once,
+groups errors by URL template, schema type and field, joins each group with
+aiToolsData.json (through the catalogue search index) to see which tool
+records lack the data the markup needs, and writes a fix list ranked by how
+many error rows each single fix clears.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+from collections import OrderedDict, defaultdict
+from urllib.parse import urlparse
+
+from build_404_inventory import path_template_params
+from catalogue_index import DEFAULT_CATALOGUE, DEFAULT_INDEX, CatalogueIndex
+
+SAMPLE_SIZE = 5
+
+# Schema field -> catalogue fields that feed it (first non-empty value wins)
+FIELD_SOURCES = {
+    'aggregateRating or review': {
+        'rating': [('rating',), ('schema', 'aggregateRating', 'ratingValue')],
+        'review_count': [('review_count',), ('schema', 'aggregateRating', 'reviewCount')]
+    },
+    'offers': {
+        'pricing': [('pricing',), ('schema', 'offers')]
+    }
+}
+
+def latest_export(pattern='siteoptz.ai_structured_data_that_contains_markup_errors_*.csv'):
+    files = sorted(glob.glob(pattern))
+    return files[-1] if files else None
+
+def iter_error_rows(filename):
+    """Stream (page path, schema type, field, issue) from the crawler export"""
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            path = urlparse(row['Page URL'].strip().lower()).path.rstrip('/') or '/'
+            yield path, row['Structured data'], row['Field'], row['Issue description']
+
+def load_catalogue(filename, index_file=DEFAULT_INDEX):
+    """Open the catalogue index; catalogue.get(slug) finds a tool by any slug a page URL may use"""
+    return CatalogueIndex.open(filename, index_file)
+
+def _lookup(record, keys):
+    value = record
+    for key in keys:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+def missing_fields(tool, field):
+    """Catalogue fields feeding a schema field that this tool record lacks"""
+    return [name for name, sources in FIELD_SOURCES[field].items()
+            if not any(_lookup(tool, keys) for keys in sources)]
+
+def aggregate_errors(rows):
+    """Single pass: group rows by (template, schema type, field)"""
+    groups = OrderedDict()
+    for path, schema_type, field, issue in rows:
+        template, params = path_template_params(path)
+        key = (template, schema_type, field)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'template': template,
+                'schema_type': schema_type,
+                'field': field,
+                'issue': issue,
+                'rows': 0,
+                'slugs': defaultdict(int)
+            }
+        group['rows'] += 1
+        # The last placeholder of a template is the tool slug (/reviews/:slug1, /tools/:slug1)
+        slug = params[f'slug{len(params)}'] if params else path
+        group['slugs'][slug] += 1
+    return list(groups.values())
+
+def build_fix_list(groups, catalogue=None):
+    """Candidate fixes per group, ranked by the error rows each one clears"""
+    fixes = []
+    for group in groups:
+        label = f"{group['schema_type']} / {group['field']} on {group['template']}"
+        slugs = group['slugs']
+        if catalogue is None or group['field'] not in FIELD_SOURCES:
+            fixes.append({
+                'fix': 'template',
+                'action': f"Fix {group['field']} in the {group['schema_type']} markup of {group['template']}",
+                'group': label,
+                'issue': group['issue'],
+                'rows_cleared': group['rows'],
+                'pages': len(slugs),
+                'sample': sorted(slugs)[:SAMPLE_SIZE]
+            })
+            continue
+
+        # Join with the catalogue: data gaps per field, unknown slugs, complete records
+        unknown = {}
+        gaps = defaultdict(dict)
+        complete = {}
+        for slug, count in slugs.items():
+            tool = catalogue.get(slug)
+            if tool is None:
+                unknown[slug] = count
+                continue
+            missing = missing_fields(tool, group['field'])
+            if missing:
+                gaps[tuple(missing)][slug] = count
+            else:
+                complete[slug] = count
+
+        for missing, affected in gaps.items():
+            fixes.append({
+                'fix': 'data',
+                'action': f"Add {' and '.join(missing)} to {len(affected)} tool records in aiToolsData.json",
+                'group': label,
+                'issue': group['issue'],
+                'rows_cleared': sum(affected.values()),
+                'pages': len(affected),
+                'sample': sorted(affected)[:SAMPLE_SIZE]
+            })
+        if unknown:
+            fixes.append({
+                'fix': 'catalogue',
+                'action': f"Add {len(unknown)} missing tool records (pages render without catalogue data)",
+                'group': label,
+                'issue': group['issue'],
+                'rows_cleared': sum(unknown.values()),
+                'pages': len(unknown),
+                'sample': sorted(unknown)[:SAMPLE_SIZE]
+            })
+        if complete:
+            fixes.append({
+                'fix': 'template',
+                'action': f"Render {group['field']} from existing catalogue data on {group['template']}",
+                'group': label,
+                'issue': group['issue'],
+                'rows_cleared': sum(complete.values()),
+                'pages': len(complete),
+                'sample': sorted(complete)[:SAMPLE_SIZE]
+            })
+
+    fixes.sort(key=lambda f: f['rows_cleared'], reverse=True)
+    for rank, fix in enumerate(fixes, 1):
+        fix['rank'] = rank
+    return fixes
+
+def main():
+    parser = argparse.ArgumentParser(description='Group structured data errors and rank the fixes')
+    parser.add_argument('export', nargs='?', help='structured_data_that_contains_markup_errors CSV '
+                        '(default: latest in current directory)')
+    parser.add_argument('--catalogue', default=DEFAULT_CATALOGUE, help='aiToolsData.json to join against')
+    parser.add_argument('--output', default='structured_data_fixes.json')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Analyzing Structured Data Errors for SiteOptz.ai")
+    print("=" * 60)
+
+    export = args.export or latest_export()
+    if not export:
+        print("❌ No structured_data_that_contains_markup_errors export found")
+        return
+
+    catalogue = None
+    if os.path.exists(args.catalogue):
+        catalogue = load_catalogue(args.catalogue)
+        print(f"\nIndexed {len(catalogue)} tools from {args.catalogue}")
+    else:
+        print(f"\nWarning: {args.catalogue} not found, skipping the catalogue join")
+
+    print(f"Streaming {export}...")
+    groups = aggregate_errors(iter_error_rows(export))
+    fixes = build_fix_list(groups, catalogue)
+    total_rows = sum(g['rows'] for g in groups)
+
+    report = {
+        'export': os.path.basename(export),
+        'total_rows': total_rows,
+        'groups': [
+            {k: (len(v) if k == 'slugs' else v) for k, v in g.items()}
+            for g in sorted(groups, key=lambda g: g['rows'], reverse=True)
+        ],
+        'fixes': fixes
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    print(f"\nError rows: {total_rows}")
+    print(f"Template / schema / field groups: {len(groups)}")
+
+    print("\nRanked fixes:")
+    cleared = 0
+    for fix in fixes[:15]:
+        cleared += fix['rows_cleared']
+        print(f"{fix['rank']:2}. [{fix['fix']}] {fix['action']}")
+        print(f"    {fix['group']}: clears {fix['rows_cleared']} rows ({cleared / total_rows:.0%} cumulative)")
+
+    print(f"\n✓ Saved ranked fix list to {args.output}")
+
+if __name__ == '__main__':
+    main()
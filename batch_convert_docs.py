@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Batch Document Conversion for SiteOptz.ai
+Converts every markdown source matching the given globs into the requested
+formats. Each (source, format) pair is one job on a process pool, so pandoc
+runs and reportlab/python-docx writers proceed concurrently across cores.
+Unchanged outputs are skipped through doc_build_cache, and every job's wall
+time is reported. With the pandoc engine one `pandoc server` is started for the
+whole batch and every worker sends its jobs to it (see pandoc_backend), so no
+job pays pandoc's process start-up.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import convert_document
+import create_document_formats
+import markdown_events
+import pandoc_backend
+from doc_build_cache import BuildCache, build_key, file_digest
+
+FORMATS = ('html', 'pdf', 'docx', 'rtf')
+DEFAULT_OUTPUT_DIR = 'docs_build'
+
+# Per-worker pandoc client, set up by the pool initializer
+_backend = None
+
+
+def init_worker(server_port):
+    global _backend
+    if server_port:
+        _backend = pandoc_backend.PandocServer.attach(server_port)
+    else:
+        _backend = pandoc_backend.PandocCommand()
+
+
+def document_title(source):
+    """First '# ' heading of a markdown file, else its file name"""
+    with open(source, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('# '):
+                return line[2:].strip()
+    return os.path.splitext(os.path.basename(source))[0].replace('_', ' ')
+
+
+def _write(engine, fmt, source, output, ast_path, latex_path):
+    title = document_title(source)
+    if engine == 'pandoc' and fmt != 'html':
+        convert_document.run_pandoc(fmt, ast_path, output, _backend, latex_path)
+    elif engine == 'pandoc':
+        convert_document.create_html_version(source, output, title=title)
+    else:
+        if fmt == 'html':
+            with open(source, 'r', encoding='utf-8') as f:
+                create_document_formats.create_html(f.read(), output, title=title)
+        else:
+            create_document_formats.write_documents(source, {fmt: output}, title=title, info=())
+
+
+def run_job(engine, fmt, source, output, ast_path=None, latex_path=None):
+    """Worker: write one output via a temp file; returns (seconds, error or None)"""
+    start = time.perf_counter()
+    directory, name = os.path.split(output)
+    # Same extension as the output, since pandoc and reportlab infer the format from it
+    tmp_name = os.path.join(directory, f".{os.getpid()}-{name}")
+    messages = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(messages):
+            _write(engine, fmt, source, tmp_name, ast_path, latex_path)
+        if not os.path.exists(tmp_name):
+            failures = [line for line in messages.getvalue().splitlines() if '❌' in line]
+            return time.perf_counter() - start, failures[-1].strip('❌ ') if failures else 'no output written'
+        os.replace(tmp_name, output)
+        return time.perf_counter() - start, None
+    except Exception as e:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        return time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+def run_ast_job(source, ast_path):
+    start = time.perf_counter()
+    try:
+        convert_document.write_pandoc_ast(source, ast_path, _backend)
+        return time.perf_counter() - start, None
+    except Exception as e:
+        return time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+def expand_sources(patterns):
+    sources = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            if path.endswith('.md') and path not in sources:
+                sources.append(path)
+    return sources
+
+
+def plan_jobs(sources, formats, engine, output_dir, cache, pandoc_version):
+    """Stale (source, format) jobs grouped by source; fresh outputs are counted as cache hits"""
+    engine_modules = [convert_document, pandoc_backend] if engine == 'pandoc' else [create_document_formats, markdown_events]
+    tool_digest = ''.join(file_digest(module.__file__) for module in engine_modules)
+    plans = []
+    for source in sources:
+        digest = file_digest(source)
+        base = os.path.join(output_dir, os.path.splitext(os.path.basename(source))[0])
+        jobs = []
+        for fmt in formats:
+            output = f"{base}.{fmt}"
+            options = [tool_digest, pandoc_version] if engine == 'pandoc' else [tool_digest]
+            if engine == 'pandoc' and fmt != 'html':
+                options += convert_document.PANDOC_READER + convert_document.PANDOC_OPTIONS[fmt]
+            key = build_key(digest, f'batch-{engine}-{fmt}', options)
+            if cache.fresh(output, key):
+                cache.hits += 1
+            else:
+                jobs.append((fmt, output, key))
+        if jobs:
+            ast_path = latex_path = None
+            if engine == 'pandoc' and any(fmt != 'html' for fmt, _, _ in jobs):
+                ast_path = cache.object_path(convert_document.pandoc_ast_key(digest, pandoc_version), '.json')
+            if engine == 'pandoc' and any(fmt == 'pdf' for fmt, _, _ in jobs):
+                latex_path = cache.object_path(convert_document.pandoc_latex_key(digest, pandoc_version), '.tex')
+            plans.append({'source': source, 'jobs': jobs, 'ast_path': ast_path, 'latex_path': latex_path})
+    return plans
+
+
+def run_batch(plans, engine, cache, workers, server_port=None):
+    """Schedule every job; a source's pandoc jobs start once its JSON AST exists"""
+    timings = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(server_port,)) as pool:
+        pending = {}
+
+        def submit_outputs(plan, formats):
+            for fmt, output, key in plan['jobs']:
+                if fmt in formats:
+                    future = pool.submit(run_job, engine, fmt, plan['source'], output,
+                                         plan['ast_path'], plan['latex_path'])
+                    pending[future] = ('output', plan, fmt, output, key)
+
+        for plan in plans:
+            needs_ast = plan['ast_path'] and not os.path.exists(plan['ast_path'])
+            if needs_ast:
+                pending[pool.submit(run_ast_job, plan['source'], plan['ast_path'])] = ('ast', plan, 'ast', None, None)
+                submit_outputs(plan, {'html'})
+            else:
+                submit_outputs(plan, FORMATS)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, plan, fmt, output, key = pending.pop(future)
+                seconds, error = future.result()
+                timings.append({'source': plan['source'], 'format': fmt, 'seconds': seconds, 'error': error})
+                if kind == 'ast':
+                    if error is None:
+                        submit_outputs(plan, set(FORMATS) - {'html'})
+                    continue
+                if error is None:
+                    cache.record(output, key)
+                    cache.misses += 1
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert many markdown documents in parallel')
+    parser.add_argument('patterns', nargs='*', default=['*.md'], help='Markdown globs (default: *.md)')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='Comma-separated subset of html,pdf,docx,rtf')
+    parser.add_argument('--engine', choices=['auto', 'pandoc', 'python'], default='auto',
+                        help='pandoc, or the python-docx/reportlab writers (auto: pandoc when installed)')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--force', action='store_true', help='Rebuild every output even if it is up to date')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Batch Converting Documents")
+    print("=" * 60)
+
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        print(f"❌ Unknown formats: {', '.join(unknown)}")
+        return
+
+    version = convert_document.pandoc_version()
+    engine = args.engine
+    if engine == 'auto':
+        engine = 'pandoc' if version else 'python'
+    elif engine == 'pandoc' and not version:
+        print("❌ Pandoc not found. Please install pandoc: https://pandoc.org/installing.html")
+        return
+
+    sources = expand_sources(args.patterns)
+    if not sources:
+        print(f"❌ No markdown sources match {' '.join(args.patterns)}")
+        return
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    cache = BuildCache(force=args.force)
+    plans = plan_jobs(sources, formats, engine, args.output_dir, cache, version)
+    job_count = sum(len(plan['jobs']) for plan in plans)
+    print(f"\n{len(sources)} sources × {len(formats)} formats with the {engine} engine: "
+          f"{job_count} jobs, {cache.hits} outputs up to date")
+
+    backend = None
+    if engine == 'pandoc' and job_count:
+        backend = pandoc_backend.open_backend()
+        mode = f"server on port {backend.port}" if backend.warm else "one process per job (server unavailable)"
+        print(f"Pandoc: {mode}")
+
+    start = time.perf_counter()
+    try:
+        timings = run_batch(plans, engine, cache, args.workers, backend and backend.port) if job_count else []
+    finally:
+        if backend is not None:
+            backend.close()
+    elapsed = time.perf_counter() - start
+    cache.save()
+
+    failed = [t for t in timings if t['error']]
+    busy = sum(t['seconds'] for t in timings)
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    print(f"\nBuilt {cache.misses} outputs in {elapsed:.2f}s on {args.workers} workers "
+          f"({busy:.2f}s of job time, {busy / elapsed if elapsed else 0:.1f}x parallel)")
+    print(f"Up to date: {cache.hits}  •  Failed: {len(failed)}")
+
+    if timings:
+        print("\nSlowest jobs:")
+        for t in sorted(timings, key=lambda t: t['seconds'], reverse=True)[:10]:
+            marker = '❌' if t['error'] else '✓'
+            print(f"  {marker} {t['seconds']:7.3f}s  {t['format']:<5} {t['source']}")
+    for t in failed[:10]:
+        print(f"\n❌ {t['source']} [{t['format']}]: {t['error']}")
+
+    print(f"\n✓ Outputs in {args.output_dir}/")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for the SiteOptz.ai Python Tooling
+Generates synthetic crawl exports, sitemaps and tool catalogues at configurable
+scales and times the 404 -> redirect pipeline, the category analyzers, the
+catalogue index and the related-tools matrix.
+Runs fully offline; results are stored as JSON so commits can be compared.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public', 'data'))
+
+import build_404_inventory
+import build_related_tools
+import catalogue_index
+import create_redirect_map
+import generate_platform_config
+import redirect_scoring
+import analyze_productivity_tools
+import final_analysis
+
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+
+# Vocabulary modelled on the real crawler exports and catalogue
+CATEGORY_PARAMS = [
+    'finance ai', 'lead generation', 'ux', 'image generation', 'ai automation',
+    'paid search & ppc', 'video generation', 'e-commerce', 'email marketing',
+    'productivity', 'seo & optimization', 'code generation', 'content creation',
+    'best voice ai tools', 'research & education', 'social media', 'writing'
+]
+
+CALCULATORS = [
+    'ai-roi-calculator', 'content-roi-calculator', 'chatbot-roi-calculator',
+    'data-science-roi', 'fintech-ai-roi', 'healthcare-ai-roi', 'sales-ai-roi'
+]
+
+SLUG_WORDS = [
+    'ai', 'voice', 'writer', 'studio', 'labs', 'flow', 'bot', 'gen', 'copy',
+    'vision', 'data', 'sense', 'pilot', 'mind', 'cloud', 'chat', 'pixel', 'code'
+]
+
+CATALOGUE_CATEGORIES = [
+    'Productivity', 'Content Creation', 'Code Generation', 'Video Generation',
+    'Image Generation', 'AI Automation', 'Data Analysis', 'Voice AI'
+]
+
+DESCRIPTION_PHRASES = [
+    'meeting notes and calendar scheduling', 'video editing for creators',
+    'speech to text transcription', 'code assistant for developers',
+    'email marketing campaigns', 'lead generation and prospect lists',
+    'seo keyword research', 'social media posting', 'workflow automation',
+    'data visualization dashboard', 'copywriting and blog writing',
+    'project management for teams', 'financial planning and budget tracking',
+    'ux design prototypes in figma', 'online store product catalog'
+]
+
+
+def make_slug(rng):
+    return '-'.join(rng.choice(SLUG_WORDS) for _ in range(rng.randint(1, 3))) + str(rng.randint(0, 999))
+
+
+def make_broken_path(rng):
+    """Pick a broken path following the real distribution of 404 templates"""
+    roll = rng.random()
+    if roll < 0.30:
+        return f"/tools?category={rng.choice(CATEGORY_PARAMS)}"
+    if roll < 0.55:
+        return f"/reviews/{make_slug(rng)}"
+    if roll < 0.75:
+        return f"/compare/{make_slug(rng)}/vs/{make_slug(rng)}"
+    if roll < 0.82:
+        return f"/tools/{rng.choice(CALCULATORS)}"
+    if roll < 0.88:
+        return f"/case-studies/{make_slug(rng)}"
+    if roll < 0.94:
+        return f"/resources/{make_slug(rng)}"
+    if roll < 0.97:
+        return f"/reports/{make_slug(rng)}"
+    return f"/{make_slug(rng)}"
+
+
+# Synthetic data generators
+def generate_broken_links_csv(filename, rows, rng):
+    """Write a crawler broken-links export with the real column layout"""
+    start = datetime(2025, 8, 1)
+    referrers = [f"https://siteoptz.ai/reviews/{make_slug(rng)}" for _ in range(max(10, rows // 50))]
+    # Reuse a pool of broken targets so inventory aggregation has work to do
+    targets = [make_broken_path(rng) for _ in range(max(10, rows // 8))]
+
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Page URL', 'Broken Link URL', 'HTTP Code', 'Discovered'])
+        for _ in range(rows):
+            discovered = start + timedelta(days=rng.randint(0, 40), minutes=rng.randint(0, 1440))
+            writer.writerow([
+                rng.choice(referrers),
+                f"https://siteoptz.ai{rng.choice(targets)}",
+                '404' if rng.random() < 0.95 else rng.choice(['410', '500']),
+                discovered.strftime('%d %b %Y (%H:%M UTC)')
+            ])
+
+
+def generate_sitemap(filename, rows, rng):
+    """Write a sitemap with the same <url> layout as public/sitemap-tools.xml"""
+    pages = ['/', '/tools', '/reviews', '/compare', '/case-studies', '/resources']
+    pages += [f"/categories/{c.replace(' & ', '-').replace(' ', '-')}" for c in CATEGORY_PARAMS]
+    pages += [f"/tools/{c}" for c in CALCULATORS]
+    while len(pages) < rows:
+        pages.append(f"/reviews/{make_slug(rng)}")
+
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for page in pages[:rows]:
+            f.write(f"  <url>\n    <loc>https://siteoptz.ai{page}</loc>\n")
+            f.write("    <lastmod>2025-09-01</lastmod>\n    <changefreq>monthly</changefreq>\n")
+            f.write("    <priority>0.7</priority>\n  </url>\n")
+        f.write('</urlset>\n')
+    return pages[:rows]
+
+
+def generate_allowlist(filename, pages):
+    """Write siteoptz_allowlist.txt the way build_allowlist does, without curl"""
+    with open(filename, 'w') as f:
+        for url in sorted(set(f"https://siteoptz.ai{p}".lower() for p in pages)):
+            f.write(url + '\n')
+
+
+def generate_tools_catalogue(filename, rows, rng):
+    """Write an aiToolsData.json catalogue with the fields the analyzers read"""
+    tools = []
+    for i in range(rows):
+        name = make_slug(rng).replace('-', ' ').title()
+        use_cases = []
+        for _ in range(rng.randint(1, 4)):
+            phrase = rng.choice(DESCRIPTION_PHRASES)
+            use_cases.append({'title': phrase.title(), 'description': phrase} if rng.random() < 0.5 else phrase)
+        tools.append({
+            'id': f"tool-{i}",
+            'name': name,
+            'slug': name.lower().replace(' ', '-'),
+            'category': rng.choice(CATALOGUE_CATEGORIES),
+            'overview': {
+                'category': rng.choice(CATALOGUE_CATEGORIES),
+                'description': f"{name} helps with {rng.choice(DESCRIPTION_PHRASES)}.",
+                'long_description': ' '.join(rng.choice(DESCRIPTION_PHRASES) for _ in range(6)),
+                'website': f"https://{name.lower().replace(' ', '')}.com/"
+            },
+            'features': [rng.choice(DESCRIPTION_PHRASES) for _ in range(rng.randint(3, 8))],
+            'use_cases': use_cases,
+            'rating': round(rng.uniform(3.0, 5.0), 1),
+            'review_count': rng.randint(0, 5000)
+        })
+
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(tools, f)
+    return tools
+
+
+def generate_dataset(data_dir, scale, seed):
+    """Generate every synthetic input for one scale"""
+    rng = random.Random(seed + scale)
+    paths = {
+        'broken_links': os.path.join(data_dir, f"broken_links_{scale}.csv"),
+        'sitemap': os.path.join(data_dir, f"sitemap_{scale}.xml"),
+        'allowlist': os.path.join(data_dir, f"allowlist_{scale}.txt"),
+        'catalogue': os.path.join(data_dir, f"aiToolsData_{scale}.json")
+    }
+    generate_broken_links_csv(paths['broken_links'], scale, rng)
+    pages = generate_sitemap(paths['sitemap'], max(100, scale // 10), rng)
+    generate_allowlist(paths['allowlist'], pages)
+    generate_tools_catalogue(paths['catalogue'], max(100, scale // 10), rng)
+    return paths
+
+
+# Timing helpers
+def time_call(func, repeat):
+    """Time func() `repeat` times and return (best, median, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings), result
+
+
+def run_scale(paths, repeat):
+    """Run every benchmark against one generated dataset"""
+    results = {}
+
+    def record(name, func):
+        best, median, result = time_call(func, repeat)
+        results[name] = {'best_s': round(best, 6), 'median_s': round(median, 6)}
+        print(f"  {name:<32} best {best * 1000:10.2f} ms   median {median * 1000:10.2f} ms")
+        return result
+
+    broken_links = record('load_broken_links', lambda: build_404_inventory.load_broken_links(paths['broken_links']))
+    allowlist = record('load_allowlist', lambda: create_redirect_map.load_allowlist(paths['allowlist']))
+    inventory = record('create_404_inventory', lambda: build_404_inventory.create_404_inventory(broken_links, allowlist))
+
+    redirects = record('determine_redirect', lambda: [
+        create_redirect_map.determine_redirect(item['path'], item['hits_90d'], allowlist)
+        for item in inventory
+    ])
+
+    record('score_inventory', lambda: redirect_scoring.score_inventory(inventory))
+    redirects = record('build_redirects', lambda: create_redirect_map.build_redirects(inventory, allowlist))
+
+    record('generate_vercel_config', lambda: generate_platform_config.generate_vercel_config(redirects))
+    record('generate_netlify_config', lambda: generate_platform_config.generate_netlify_config(redirects))
+    record('generate_nginx_config', lambda: generate_platform_config.generate_nginx_config(redirects))
+    record('generate_apache_config', lambda: generate_platform_config.generate_apache_config(redirects))
+
+    rules = record('parse_rules', lambda: generate_platform_config.parse_rules(redirects))
+    rules = record('order_rules', lambda: generate_platform_config.order_rules(rules))
+    for platform, emitter in generate_platform_config.EMITTERS.items():
+        record(f"emit_{platform}", lambda write=emitter['write']: write(rules, io.StringIO()))
+
+    with open(paths['catalogue'], 'r', encoding='utf-8') as f:
+        tools = json.load(f)
+    record('categorize_tool', lambda: [analyze_productivity_tools.categorize_tool(t) for t in tools])
+    record('get_category_with_rationale', lambda: [final_analysis.get_category_with_rationale(t) for t in tools])
+
+    index_file = os.path.splitext(paths['catalogue'])[0] + '.db'
+
+    def build_index():
+        if os.path.exists(index_file):
+            os.remove(index_file)
+        catalogue_index.CatalogueIndex.open(paths['catalogue'], index_file).close()
+
+    def load_json():
+        with open(paths['catalogue'], 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    record('catalogue_json_load', load_json)
+    record('catalogue_index_build', build_index)
+    index = record('catalogue_index_open', lambda: catalogue_index.CatalogueIndex.open(paths['catalogue'], index_file))
+    slugs = [t['slug'] for t in tools]
+    record('category_scan', lambda: [t for t in tools if catalogue_index.tool_category(t) == 'Productivity'])
+    record('category_lookup', lambda: index.in_category('Productivity'))
+    record('slug_lookup', lambda: [index.get(slug) for slug in slugs])
+    record('full_text_search', lambda: index.search('workflow automation'))
+    index.close()
+
+    matrix, width = record('related_tools_matrix', lambda: build_related_tools.build_matrix(
+        [build_related_tools.tool_terms(t) for t in tools]))
+    record('related_tools_top_k', lambda: build_related_tools.top_k_similar(matrix, width, build_related_tools.TOP_K))
+
+    results['_sizes'] = {
+        'broken_links': len(broken_links),
+        'inventory': len(inventory),
+        'allowlist': len(allowlist),
+        'tools': len(tools)
+    }
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return 'unknown'
+
+
+def compare_results(current, baseline_file):
+    """Print per-benchmark ratios against a previous results file"""
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)
+
+    print("\n" + "=" * 60)
+    print(f"COMPARISON vs {baseline.get('commit', '?')} ({baseline_file})")
+    print("=" * 60)
+    for scale, benches in current['results'].items():
+        old_benches = baseline['results'].get(scale)
+        if not old_benches:
+            continue
+        print(f"\nScale {scale}:")
+        for name, timing in benches.items():
+            if name.startswith('_') or name not in old_benches:
+                continue
+            old, new = old_benches[name]['best_s'], timing['best_s']
+            ratio = new / old if old else float('inf')
+            flag = '  ⚠ regression' if ratio > 1.10 else ''
+            print(f"  {name:<32} {old * 1000:10.2f} → {new * 1000:10.2f} ms  ({ratio:.2f}x){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the SiteOptz.ai Python tooling offline')
+    parser.add_argument('--scales', default='1000,10000',
+                        help='Comma-separated row counts, e.g. 1000,10000,100000,1000000')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark (best and median reported)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', help='Keep generated inputs here instead of a temp directory')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<timestamp>_<commit>.json)')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',') if s]
+
+    print("=" * 60)
+    print("Benchmarking SiteOptz.ai Python Tooling")
+    print("=" * 60)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'results': {}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        os.makedirs(data_dir, exist_ok=True)
+        for scale in scales:
+            print(f"\nScale {scale:,}: generating synthetic inputs...")
+            paths = generate_dataset(data_dir, scale, args.seed)
+            report['results'][str(scale)] = run_scale(paths, args.repeat)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}_{report['commit']}.json")
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Saved benchmark results to {output}")
+
+    if args.compare:
+        compare_results(report, args.compare)
+
+if __name__ == '__main__':
+    main()
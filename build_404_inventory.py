@@ -6,10 +6,15 @@ Processes internal broken links CSV and creates a comprehensive 404 inventory
 
 import csv
 import json
-from urllib.parse import urlparse, parse_qs, unquote
+from urllib.parse import urlparse, parse_qs, parse_qsl, unquote
 from datetime import datetime, timedelta
 from collections import defaultdict
+from functools import lru_cache
 import os
+import re
+import urllib.request
+
+from allowlist_index import AllowlistIndex
 
 # Load and process the broken links CSV
 def load_broken_links(filename):
@@ -25,19 +30,61 @@ def load_broken_links(filename):
                 })
     return broken_links
 
+DEFAULT_SITEMAPS = [
+    'https://siteoptz.ai/sitemap-main.xml',
+    'https://siteoptz.ai/sitemap-tools.xml',
+    'https://siteoptz.ai/sitemap-comparisons.xml'
+]
+
+LOC_PATTERN = re.compile(r'<loc>([^<]*)</loc>')
+SITEMAP_INDEX_PATTERN = re.compile(r'<sitemapindex[\s>]')
+
+# Read <loc> entries from a sitemap URL or local sitemap file; a sitemap
+# index is followed to the sitemaps it lists (local ones next to the index)
+def load_sitemap_urls(source, seen=None):
+    seen = set() if seen is None else seen
+    seen.add(source)
+    remote = source.startswith(('http://', 'https://'))
+    if remote:
+        with urllib.request.urlopen(source, timeout=30) as response:
+            content = response.read().decode('utf-8', errors='replace')
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            content = f.read()
+    locs = [loc.strip() for loc in LOC_PATTERN.findall(content)]
+    if not SITEMAP_INDEX_PATTERN.search(content):
+        return [loc.lower() for loc in locs]
+    urls = []
+    for loc in locs:
+        child = loc if remote else os.path.join(os.path.dirname(source), os.path.basename(urlparse(loc).path))
+        if child not in seen:
+            urls.extend(load_sitemap_urls(child, seen))
+    return urls
+
 # Fetch and build ALLOWLIST from sitemap
-def build_allowlist():
+def build_allowlist(sitemaps=DEFAULT_SITEMAPS, output='siteoptz_allowlist.txt'):
     print("Fetching sitemap URLs to build ALLOWLIST...")
-    os.system('curl -sL https://siteoptz.ai/sitemap-main.xml https://siteoptz.ai/sitemap-tools.xml https://siteoptz.ai/sitemap-comparisons.xml | grep -o "<loc>[^<]*</loc>" | sed "s/<loc>//;s/<\/loc>//" | tr "[:upper:]" "[:lower:]" | sort -u > siteoptz_allowlist.txt')
+    urls = set()
+    for source in sitemaps:
+        try:
+            urls.update(load_sitemap_urls(source))
+        except OSError as e:
+            print(f"  Warning: could not read {source}: {e}")
     
-    with open('siteoptz_allowlist.txt', 'r') as f:
-        allowlist = set(line.strip().lower() for line in f.readlines())
+    with open(output, 'w') as f:
+        for url in sorted(urls):
+            f.write(url + '\n')
+    
+    allowlist = AllowlistIndex.from_urls(urls)
+    # Share the index with later stages without re-parsing the text file
+    allowlist.save(os.path.splitext(output)[0] + '.idx')
     
     print(f"ALLOWLIST built with {len(allowlist)} valid URLs")
     return allowlist
 
-# Normalize URL for matching
-def normalize_url(url):
+# Normalize URL for matching (cached: the same URLs recur across sources and sites)
+@lru_cache(maxsize=262144)
+def normalize_url(url, canonical_host=None):
     url = url.lower().strip()
     parsed = urlparse(url)
     path = parsed.path
@@ -46,13 +93,13 @@ def normalize_url(url):
     if not path.endswith('/') and '.' not in path.split('/')[-1]:
         path += '/'
     
-    # Remove www subdomain for consistency
-    host = parsed.netloc.replace('www.', '')
+    # Use the site's canonical host, or remove www subdomain for consistency
+    host = canonical_host or parsed.netloc.replace('www.', '')
     normalized = f"https://{host}{path}"
     return normalized
 
 # Process and create inventory
-def create_404_inventory(broken_links, allowlist):
+def create_404_inventory(broken_links, allowlist, site_url='https://www.siteoptz.ai', canonical_host=None):
     # Group by URL and count occurrences
     url_stats = defaultdict(lambda: {
         'count': 0,
@@ -89,8 +136,8 @@ def create_404_inventory(broken_links, allowlist):
     inventory = []
     for path, stats in url_stats.items():
         # Check if normalized version is in allowlist
-        full_url = f"https://www.siteoptz.ai{path}"
-        normalized = normalize_url(full_url)
+        full_url = f"{site_url}{path}"
+        normalized = normalize_url(full_url, canonical_host)
         
         if normalized not in allowlist:
             # Calculate metrics
@@ -104,12 +151,17 @@ def create_404_inventory(broken_links, allowlist):
             referrers = list(stats['sources'])[:5]
             referrers_str = ', '.join([urlparse(r).path if r else 'Direct' for r in referrers])
             
+            # Referring pages that are themselves live keep sending visitors to the 404
+            live_referrers = sum(1 for r in stats['sources'] if r and r.rstrip('/') in allowlist)
+            
             inventory.append({
                 'path': path,
                 'hits_30d': hits_30d,
                 'hits_90d': hits_90d,
                 'first_seen': first_seen,
                 'last_seen': last_seen,
+                'sources': len(stats['sources']),
+                'live_referrers': live_referrers,
                 'sample_referrers': referrers_str
             })
     
@@ -118,6 +170,40 @@ def create_404_inventory(broken_links, allowlist):
     
     return inventory
 
+# Write inventory to CSV
+def write_inventory(inventory, filename):
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        fieldnames = ['path', 'hits_30d', 'hits_90d', 'first_seen', 'last_seen', 'sources',
+                      'live_referrers', 'sample_referrers']
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(inventory)
+
+# Segments kept literally when clustering paths into URL templates
+TEMPLATE_STATIC_SEGMENTS = {'vs', 'tools', 'reviews', 'compare', 'categories', 'case-studies',
+                            'resources', 'reports', 'images', 'analysis', 'blog'}
+
+# Collapse variable path segments into placeholders, e.g. /compare/:slug1/vs/:slug2
+def path_template(path):
+    template, _ = path_template_params(path)
+    return template
+
+def path_template_params(path):
+    path, _, query = path.partition('?')
+    segments = []
+    params = {}
+    for i, segment in enumerate(s for s in path.split('/') if s):
+        if i == 0 or segment in TEMPLATE_STATIC_SEGMENTS:
+            segments.append(segment)
+        else:
+            name = f"slug{len(params) + 1}"
+            params[name] = segment
+            segments.append(f":{name}")
+    template = '/' + '/'.join(segments)
+    if query:
+        template += '?' + '&'.join(f"{key}=:{key}" for key, _ in parse_qsl(query, keep_blank_values=True))
+    return template, params
+
 # Analyze patterns
 def analyze_patterns(inventory):
     patterns = {
@@ -170,11 +256,7 @@ def main():
     inventory = create_404_inventory(broken_links, allowlist)
     
     # Write inventory to CSV
-    with open('404_inventory.csv', 'w', newline='', encoding='utf-8') as f:
-        fieldnames = ['path', 'hits_30d', 'hits_90d', 'first_seen', 'last_seen', 'sample_referrers']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(inventory)
+    write_inventory(inventory, '404_inventory.csv')
     
     print(f"\n✓ Created 404_inventory.csv with {len(inventory)} unique 404 URLs")
     
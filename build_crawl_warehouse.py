@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Build Crawl Issue Warehouse for SiteOptz.ai
+Loads every dated crawler export (4xx errors, broken canonicals, broken images,
+structured data errors, wrong sitemap pages, permanent redirects, broken links)
+into one SQLite database with typed, indexed columns so cross-export questions
+become indexed joins instead of re-reading several CSVs.
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+from datetime import datetime
+from functools import lru_cache
+
+DEFAULT_DB = 'crawl_warehouse.db'
+
+# Export type -> table name and CSV column -> warehouse column mapping
+EXPORT_TYPES = {
+    'http_4xx_client_errors': {
+        'table': 'http_4xx',
+        'columns': {'Page URL': 'page_url', 'HTTP Code': 'http_code'}
+    },
+    'broken_canonical_urls': {
+        'table': 'broken_canonicals',
+        'columns': {'Page URL': 'page_url', 'Canonical link URL': 'target_url', 'HTTP Status code': 'http_code'}
+    },
+    'internal_images_are_broken': {
+        'table': 'broken_images',
+        'columns': {'Page URL': 'page_url', 'Image URL': 'target_url', 'HTTP Code': 'http_code'}
+    },
+    'structured_data_that_contains_markup_errors': {
+        'table': 'structured_data_errors',
+        'columns': {'Page URL': 'page_url', 'Structured data': 'schema_type', 'Field': 'field',
+                    'Issue description': 'issue'}
+    },
+    'wrong_pages_found_in_sitemap': {
+        'table': 'sitemap_wrong_pages',
+        'columns': {'Link URL': 'page_url', 'Sitemap URL': 'target_url', 'Issue Type': 'issue'}
+    },
+    'permanent_redirects': {
+        'table': 'permanent_redirects',
+        'columns': {'Page URL with Redirect Link': 'page_url', 'Initial Redirect URL': 'target_url',
+                    'Final Destination URL': 'final_url', 'Status code': 'http_code'}
+    },
+    'internal_broken_links': {
+        'table': 'broken_links',
+        'columns': {'Page URL': 'page_url', 'Broken Link URL': 'target_url', 'HTTP Code': 'http_code'}
+    }
+}
+
+# Every issue table shares this layout; unused columns stay NULL
+ISSUE_COLUMNS = [
+    ('crawl_id', 'INTEGER NOT NULL REFERENCES crawls(id)'),
+    ('crawl_date', 'TEXT NOT NULL'),
+    ('page_url', 'TEXT NOT NULL'),
+    ('target_url', 'TEXT'),
+    ('final_url', 'TEXT'),
+    ('http_code', 'INTEGER'),
+    ('schema_type', 'TEXT'),
+    ('field', 'TEXT'),
+    ('issue', 'TEXT'),
+    ('discovered', 'TEXT')
+]
+
+EXPORT_FILENAME = re.compile(r'^(?P<domain>[^_]+)_(?P<type>[a-z0-9_]+?)_(?P<date>\d{8})')
+
+
+def parse_export_filename(filename):
+    """Return (domain, export_type, crawl_date) or None for non-export files"""
+    match = EXPORT_FILENAME.match(os.path.basename(filename))
+    if not match or match.group('type') not in EXPORT_TYPES:
+        return None
+    crawl_date = datetime.strptime(match.group('date'), '%Y%m%d').strftime('%Y-%m-%d')
+    return match.group('domain'), match.group('type'), crawl_date
+
+
+@lru_cache(maxsize=65536)
+def parse_discovered(value):
+    """Parse '12 Sep 2025 (04:47 UTC)' once into ISO 'YYYY-MM-DDTHH:MM'"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.replace(' UTC)', ')'), '%d %b %Y (%H:%M)').strftime('%Y-%m-%dT%H:%M')
+    except ValueError:
+        try:
+            return datetime.strptime(value.split(' (')[0], '%d %b %Y').strftime('%Y-%m-%d')
+        except ValueError:
+            return None
+
+
+def normalize_page_url(url):
+    """Lowercase and drop the trailing slash so exports join on the same key"""
+    return url.strip().lower().rstrip('/')
+
+
+def parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def connect(db_path=DEFAULT_DB):
+    """Open the warehouse, creating tables and indexes on first use"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.execute('''CREATE TABLE IF NOT EXISTS crawls (
+        id INTEGER PRIMARY KEY,
+        domain TEXT NOT NULL,
+        export_type TEXT NOT NULL,
+        crawl_date TEXT NOT NULL,
+        source_file TEXT NOT NULL,
+        content_hash TEXT NOT NULL UNIQUE,
+        row_count INTEGER NOT NULL,
+        loaded_at TEXT NOT NULL
+    )''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_crawls_type_date ON crawls(export_type, crawl_date)')
+
+    column_sql = ', '.join(f'{name} {kind}' for name, kind in ISSUE_COLUMNS)
+    for spec in EXPORT_TYPES.values():
+        table = spec['table']
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({column_sql})')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_page ON {table}(page_url)')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_target ON {table}(target_url)')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_date ON {table}(crawl_date)')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_crawl ON {table}(crawl_id)')
+    return conn
+
+
+def file_hash(filename):
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_export_rows(filename, export_type, crawl_id, crawl_date):
+    """Stream typed rows from one export CSV"""
+    mapping = EXPORT_TYPES[export_type]['columns']
+    column_names = [name for name, _ in ISSUE_COLUMNS]
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            record = dict.fromkeys(column_names)
+            record['crawl_id'] = crawl_id
+            record['crawl_date'] = crawl_date
+            for csv_column, column in mapping.items():
+                record[column] = row.get(csv_column)
+            record['page_url'] = normalize_page_url(record['page_url'] or '')
+            if record['target_url']:
+                record['target_url'] = normalize_page_url(record['target_url'])
+            record['http_code'] = parse_int(record['http_code'])
+            record['discovered'] = parse_discovered(row.get('Discovered', ''))
+            yield tuple(record[name] for name in column_names)
+
+
+def load_export(conn, filename):
+    """Load one export file; returns (crawl_id, rows) or None if skipped"""
+    parsed = parse_export_filename(filename)
+    if not parsed:
+        return None
+    domain, export_type, crawl_date = parsed
+
+    content_hash = file_hash(filename)
+    if conn.execute('SELECT 1 FROM crawls WHERE content_hash = ?', (content_hash,)).fetchone():
+        return None
+
+    table = EXPORT_TYPES[export_type]['table']
+    placeholders = ', '.join('?' for _ in ISSUE_COLUMNS)
+    with conn:
+        cursor = conn.execute(
+            'INSERT INTO crawls (domain, export_type, crawl_date, source_file, content_hash, row_count, loaded_at) '
+            'VALUES (?, ?, ?, ?, ?, 0, ?)',
+            (domain, export_type, crawl_date, os.path.basename(filename), content_hash, datetime.now().isoformat())
+        )
+        crawl_id = cursor.lastrowid
+        conn.executemany(f'INSERT INTO {table} VALUES ({placeholders})',
+                         iter_export_rows(filename, export_type, crawl_id, crawl_date))
+        rows = conn.execute(f'SELECT COUNT(*) FROM {table} WHERE crawl_id = ?', (crawl_id,)).fetchone()[0]
+        conn.execute('UPDATE crawls SET row_count = ? WHERE id = ?', (rows, crawl_id))
+    return crawl_id, rows
+
+
+def latest_crawl_id(conn, export_type):
+    row = conn.execute(
+        'SELECT id FROM crawls WHERE export_type = ? ORDER BY crawl_date DESC, id DESC LIMIT 1',
+        (export_type,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def pages_with_issues(conn, export_types, crawl_ids=None):
+    """Pages present in every given export (latest crawl of each by default)"""
+    tables = [EXPORT_TYPES[t]['table'] for t in export_types]
+    crawl_ids = crawl_ids or [latest_crawl_id(conn, t) for t in export_types]
+    if None in crawl_ids:
+        return []
+
+    sql = f'SELECT DISTINCT t0.page_url FROM {tables[0]} t0'
+    for i, table in enumerate(tables[1:], 1):
+        sql += f' JOIN {table} t{i} ON t{i}.page_url = t0.page_url AND t{i}.crawl_id = ?'
+    sql += ' WHERE t0.crawl_id = ? ORDER BY t0.page_url'
+    params = list(crawl_ids[1:]) + [crawl_ids[0]]
+    return [row[0] for row in conn.execute(sql, params)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load crawler exports into the crawl issue warehouse')
+    parser.add_argument('files', nargs='*', help='Export CSVs (default: every *_YYYYMMDD*.csv in the current directory)')
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--pages-with', help='Comma-separated export types, e.g. '
+                        'internal_images_are_broken,broken_canonical_urls')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Building Crawl Issue Warehouse")
+    print("=" * 60)
+
+    conn = connect(args.db)
+    files = args.files or sorted(glob.glob('*_[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9]*.csv'))
+
+    loaded = 0
+    for filename in files:
+        result = load_export(conn, filename)
+        if result:
+            loaded += 1
+            print(f"  ✓ {filename}: {result[1]:,} rows")
+
+    print(f"\n✓ Loaded {loaded} new exports into {args.db} ({len(files) - loaded} skipped or already loaded)")
+
+    print("\nCrawls in warehouse:")
+    for export_type, crawls, rows in conn.execute(
+            'SELECT export_type, COUNT(*), SUM(row_count) FROM crawls GROUP BY export_type ORDER BY export_type'):
+        print(f"  • {export_type}: {crawls} crawls, {rows:,} rows")
+
+    if args.pages_with:
+        export_types = args.pages_with.split(',')
+        pages = pages_with_issues(conn, export_types)
+        print(f"\nPages with {' + '.join(export_types)}: {len(pages)}")
+        for page in pages[:20]:
+            print(f"  {page}")
+
+    conn.close()
+
+if __name__ == '__main__':
+    main()
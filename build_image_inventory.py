@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Build Broken Image Inventory for SiteOptz.ai
+Processes the internal_images_are_broken crawler export, dedupes broken image
+URLs across referencing pages, matches every missing asset to a file that
+exists under public/ (by normalized logo stem) and writes asset redirect rules
+that go through the same platform emitters as redirects_map.csv.
+"""
+
+import argparse
+import csv
+import difflib
+import glob
+import json
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+from create_redirect_map import write_redirects
+from generate_platform_config import EMITTERS, write_platform_configs
+from redirect_conflicts import RedirectConflictError
+
+DEFAULT_INDEX = 'public_assets.json'
+INDEX_VERSION = 1
+IMAGE_EXTENSIONS = {'.svg', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.ico'}
+
+# Suffixes that vary between a tool's logo file names, e.g. aicosts-ai-logo.svg / aicosts-logo.png
+STEM_SUFFIXES = re.compile(r'([-_.](ai|io|app|hq)|[-_.]?(logo|icon))+$')
+NON_ALNUM = re.compile(r'[^a-z0-9]')
+FUZZY_CUTOFF = 0.88
+
+def latest_export(pattern='siteoptz.ai_internal_images_are_broken_*.csv'):
+    files = sorted(glob.glob(pattern))
+    return files[-1] if files else None
+
+# Load the broken image rows (only 4xx responses)
+def load_broken_images(filename):
+    broken_images = []
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            if row.get('HTTP Code', '').startswith('4'):
+                broken_images.append({
+                    'source_page': row['Page URL'],
+                    'image_url': row['Image URL'],
+                    'discovered': row.get('Discovered', '')
+                })
+    return broken_images
+
+def asset_stem(path):
+    """Normalized logo stem: /images/tools/AICosts-AI-Logo.svg -> aicosts"""
+    name = os.path.splitext(os.path.basename(path))[0].lower()
+    stem = STEM_SUFFIXES.sub('', name)
+    return NON_ALNUM.sub('', stem or name)
+
+# Public asset index
+
+def _scan_directory(root, rel):
+    """List one directory: (rel, mtime, image files, subdirectories)"""
+    directory = os.path.join(root, rel)
+    files, subdirs = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(os.path.join(rel, entry.name) if rel else entry.name)
+            elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                files.append(entry.name)
+    return rel, os.stat(directory).st_mtime, sorted(files), sorted(subdirs)
+
+def scan_public(root='public', cached=None, workers=8):
+    """Walk root in parallel, re-listing only directories whose mtime changed"""
+    cached = cached or {}
+    dirs = {}
+    rescanned = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = ['']
+        while pending:
+            fresh, futures = [], []
+            for rel in pending:
+                entry = cached.get(rel)
+                try:
+                    mtime = os.stat(os.path.join(root, rel)).st_mtime
+                except OSError:
+                    continue
+                if entry and entry['mtime'] == mtime:
+                    fresh.append((rel, entry))
+                else:
+                    futures.append(pool.submit(_scan_directory, root, rel))
+            pending = []
+            for rel, entry in fresh:
+                dirs[rel] = entry
+                pending.extend(entry['dirs'])
+            for future in futures:
+                rel, mtime, files, subdirs = future.result()
+                dirs[rel] = {'mtime': mtime, 'files': files, 'dirs': subdirs}
+                pending.extend(subdirs)
+                rescanned += 1
+    return dirs, rescanned
+
+class AssetIndex:
+    """Existing public/ image paths, grouped by normalized stem for logo matching"""
+
+    def __init__(self, dirs):
+        self.dirs = dirs
+        self.paths = set()
+        self.by_stem = defaultdict(list)
+        self.stems_by_dir = defaultdict(set)
+        for rel, entry in dirs.items():
+            url_dir = '/' + rel.replace(os.sep, '/') if rel else ''
+            for name in entry['files']:
+                path = f"{url_dir}/{name}"
+                stem = asset_stem(name)
+                self.paths.add(path.lower())
+                self.by_stem[stem].append(path)
+                self.stems_by_dir[url_dir].add(stem)
+
+    @classmethod
+    def build(cls, root='public', index_file=DEFAULT_INDEX, workers=8):
+        """Load the on-disk index, refresh changed directories, and save it back"""
+        cached = {}
+        if index_file and os.path.exists(index_file):
+            with open(index_file, 'r') as f:
+                data = json.load(f)
+            if data.get('v') == INDEX_VERSION and data.get('root') == os.path.abspath(root):
+                cached = data['dirs']
+
+        dirs, rescanned = scan_public(root, cached, workers)
+        if index_file and (rescanned or len(dirs) != len(cached)):
+            tmp_name = index_file + '.tmp'
+            with open(tmp_name, 'w') as f:
+                json.dump({'v': INDEX_VERSION, 'root': os.path.abspath(root), 'dirs': dirs}, f)
+            os.replace(tmp_name, index_file)
+
+        index = cls(dirs)
+        index.rescanned = rescanned
+        return index
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, path):
+        return path.lower() in self.paths
+
+    def match(self, path):
+        """Best existing asset for a missing one: (path, method) or (None, None)"""
+        url_dir = os.path.dirname(path)
+        stem = asset_stem(path)
+        candidates = self.by_stem.get(stem, [])
+        if candidates:
+            # Prefer the same directory, then the same extension
+            ext = os.path.splitext(path)[1].lower()
+            best = min(candidates, key=lambda c: (os.path.dirname(c) != url_dir,
+                                                  os.path.splitext(c)[1].lower() != ext, c))
+            return best, 'stem'
+
+        close = difflib.get_close_matches(stem, self.stems_by_dir.get(url_dir, ()), n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            same_dir = [c for c in self.by_stem[close[0]] if os.path.dirname(c) == url_dir]
+            return sorted(same_dir)[0], 'fuzzy'
+        return None, None
+
+# Process and create inventory
+def create_image_inventory(broken_images, assets, placeholder=None):
+    # Group by image path and count referencing pages
+    image_stats = defaultdict(lambda: {
+        'count': 0,
+        'sources': set(),
+        'first_seen': None,
+        'last_seen': None
+    })
+
+    for image in broken_images:
+        path = urlparse(image['image_url']).path or '/'
+        stats = image_stats[path]
+        stats['count'] += 1
+        stats['sources'].add(urlparse(image['source_page']).path or '/')
+        if image['discovered']:
+            try:
+                discovered_date = datetime.strptime(image['discovered'].split(' (')[0], '%d %b %Y')
+            except ValueError:
+                continue
+            if stats['first_seen'] is None or discovered_date < stats['first_seen']:
+                stats['first_seen'] = discovered_date
+            if stats['last_seen'] is None or discovered_date > stats['last_seen']:
+                stats['last_seen'] = discovered_date
+
+    inventory = []
+    for path, stats in image_stats.items():
+        if path in assets:
+            status, target, method = 'present', path, 'exists'
+        else:
+            target, method = assets.match(path)
+            status = 'remapped' if target else 'missing'
+            if not target and placeholder and placeholder in assets:
+                target, method, status = placeholder, 'placeholder', 'placeholder'
+
+        inventory.append({
+            'path': path,
+            'referencing_pages': len(stats['sources']),
+            'occurrences': stats['count'],
+            'first_seen': stats['first_seen'].strftime('%Y-%m-%d') if stats['first_seen'] else '',
+            'last_seen': stats['last_seen'].strftime('%Y-%m-%d') if stats['last_seen'] else '',
+            'status': status,
+            'match': target or '',
+            'match_method': method or '',
+            'sample_referrers': ', '.join(sorted(stats['sources'])[:5])
+        })
+
+    # Sort by number of pages showing the broken image
+    inventory.sort(key=lambda x: x['referencing_pages'], reverse=True)
+    return inventory
+
+def write_image_inventory(inventory, filename):
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        fieldnames = ['path', 'referencing_pages', 'occurrences', 'first_seen', 'last_seen',
+                      'status', 'match', 'match_method', 'sample_referrers']
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(inventory)
+
+# Turn remapped assets into redirect map rows
+def build_asset_redirects(inventory, site_url='https://siteoptz.ai'):
+    priority = {'stem': 'high', 'fuzzy': 'med', 'placeholder': 'low'}
+    redirects = []
+    for item in inventory:
+        if item['status'] not in ('remapped', 'placeholder'):
+            continue
+        redirects.append({
+            'path': item['path'],
+            'action': '301',
+            'to_url': f"{site_url}{item['match']}",
+            'priority': priority[item['match_method']],
+            'rationale': f"Missing image → {item['match_method']} match ({item['referencing_pages']} pages)"
+        })
+    return redirects
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the broken image inventory and asset redirects')
+    parser.add_argument('export', nargs='?', help='internal_images_are_broken CSV (default: latest in current directory)')
+    parser.add_argument('--public', default='public', help='Static asset root')
+    parser.add_argument('--index', default=DEFAULT_INDEX, help='On-disk asset index (empty to disable)')
+    parser.add_argument('--placeholder', default='/images/placeholder-logo.svg',
+                        help='Fallback for unmatched images (empty to leave them missing)')
+    parser.add_argument('--site-url', default='https://siteoptz.ai')
+    parser.add_argument('--emit-dir', help='Also write platform configs for the asset redirects into this directory')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Building Broken Image Inventory for SiteOptz.ai")
+    print("=" * 60)
+
+    export = args.export or latest_export()
+    if not export:
+        print("❌ No internal_images_are_broken export found")
+        return
+
+    print(f"\nLoading {export}...")
+    broken_images = load_broken_images(export)
+    print(f"Found {len(broken_images)} broken image references")
+
+    print(f"\nIndexing {args.public}/...")
+    assets = AssetIndex.build(args.public, args.index or None, args.workers)
+    print(f"Indexed {len(assets)} image files ({assets.rescanned} of {len(assets.dirs)} directories rescanned)")
+
+    inventory = create_image_inventory(broken_images, assets, args.placeholder or None)
+    write_image_inventory(inventory, 'image_inventory.csv')
+    redirects = build_asset_redirects(inventory, args.site_url)
+    write_redirects(redirects, 'image_redirects.csv')
+
+    status_counts = defaultdict(int)
+    for item in inventory:
+        status_counts[item['status']] += 1
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    print(f"\nUnique broken images: {len(inventory)}")
+    print(f"  • Present now (fixed since the crawl): {status_counts['present']}")
+    print(f"  • Remapped to an existing asset: {status_counts['remapped']}")
+    print(f"  • Placeholder fallback: {status_counts['placeholder']}")
+    print(f"  • Still missing: {status_counts['missing']}")
+
+    print("\nTop 10 broken images by referencing pages:")
+    for i, item in enumerate(inventory[:10], 1):
+        target = f" → {item['match']}" if item['status'] != 'present' and item['match'] else ''
+        print(f"{i:2}. {item['path'][:50]:<50} {item['referencing_pages']:>5} pages [{item['status']}]{target}")
+
+    print(f"\n✓ Saved image_inventory.csv and image_redirects.csv ({len(redirects)} asset redirects)")
+
+    if args.emit_dir:
+        try:
+            write_platform_configs(redirects, platforms=list(EMITTERS), output_dir=args.emit_dir, site_url=args.site_url)
+        except RedirectConflictError as e:
+            print(f"\n❌ Refusing to emit configs: {e}")
+    else:
+        print("\nNext step: python3 generate_platform_config.py redirects_map.csv image_redirects.csv")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Related Tools Builder for SiteOptz.ai
+Computes related_tools for the whole catalogue in one pass instead of by hand:
+every tool becomes a TF-IDF weighted row over its category, tags and features
+(a sparse CSR matrix), and the top-k cosine neighbours come from blocked NumPy
+matrix products, so memory is bounded by the block size rather than the
+catalogue size. Curated entries that still resolve are kept. Comparison pairs
+are only emitted when the sitemap actually has the /compare/ page, so the site
+stops linking to comparisons that 404.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+import numpy as np
+
+from catalogue_index import DEFAULT_CATALOGUE, iter_tools, tool_category, tool_features, tool_slug, tool_tags
+from find_duplicate_tools import compact, slug_key
+from validate_sitemaps import expand_sources, iter_sitemap
+
+DEFAULT_SITEMAPS = ['public/sitemap.xml']
+DEFAULT_PAIRS = 'comparison-pairs.json'
+TOP_K = 3
+BLOCK_SIZE = 1024
+MIN_SIMILARITY = 0.05
+MISSING_REPORT = 25
+
+# Term weights before IDF: a shared category says less than a shared tag or feature
+CATEGORY_WEIGHT = 1.0
+TAG_WEIGHT = 1.5
+FEATURE_WEIGHT = 2.0
+WORD_WEIGHT = 0.5
+WORD = re.compile(r'[a-z][a-z0-9]{2,}')
+STOP_WORDS = {'and', 'the', 'for', 'with', 'your', 'from', 'into', 'more', 'based', 'tool', 'tools', 'support'}
+
+# /compare/a/vs/b (sitemap) and /compare/a-vs-b (older links)
+COMPARE_PATH = re.compile(r'^/compare/([^/]+?)(?:/vs/|-vs-)([^/]+?)/?$')
+
+
+def tool_terms(tool):
+    """Weighted terms for one tool: category, tags, whole feature phrases and feature words"""
+    terms = {}
+    category = tool_category(tool)
+    if category:
+        terms[f'c:{category.lower()}'] = CATEGORY_WEIGHT
+    for tag in tool_tags(tool):
+        terms[f't:{tag}'] = TAG_WEIGHT
+    for feature in tool_features(tool):
+        phrase = compact(feature)
+        if phrase:
+            terms[f'f:{phrase}'] = FEATURE_WEIGHT
+        for word in WORD.findall(feature.lower()):
+            if word not in STOP_WORDS:
+                terms.setdefault(f'w:{word}', WORD_WEIGHT)
+    return terms
+
+
+def build_matrix(term_rows):
+    """L2-normalised TF-IDF rows as CSR arrays (indptr, indices, data) plus the column count.
+
+    Terms only one tool has still count towards its norm but get no column:
+    they can never make two tools similar.
+    """
+    num_tools = len(term_rows)
+    df = Counter(term for terms in term_rows for term in terms)
+    vocab = {term: i for i, term in enumerate(sorted(t for t, count in df.items() if count > 1))}
+    idf = {term: math.log(num_tools / count) + 1.0 for term, count in df.items()}
+
+    indptr = np.zeros(num_tools + 1, dtype=np.int64)
+    indices, data = [], []
+    for row, terms in enumerate(term_rows):
+        weights = {term: weight * idf[term] for term, weight in terms.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        columns = sorted((vocab[term], weight / norm) for term, weight in weights.items() if term in vocab)
+        indices.extend(column for column, _ in columns)
+        data.extend(value for _, value in columns)
+        indptr[row + 1] = len(indices)
+    return (indptr, np.asarray(indices, dtype=np.int32), np.asarray(data, dtype=np.float32)), len(vocab)
+
+
+def dense_rows(matrix, width, lo, hi):
+    """Rows lo:hi of a CSR matrix as a dense float32 block"""
+    indptr, indices, data = matrix
+    block = np.zeros((hi - lo, width), dtype=np.float32)
+    start, end = indptr[lo], indptr[hi]
+    rows = np.repeat(np.arange(hi - lo), np.diff(indptr[lo:hi + 1]))
+    block[rows, indices[start:end]] = data[start:end]
+    return block
+
+
+def top_k_similar(matrix, width, k, block_size=BLOCK_SIZE):
+    """Top-k cosine neighbours of every row, excluding itself.
+
+    Works one (row block x column block) product at a time, keeping a running
+    top-k per row, so peak memory is about block_size x (width + block_size).
+    Returns (neighbours, similarities), both num_rows x k, best first.
+    """
+    num_rows = len(matrix[0]) - 1
+    k = min(k, max(num_rows - 1, 0))
+    neighbours = np.full((num_rows, k), -1, dtype=np.int64)
+    similarities = np.zeros((num_rows, k), dtype=np.float32)
+    if k == 0:
+        return neighbours, similarities
+
+    for lo in range(0, num_rows, block_size):
+        hi = min(lo + block_size, num_rows)
+        rows = dense_rows(matrix, width, lo, hi)
+        best_sim = np.full((hi - lo, k), -1.0, dtype=np.float32)
+        best_idx = np.full((hi - lo, k), -1, dtype=np.int64)
+        for col_lo in range(0, num_rows, block_size):
+            col_hi = min(col_lo + block_size, num_rows)
+            columns = rows if col_lo == lo else dense_rows(matrix, width, col_lo, col_hi)
+            sim = rows @ columns.T
+            if col_lo == lo:
+                np.fill_diagonal(sim, -1.0)
+            cand_sim = np.concatenate([best_sim, sim], axis=1)
+            cand_idx = np.concatenate([best_idx, np.broadcast_to(np.arange(col_lo, col_hi), sim.shape)], axis=1)
+            keep = np.argpartition(-cand_sim, k - 1, axis=1)[:, :k]
+            best_sim = np.take_along_axis(cand_sim, keep, axis=1)
+            best_idx = np.take_along_axis(cand_idx, keep, axis=1)
+        order = np.argsort(-best_sim, axis=1, kind='stable')
+        neighbours[lo:hi] = np.take_along_axis(best_idx, order, axis=1)
+        similarities[lo:hi] = np.take_along_axis(best_sim, order, axis=1)
+    return neighbours, similarities
+
+
+def load_comparisons(sources):
+    """(slug key, slug key) -> comparison URL for every /compare/ page in the sitemaps, both orders"""
+    comparisons = {}
+    for source in expand_sources(sources):
+        if not os.path.exists(source):
+            continue
+        for kind, entry in iter_sitemap(source):
+            if kind != 'url':
+                continue
+            match = COMPARE_PATH.match(urlparse(entry.get('loc', '')).path)
+            if match:
+                a, b = (slug_key({'slug': part}) for part in match.groups())
+                comparisons.setdefault((a, b), entry['loc'])
+                comparisons.setdefault((b, a), entry['loc'])
+    return comparisons
+
+
+def assign_related(tools, neighbours, similarities, k=TOP_K, min_similarity=MIN_SIMILARITY):
+    """New related_tools per tool: curated slugs that still exist first, then computed neighbours"""
+    slugs = [tool_slug(tool) for tool in tools]
+    known = set(slugs)
+    related = []
+    for i, tool in enumerate(tools):
+        curated = tool.get('related_tools') if isinstance(tool.get('related_tools'), list) else []
+        chosen = []
+        for slug in curated:
+            if isinstance(slug, str) and slug in known and slug != slugs[i] and slug not in chosen:
+                chosen.append(slug)
+        for j, sim in zip(neighbours[i], similarities[i]):
+            if len(chosen) >= k:
+                break
+            if j >= 0 and sim >= min_similarity and slugs[j] != slugs[i] and slugs[j] not in chosen:
+                chosen.append(slugs[j])
+        related.append(chosen)
+    return related
+
+
+def comparison_pairs(tools, neighbours, similarities, comparisons, min_similarity=MIN_SIMILARITY):
+    """Split computed neighbour pairs into those with a live comparison page and those without"""
+    keys = [slug_key(tool) for tool in tools]
+    live, missing = {}, {}
+    for i in range(len(tools)):
+        for j, sim in zip(neighbours[i], similarities[i]):
+            if j < 0 or sim < min_similarity or keys[i] == keys[j]:
+                continue
+            pair = tuple(sorted((tool_slug(tools[i]), tool_slug(tools[j]))))
+            url = comparisons.get((keys[i], keys[j]))
+            target = live if url else missing
+            entry = target.setdefault(pair, {'tools': list(pair), 'similarity': 0.0})
+            entry['similarity'] = round(max(entry['similarity'], float(sim)), 4)
+            if url:
+                entry['url'] = url
+    by_similarity = lambda entry: (-entry['similarity'], entry['tools'])
+    return sorted(live.values(), key=by_similarity), sorted(missing.values(), key=by_similarity)
+
+
+def _write_json(data, filename):
+    tmp_name = filename + '.tmp'
+    with open(tmp_name, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_name, filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute related_tools and sitemap-backed comparison pairs')
+    parser.add_argument('catalogue', nargs='?', default=DEFAULT_CATALOGUE)
+    parser.add_argument('--sitemaps', nargs='+', default=DEFAULT_SITEMAPS,
+                        help='Sitemaps (or sitemap indexes) whose /compare/ pages may be linked')
+    parser.add_argument('--pairs', help=f'Comparison pairs output (default: {DEFAULT_PAIRS} next to the catalogue)')
+    parser.add_argument('-k', '--top-k', type=int, default=TOP_K, help='Related tools per record')
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE,
+                        help='Rows per matrix block; bounds memory at about block x (terms + block) floats')
+    parser.add_argument('--min-similarity', type=float, default=MIN_SIMILARITY)
+    parser.add_argument('--dry-run', action='store_true', help='Report only; leave the catalogue untouched')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Building Related Tools and Comparison Pairs")
+    print("=" * 60)
+
+    if not os.path.exists(args.catalogue):
+        print(f"❌ Catalogue not found: {args.catalogue}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    tools = [tool for tool in iter_tools(args.catalogue) if isinstance(tool, dict)]
+    matrix, width = build_matrix([tool_terms(tool) for tool in tools])
+    print(f"✓ {len(tools)} tools x {width} shared terms, {len(matrix[1])} non-zeros")
+
+    # A few spare neighbours make up for duplicates of the tool itself
+    neighbours, similarities = top_k_similar(matrix, width, args.top_k + 2, args.block_size)
+    related = assign_related(tools, neighbours, similarities, args.top_k, args.min_similarity)
+    print(f"✓ Top-{args.top_k} neighbours in {time.perf_counter() - start:.2f}s "
+          f"(blocks of {args.block_size} rows)")
+
+    changed = 0
+    for tool, slugs in zip(tools, related):
+        if tool.get('related_tools') != slugs:
+            changed += 1
+            tool['related_tools'] = slugs
+    print(f"✓ related_tools updated on {changed} tools")
+
+    comparisons = load_comparisons(args.sitemaps)
+    live, missing = comparison_pairs(tools, neighbours[:, :args.top_k], similarities[:, :args.top_k],
+                                     comparisons, args.min_similarity)
+    print(f"✓ {len(comparisons) // 2} comparison pages in the sitemap; "
+          f"{len(live)} related pairs have one, {len(missing)} do not")
+    print("\nStrongest related pairs without a comparison page:")
+    for entry in missing[:10]:
+        print(f"  {entry['similarity']:.2f}  {entry['tools'][0]} vs {entry['tools'][1]}")
+
+    if args.dry_run:
+        print("\n⚠ Dry run: nothing written")
+        return
+
+    base, ext = os.path.splitext(args.catalogue)
+    backup = f"{base}-related-tools-backup{ext}"
+    shutil.copyfile(args.catalogue, backup)
+    _write_json(tools, args.catalogue)
+    pairs_file = args.pairs or os.path.join(os.path.dirname(args.catalogue) or '.', DEFAULT_PAIRS)
+    _write_json({
+        'catalogue': args.catalogue,
+        'sitemaps': args.sitemaps,
+        'pairs': live,
+        'missing': missing[:MISSING_REPORT]
+    }, pairs_file)
+    print(f"\n✓ Saved {args.catalogue} (backup: {backup})")
+    print(f"✓ Saved {len(live)} linkable comparison pairs to {pairs_file}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Catalogue Search Index for SiteOptz.ai
+Indexes aiToolsData.json into a SQLite file with lookups by id, slug, name,
+category, tag and pricing tier, plus an FTS5 full-text index over descriptions,
+features and use cases. Reads go through SQLite's memory-mapped I/O, so opening
+the index costs a stat of the catalogue; when the JSON changes only the tool
+records whose content changed are re-indexed. iter_tools streams the records of
+a catalogue file for tools that only need one pass over it.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+
+DEFAULT_CATALOGUE = 'public/data/aiToolsData.json'
+DEFAULT_INDEX = 'catalogue_index.db'
+INDEX_VERSION = 2
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Pricing tier by the cheapest numeric monthly price: (exclusive upper bound, tier),
+# so $25 is 25-99 and $100 is 100-plus; only a price of 0 is free
+PRICING_TIERS = [(0, 'free'), (25, 'under-25'), (100, '25-99'), (float('inf'), '100-plus')]
+CUSTOM_TIER = 'custom'  # no numeric price (e.g. "Custom", "Contact sales")
+
+NON_SLUG = re.compile(r'[^a-z0-9]+')
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+# Catalogue record accessors; tools use either the overview.* or the flat layout
+
+def tool_category(tool):
+    return (tool.get('overview') or {}).get('category') or tool.get('category') or ''
+
+def tool_description(tool):
+    overview = tool.get('overview') or {}
+    parts = [overview.get('description'), overview.get('long_description'), tool.get('description')]
+    return ' '.join(p for p in parts if isinstance(p, str))
+
+def tool_slug(tool):
+    slug = tool.get('slug') or NON_SLUG.sub('-', str(tool.get('name') or tool.get('tool_name') or '').lower())
+    return str(slug).strip('-').lower()
+
+def tool_name(tool):
+    return str(tool.get('name') or tool.get('tool_name') or '')
+
+def tool_features(tool):
+    """Feature phrases; the flat layout groups them as {'core': [...], 'advanced': [...]}"""
+    features = tool.get('features') or []
+    if isinstance(features, dict):
+        features = [f for values in features.values() if isinstance(values, list) for f in values]
+    return [f for f in features if isinstance(f, str)] if isinstance(features, list) else []
+
+def _text(value):
+    """Flatten features / use cases (strings, dicts or nested lists) into one string"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return ' '.join(_text(v) for v in value.values())
+    if isinstance(value, list):
+        return ' '.join(_text(v) for v in value)
+    return ''
+
+def starting_price(tool):
+    """Cheapest numeric monthly price, or None"""
+    pricing = tool.get('pricing')
+    if isinstance(pricing, dict):
+        candidates = [pricing.get('monthly')]
+    elif isinstance(pricing, list):
+        candidates = [plan.get('price_per_month') for plan in pricing if isinstance(plan, dict)]
+    else:
+        candidates = []
+    prices = []
+    for price in candidates:
+        if isinstance(price, str):
+            price = price.replace('$', '').replace(',', '').strip()
+            if price.lower() == 'free':
+                price = 0
+        try:
+            prices.append(float(price))
+        except (TypeError, ValueError):
+            continue
+    return min(prices) if prices else None
+
+def pricing_tier(price):
+    if price is None:
+        return CUSTOM_TIER
+    if price <= 0:
+        return PRICING_TIERS[0][1]
+    for bound, tier in PRICING_TIERS[1:]:
+        if price < bound:
+            return tier
+    return PRICING_TIERS[-1][1]
+
+def tool_tags(tool):
+    tags = tool.get('tags') or []
+    return sorted({str(tag).strip().lower() for tag in tags if str(tag).strip()})
+
+def iter_tools(filename, chunk_size=1 << 16):
+    """Stream tool records from a JSON array file without loading the whole array"""
+    decoder = json.JSONDecoder()
+    with open(filename, 'r', encoding='utf-8-sig') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{filename} is not a JSON array")
+        buffer = buffer[1:]
+        eof = False
+        while True:
+            buffer = buffer.lstrip()
+            if buffer.startswith(','):
+                buffer = buffer[1:].lstrip()
+            if buffer.startswith(']'):
+                return
+            try:
+                if not buffer:
+                    raise ValueError('need more data')
+                tool, end = decoder.raw_decode(buffer)
+            except ValueError:
+                if eof:
+                    raise ValueError(f"{filename}: truncated or invalid JSON array")
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield tool
+            buffer = buffer[end:]
+
+def record_hash(tool):
+    return hashlib.sha1(json.dumps(tool, sort_keys=True).encode('utf-8')).hexdigest()
+
+def fts_query(text):
+    """Quote every word so user input never trips FTS5 syntax; words are ANDed"""
+    return ' '.join(f'"{token}"' for token in TOKEN.findall(text))
+
+
+def connect(index_file=DEFAULT_INDEX):
+    conn = sqlite3.connect(index_file)
+    conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+    conn.execute('''CREATE TABLE IF NOT EXISTS tools (
+        rowid INTEGER PRIMARY KEY,
+        position INTEGER NOT NULL,
+        id TEXT,
+        slug TEXT,
+        name TEXT,
+        category TEXT,
+        pricing_tier TEXT,
+        starting_price REAL,
+        content_hash TEXT NOT NULL,
+        record TEXT NOT NULL
+    )''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tools_id ON tools(id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tools_slug ON tools(slug)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tools_name ON tools(name)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tools_category ON tools(category)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tools_tier ON tools(pricing_tier, starting_price)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tools_hash ON tools(content_hash)')
+    conn.execute('CREATE TABLE IF NOT EXISTS tool_tags (tool INTEGER NOT NULL, tag TEXT NOT NULL)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tool_tags_tag ON tool_tags(tag)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tool_tags_tool ON tool_tags(tool)')
+    conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS tools_fts USING fts5(
+        name, description, features, use_cases, tokenize='porter unicode61'
+    )''')
+    return conn
+
+
+def _meta(conn):
+    return dict(conn.execute('SELECT key, value FROM meta'))
+
+
+def _insert(conn, position, tool, content_hash):
+    price = starting_price(tool)
+    name = tool_name(tool)
+    cursor = conn.execute(
+        'INSERT INTO tools (position, id, slug, name, category, pricing_tier, starting_price, content_hash, record) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        (position, str(tool.get('id') or '').lower() or None, tool_slug(tool) or None, name.lower(),
+         tool_category(tool), pricing_tier(price), price, content_hash, json.dumps(tool))
+    )
+    rowid = cursor.lastrowid
+    conn.executemany('INSERT INTO tool_tags VALUES (?, ?)', [(rowid, tag) for tag in tool_tags(tool)])
+    overview = tool.get('overview') or {}
+    conn.execute('INSERT INTO tools_fts (rowid, name, description, features, use_cases) VALUES (?, ?, ?, ?, ?)',
+                 (rowid, name, tool_description(tool), _text(tool.get('features')),
+                  _text([tool.get('use_cases'), overview.get('use_cases')])))
+
+
+def _delete(conn, rowids):
+    params = [(rowid,) for rowid in rowids]
+    conn.executemany('DELETE FROM tools WHERE rowid = ?', params)
+    conn.executemany('DELETE FROM tool_tags WHERE tool = ?', params)
+    conn.executemany('DELETE FROM tools_fts WHERE rowid = ?', params)
+
+
+def refresh(conn, catalogue):
+    """Bring the index in line with the catalogue; returns (added, removed), or None if it was current"""
+    stat = os.stat(catalogue)
+    signature = json.dumps([INDEX_VERSION, os.path.abspath(catalogue), stat.st_size, stat.st_mtime_ns])
+    meta = _meta(conn)
+    if meta.get('signature') == signature:
+        return None
+
+    with open(catalogue, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    version_ok = meta.get('version') == str(INDEX_VERSION)
+    if version_ok and meta.get('digest') == digest:
+        # Touched but unchanged: just remember the new stat
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('signature', ?)", (signature,))
+        return 0, 0
+
+    tools = json.loads(raw)
+    with conn:
+        if not version_ok:
+            conn.execute('DELETE FROM tools')
+            conn.execute('DELETE FROM tool_tags')
+            conn.execute('DELETE FROM tools_fts')
+        # Unchanged records keep their rows (and FTS entries); only moves update the position
+        existing = {}
+        for rowid, position, content_hash in conn.execute('SELECT rowid, position, content_hash FROM tools'):
+            existing.setdefault(content_hash, []).append((rowid, position))
+        added = 0
+        moves = []
+        for position, tool in enumerate(tools):
+            if not isinstance(tool, dict):
+                continue
+            content_hash = record_hash(tool)
+            rows = existing.get(content_hash)
+            if rows:
+                rowid, old_position = rows.pop()
+                if old_position != position:
+                    moves.append((position, rowid))
+            else:
+                _insert(conn, position, tool, content_hash)
+                added += 1
+        conn.executemany('UPDATE tools SET position = ? WHERE rowid = ?', moves)
+        stale = [rowid for rows in existing.values() for rowid, _ in rows]
+        _delete(conn, stale)
+        conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                         [('version', str(INDEX_VERSION)), ('digest', digest), ('signature', signature),
+                          ('catalogue', os.path.abspath(catalogue))])
+    return added, len(stale)
+
+
+class CatalogueIndex:
+    """Query side of the index; every lookup returns the original tool records"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    @classmethod
+    def open(cls, catalogue=DEFAULT_CATALOGUE, index_file=DEFAULT_INDEX, update=True):
+        """Open the index, re-indexing changed catalogue records first (unless update=False)"""
+        index = cls(connect(index_file))
+        index.changes = refresh(index.conn, catalogue) if update else None
+        return index
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _records(self, sql, params=()):
+        return [json.loads(record) for record, in self.conn.execute(sql, params)]
+
+    def _first(self, sql, params):
+        row = self.conn.execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM tools').fetchone()[0]
+
+    def __iter__(self):
+        for record, in self.conn.execute('SELECT record FROM tools ORDER BY position'):
+            yield json.loads(record)
+
+    def by_id(self, tool_id):
+        return self._first('SELECT record FROM tools WHERE id = ? ORDER BY position LIMIT 1', (str(tool_id).lower(),))
+
+    def by_slug(self, slug):
+        return self._first('SELECT record FROM tools WHERE slug = ? ORDER BY position LIMIT 1', (slug.lower(),))
+
+    def by_name(self, name):
+        return self._first('SELECT record FROM tools WHERE name = ? ORDER BY position LIMIT 1', (name.lower(),))
+
+    def get(self, key, default=None):
+        """Tool whose slug or id is key (the keys tool page URLs use), like dict.get"""
+        return self.by_slug(key) or self.by_id(key) or default
+
+    def in_category(self, category):
+        return self._records('SELECT record FROM tools WHERE category = ? ORDER BY position', (category,))
+
+    def with_tag(self, tag):
+        return self._records('SELECT t.record FROM tool_tags g JOIN tools t ON t.rowid = g.tool '
+                             'WHERE g.tag = ? ORDER BY t.position', (tag.lower(),))
+
+    def in_tier(self, tier):
+        return self._records('SELECT record FROM tools WHERE pricing_tier = ? ORDER BY starting_price, position',
+                             (tier,))
+
+    def categories(self):
+        return Counter(dict(self.conn.execute('SELECT category, COUNT(*) FROM tools GROUP BY category')))
+
+    def tiers(self):
+        return Counter(dict(self.conn.execute('SELECT pricing_tier, COUNT(*) FROM tools GROUP BY pricing_tier')))
+
+    def search(self, text, limit=20, category=None):
+        """Full-text search over names, descriptions, features and use cases, best (bm25) first"""
+        query = fts_query(text)
+        if not query:
+            return []
+        sql = ('SELECT t.record FROM tools_fts f JOIN tools t ON t.rowid = f.rowid WHERE tools_fts MATCH ?'
+               + (' AND t.category = ?' if category else '') + ' ORDER BY f.rank LIMIT ?')
+        params = (query, category, limit) if category else (query, limit)
+        return self._records(sql, params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or query the aiToolsData.json search index')
+    parser.add_argument('--catalogue', default=DEFAULT_CATALOGUE)
+    parser.add_argument('--index', default=DEFAULT_INDEX)
+    parser.add_argument('--search', help='Full-text query')
+    parser.add_argument('--category', help='List tools in a category (or restrict --search to it)')
+    parser.add_argument('--tag', help='List tools with a tag')
+    parser.add_argument('--tier', choices=[tier for _, tier in PRICING_TIERS] + [CUSTOM_TIER])
+    parser.add_argument('--slug', help='Look up one tool by slug or id')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Catalogue Search Index")
+    print("=" * 60)
+
+    if not os.path.exists(args.catalogue):
+        print(f"❌ Catalogue not found: {args.catalogue}")
+        return
+
+    start = time.perf_counter()
+    with CatalogueIndex.open(args.catalogue, args.index) as index:
+        elapsed = time.perf_counter() - start
+        if index.changes is None:
+            print(f"\n✓ {args.index} is up to date ({len(index)} tools, opened in {elapsed * 1000:.1f} ms)")
+        else:
+            added, removed = index.changes
+            print(f"\n✓ Indexed {args.catalogue}: {added} records added, {removed} removed "
+                  f"({len(index)} tools, {elapsed * 1000:.1f} ms)")
+
+        if args.slug:
+            tool = index.get(args.slug)
+            print(json.dumps(tool, indent=2) if tool else f"❌ No tool with slug or id {args.slug}")
+            return
+
+        if args.search:
+            results, label = index.search(args.search, args.limit, args.category), f"Matches for '{args.search}'"
+        elif args.category:
+            results, label = index.in_category(args.category), f"Category {args.category}"
+        elif args.tag:
+            results, label = index.with_tag(args.tag), f"Tag {args.tag}"
+        elif args.tier:
+            results, label = index.in_tier(args.tier), f"Pricing tier {args.tier}"
+        else:
+            print("\nCategories:")
+            for category, count in index.categories().most_common():
+                print(f"  {count:5}  {category or '(none)'}")
+            print("\nPricing tiers:")
+            for tier, count in index.tiers().most_common():
+                print(f"  {count:5}  {tier}")
+            return
+
+        print(f"\n{label}: {len(results)} tools")
+        for tool in results[:args.limit]:
+            print(f"  • {tool_name(tool):<30} {tool_category(tool):<24} {tool_slug(tool)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Category Rules for the SiteOptz.ai Catalogue
+Loads the versioned keyword rules in public/data/category_rules.json and
+compiles them once into a matcher: every keyword goes into a single trie-shaped
+regex, so a tool's text is scanned once instead of once per keyword per rule.
+Compiled rules are cached on disk by the rules file's digest, and a running
+process reloads them when the file changes. As a script it replays the whole
+catalogue, diffs the assignments against another rules version (a file or a
+git revision), and can watch the rules file and re-diff on every save.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from catalogue_index import DEFAULT_CATALOGUE, iter_tools, tool_features, tool_name, tool_slug
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+RULES_FILE = os.path.join(ROOT, 'public', 'data', 'category_rules.json')
+CACHE_DIR = os.path.join(ROOT, '.category_rules_cache')
+COMPILER_VERSION = 1
+RELOAD_INTERVAL = 1.0
+WATCH_INTERVAL = 0.5
+SAMPLE_SIZE = 5
+
+
+class RulesError(Exception):
+    """The rules file is missing or malformed"""
+
+
+def tool_text(tool):
+    """Lower-cased name, descriptions, features and use cases: the text the rules match against"""
+    overview = tool.get('overview') or {}
+    parts = [tool.get('name') or '', overview.get('description') or '', overview.get('long_description') or '',
+             ' '.join(tool_features(tool))]
+    use_cases = ''
+    for use_case in tool.get('use_cases') or []:
+        if isinstance(use_case, dict):
+            use_cases += f" {use_case.get('title', '')} {use_case.get('description', '')}"
+        else:
+            use_cases += f" {use_case}"
+    parts.append(use_cases)
+    return ' '.join(parts).lower()
+
+
+def load_rules(path=RULES_FILE):
+    """Read and check a rules file; returns (rules dict, sha256 of its bytes)"""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except OSError as e:
+        raise RulesError(f"Cannot read {path}: {e}")
+    return parse_rules(raw, path), hashlib.sha256(raw).hexdigest()
+
+
+def parse_rules(raw, source='rules'):
+    try:
+        rules = json.loads(raw)
+    except ValueError as e:
+        raise RulesError(f"{source}: invalid JSON: {e}")
+    if not isinstance(rules, dict) or not isinstance(rules.get('version'), int):
+        raise RulesError(f"{source}: expected an object with an integer 'version'")
+    default = rules.get('default') or {}
+    if not default.get('category'):
+        raise RulesError(f"{source}: 'default' needs a category")
+    for i, rule in enumerate(rules.get('rules') or []):
+        if not rule.get('category') or not rule.get('any'):
+            raise RulesError(f"{source}: rule {i} needs a category and 'any' keywords")
+        for field in ('any', 'also', 'none'):
+            keywords = rule.get(field, [])
+            if not isinstance(keywords, list) or not all(isinstance(k, str) and k for k in keywords):
+                raise RulesError(f"{source}: rule {i} ({rule['category']}): '{field}' must be a list of keywords")
+    return rules
+
+
+def _trie_pattern(words):
+    """Regex matching the longest of words at a position, factored as a trie"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def pattern(node):
+        branches = [re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # A keyword ends here; greedily try the longer ones first
+            return f'(?:{body})?'
+        return body
+
+    return pattern(trie)
+
+
+def compile_rules(rules):
+    """Rules -> plain tables (keywords, regex source, containment lists, rules as keyword ids)"""
+    keywords = []
+    ids = {}
+
+    def keyword_ids(words):
+        for word in words:
+            word = word.lower()
+            if word not in ids:
+                ids[word] = len(keywords)
+                keywords.append(word)
+        return [ids[word.lower()] for word in words]
+
+    compiled = []
+    for rule in rules['rules']:
+        compiled.append({
+            'category': rule['category'],
+            'rationale': rule.get('rationale') or rule['category'],
+            'any': keyword_ids(rule['any']),
+            'also': keyword_ids(rule.get('also', [])),
+            'none': keyword_ids(rule.get('none', []))
+        })
+    # The regex reports the longest keyword at each position; any keyword that
+    # is present is a substring of one of those, so containment closes the set
+    contains = [[j for j, other in enumerate(keywords) if other in word] for word in keywords]
+    return {
+        'compiler': COMPILER_VERSION,
+        'version': rules['version'],
+        'keywords': keywords,
+        'pattern': f'(?=({_trie_pattern(keywords)}))',
+        'contains': contains,
+        'rules': compiled,
+        'default': {'category': rules['default']['category'],
+                    'rationale': rules['default'].get('rationale') or rules['default']['category']}
+    }
+
+
+class CategoryMatcher:
+    """Compiled rules: categorize(tool) -> (category, rationale)"""
+
+    def __init__(self, tables, digest=None):
+        self.version = tables['version']
+        self.digest = digest
+        self.keywords = tables['keywords']
+        self.regex = re.compile(tables['pattern'])
+        self.ids = {word: i for i, word in enumerate(self.keywords)}
+        self.contains = tables['contains']
+        self.rules = [(rule['category'], rule['rationale'], frozenset(rule['any']), rule['any'],
+                       frozenset(rule['also']), frozenset(rule['none'])) for rule in tables['rules']]
+        self.default = (tables['default']['category'], tables['default']['rationale'])
+
+    def present(self, text):
+        """Ids of every keyword that occurs in text (substring match, like `keyword in text`)"""
+        found = set()
+        for word in set(self.regex.findall(text)):
+            found.update(self.contains[self.ids[word]])
+        return found
+
+    def categorize_text(self, text):
+        found = self.present(text)
+        for category, rationale, any_ids, ordered, also, none in self.rules:
+            if any_ids & found and (not also or also & found) and not none & found:
+                matched = [self.keywords[i] for i in ordered if i in found]
+                return category, f"{rationale}: {matched}"
+        return self.default
+
+    def categorize(self, tool):
+        return self.categorize_text(tool_text(tool))
+
+    def category(self, tool):
+        return self.categorize(tool)[0]
+
+
+def load_matcher(path=RULES_FILE, cache_dir=CACHE_DIR):
+    """Matcher for a rules file, reusing the compiled tables cached under its digest"""
+    rules, digest = load_rules(path)
+    cache_file = os.path.join(cache_dir, f"{digest[:32]}.json")
+    tables = None
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r') as f:
+                tables = json.load(f)
+        except ValueError:
+            tables = None
+        if tables and tables.get('compiler') != COMPILER_VERSION:
+            tables = None
+    if tables is None:
+        tables = compile_rules(rules)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_name = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_name, 'w') as f:
+                json.dump(tables, f)
+            os.replace(tmp_name, cache_file)
+        except OSError:
+            pass  # a read-only checkout still works, it just recompiles
+    return CategoryMatcher(tables, digest)
+
+
+_loaded = {}
+
+
+def get_matcher(path=RULES_FILE):
+    """Shared matcher for a rules file, reloaded when the file changes (checked at most once a second)"""
+    now = time.monotonic()
+    entry = _loaded.get(path)
+    if entry and now - entry['checked'] < RELOAD_INTERVAL:
+        return entry['matcher']
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    if not entry or entry['signature'] != signature:
+        try:
+            matcher = load_matcher(path)
+        except RulesError:
+            if not entry:
+                raise
+            matcher = entry['matcher']  # a half-saved edit: keep serving the last good rules
+        entry = {'matcher': matcher, 'signature': signature}
+        _loaded[path] = entry
+    entry['checked'] = now
+    return entry['matcher']
+
+
+def baseline_matcher(baseline, rules_path=RULES_FILE):
+    """Matcher for another rules version: a rules file, or a git revision of rules_path"""
+    if os.path.exists(baseline):
+        return load_matcher(baseline)
+    relative = os.path.relpath(os.path.abspath(rules_path), ROOT)
+    result = subprocess.run(['git', 'show', f"{baseline}:{relative}"], cwd=ROOT, capture_output=True)
+    if result.returncode != 0:
+        raise RulesError(f"{baseline} is neither a rules file nor a git revision with {relative}")
+    rules = parse_rules(result.stdout, f"{baseline}:{relative}")
+    return CategoryMatcher(compile_rules(rules), hashlib.sha256(result.stdout).hexdigest())
+
+
+def replay(matcher, texts):
+    return [matcher.categorize_text(text)[0] for text in texts]
+
+
+def diff_assignments(tools, before, after):
+    """(old category, new category) -> slugs of the tools that moved"""
+    moves = {}
+    for tool, old, new in zip(tools, before, after):
+        if old != new:
+            moves.setdefault((old, new), []).append(tool_slug(tool) or tool_name(tool))
+    return moves
+
+
+def report_replay(tools, texts, matcher, baseline=None):
+    """Replay the catalogue through matcher (and baseline) and print the distribution or the moves"""
+    start = time.perf_counter()
+    after = replay(matcher, texts)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Rules v{matcher.version}: {len(tools)} tools categorized in {elapsed * 1000:.1f} ms")
+    if baseline is None:
+        for category, count in Counter(after).most_common():
+            print(f"  {count:6}  {category}")
+        return {}
+
+    before = replay(baseline, texts)
+    moves = diff_assignments(tools, before, after)
+    moved = sum(len(slugs) for slugs in moves.values())
+    print(f"✓ Against rules v{baseline.version}: {moved} of {len(tools)} tools change category")
+    for (old, new), slugs in sorted(moves.items(), key=lambda item: -len(item[1])):
+        sample = ', '.join(slugs[:SAMPLE_SIZE]) + (' ...' if len(slugs) > SAMPLE_SIZE else '')
+        print(f"  {len(slugs):6}  {old} -> {new}: {sample}")
+    return moves
+
+
+def watch(path, tools, texts, baseline=None):
+    """Recompile whenever the rules file changes and diff against the previous (or a fixed) version"""
+    print(f"\nWatching {path} (Ctrl+C to stop)")
+    previous = baseline or load_matcher(path)
+    signature = None
+    while True:
+        try:
+            stat = os.stat(path)
+            if signature is not None and (stat.st_size, stat.st_mtime_ns) != signature:
+                print(f"\n{time.strftime('%H:%M:%S')} {path} changed")
+                try:
+                    current = load_matcher(path)
+                except RulesError as e:
+                    print(f"❌ {e}")
+                else:
+                    report_replay(tools, texts, current, previous)
+                    previous = baseline or current
+            signature = (stat.st_size, stat.st_mtime_ns)
+            time.sleep(WATCH_INTERVAL)
+        except KeyboardInterrupt:
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay the catalogue through the category rules')
+    parser.add_argument('catalogue', nargs='?', default=DEFAULT_CATALOGUE)
+    parser.add_argument('--rules', default=RULES_FILE)
+    parser.add_argument('--baseline', help='Rules file or git revision to diff the assignments against')
+    parser.add_argument('--watch', action='store_true', help='Recompile and re-diff whenever the rules change')
+    parser.add_argument('--check', action='store_true', help='Exit 1 when any tool changes category')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Category Rules Regression Harness")
+    print("=" * 60)
+
+    if not os.path.exists(args.catalogue):
+        print(f"❌ Catalogue not found: {args.catalogue}")
+        sys.exit(1)
+
+    try:
+        start = time.perf_counter()
+        matcher = load_matcher(args.rules)
+        print(f"✓ Loaded rules v{matcher.version} ({len(matcher.rules)} rules, {len(matcher.keywords)} keywords) "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        baseline = baseline_matcher(args.baseline, args.rules) if args.baseline else None
+    except RulesError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    tools = [tool for tool in iter_tools(args.catalogue) if isinstance(tool, dict)]
+    texts = [tool_text(tool) for tool in tools]
+    moves = report_replay(tools, texts, matcher, baseline)
+
+    if args.watch:
+        watch(args.rules, tools, texts, baseline)
+    elif args.check and moves:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
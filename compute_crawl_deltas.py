@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Crawl-over-Crawl Delta Reports for SiteOptz.ai
+Keeps a per-issue key index (page URL + issue target + export type) in the
+crawl warehouse and, for each newly loaded export, hash-joins it against the
+open issues of the previous snapshot to produce new / fixed / persisting sets.
+Snapshots already processed are never revisited; one loaded after a newer
+snapshot was processed is recorded as skipped.
+"""
+
+import argparse
+import hashlib
+import json
+from datetime import datetime
+
+import build_crawl_warehouse
+from build_crawl_warehouse import EXPORT_TYPES, DEFAULT_DB
+
+
+def ensure_delta_tables(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS issue_keys (
+        export_type TEXT NOT NULL,
+        issue_key INTEGER NOT NULL,
+        page_url TEXT NOT NULL,
+        detail TEXT,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL,
+        last_crawl_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        PRIMARY KEY (export_type, issue_key)
+    )''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_issue_keys_open ON issue_keys(export_type, status)')
+    conn.execute('''CREATE TABLE IF NOT EXISTS delta_snapshots (
+        crawl_id INTEGER PRIMARY KEY REFERENCES crawls(id),
+        export_type TEXT NOT NULL,
+        crawl_date TEXT NOT NULL,
+        previous_crawl_id INTEGER,
+        new_count INTEGER NOT NULL,
+        fixed_count INTEGER NOT NULL,
+        persisting_count INTEGER NOT NULL,
+        computed_at TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'computed'
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS issue_deltas (
+        crawl_id INTEGER NOT NULL,
+        export_type TEXT NOT NULL,
+        issue_key INTEGER NOT NULL,
+        change TEXT NOT NULL
+    )''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_issue_deltas_crawl ON issue_deltas(crawl_id, change)')
+
+
+def issue_key(export_type, page_url, detail):
+    """Stable signed 64-bit key for one issue"""
+    digest = hashlib.blake2b(f"{export_type}\x1f{page_url}\x1f{detail}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def iter_snapshot_issues(conn, export_type, crawl_id):
+    """Yield (key, page_url, detail) for every distinct issue in one crawl"""
+    table = EXPORT_TYPES[export_type]['table']
+    # The issue target is the linked URL where there is one, else the schema field / issue text
+    rows = conn.execute(
+        f"SELECT DISTINCT page_url, COALESCE(target_url, '') || '|' || COALESCE(field, '') || '|' || COALESCE(issue, '') "
+        f"FROM {table} WHERE crawl_id = ?",
+        (crawl_id,)
+    )
+    for page_url, detail in rows:
+        yield issue_key(export_type, page_url, detail), page_url, detail
+
+
+def pending_crawls(conn):
+    """Loaded crawls without a delta yet, oldest first within each export type"""
+    return conn.execute('''
+        SELECT c.id, c.export_type, c.crawl_date FROM crawls c
+        LEFT JOIN delta_snapshots d ON d.crawl_id = c.id
+        WHERE d.crawl_id IS NULL
+        ORDER BY c.export_type, c.crawl_date, c.id
+    ''').fetchall()
+
+
+def last_snapshot(conn, export_type):
+    return conn.execute(
+        "SELECT crawl_id, crawl_date FROM delta_snapshots WHERE export_type = ? AND status = 'computed' "
+        'ORDER BY crawl_date DESC, crawl_id DESC LIMIT 1',
+        (export_type,)
+    ).fetchone()
+
+
+def record_snapshot(conn, crawl_id, export_type, crawl_date, previous, counts, status='computed'):
+    conn.execute(
+        'INSERT INTO delta_snapshots (crawl_id, export_type, crawl_date, previous_crawl_id, new_count, '
+        'fixed_count, persisting_count, computed_at, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        (crawl_id, export_type, crawl_date, previous[0] if previous else None,
+         *counts, datetime.now().isoformat(), status)
+    )
+
+
+def compute_delta(conn, crawl_id, export_type, crawl_date):
+    """Hash-join one new snapshot against the currently open issues"""
+    previous = last_snapshot(conn, export_type)
+    if previous and crawl_date < previous[1]:
+        # Recorded so later runs no longer list it as pending
+        print(f"  Skipping {export_type} {crawl_date}: older than processed snapshot {previous[1]}")
+        with conn:
+            record_snapshot(conn, crawl_id, export_type, crawl_date, previous, (0, 0, 0), 'skipped')
+        return None
+
+    # Build side: only the open issue keys, not the full history
+    open_keys = {row[0] for row in conn.execute(
+        'SELECT issue_key FROM issue_keys WHERE export_type = ? AND status = ?', (export_type, 'open'))}
+
+    # Probe side: stream the new snapshot once
+    current = {}
+    for key, page_url, detail in iter_snapshot_issues(conn, export_type, crawl_id):
+        current[key] = (page_url, detail)
+
+    new_keys = [k for k in current if k not in open_keys]
+    persisting_keys = [k for k in current if k in open_keys]
+    fixed_keys = [k for k in open_keys if k not in current]
+
+    with conn:
+        conn.executemany(
+            'INSERT INTO issue_keys (export_type, issue_key, page_url, detail, first_seen, last_seen, last_crawl_id, status) '
+            "VALUES (?, ?, ?, ?, ?, ?, ?, 'open') "
+            "ON CONFLICT (export_type, issue_key) DO UPDATE SET last_seen = excluded.last_seen, "
+            "last_crawl_id = excluded.last_crawl_id, status = 'open'",
+            ((export_type, k, page_url, detail, crawl_date, crawl_date, crawl_id)
+             for k, (page_url, detail) in current.items())
+        )
+        conn.executemany(
+            "UPDATE issue_keys SET status = 'fixed' WHERE export_type = ? AND issue_key = ?",
+            ((export_type, k) for k in fixed_keys)
+        )
+        for change, keys in (('new', new_keys), ('fixed', fixed_keys), ('persisting', persisting_keys)):
+            conn.executemany(
+                'INSERT INTO issue_deltas (crawl_id, export_type, issue_key, change) VALUES (?, ?, ?, ?)',
+                ((crawl_id, export_type, k, change) for k in keys)
+            )
+        record_snapshot(conn, crawl_id, export_type, crawl_date, previous,
+                        (len(new_keys), len(fixed_keys), len(persisting_keys)))
+
+    return len(new_keys), len(fixed_keys), len(persisting_keys)
+
+
+def delta_report(conn, samples=10):
+    """Latest delta per export type with sample pages for dashboards"""
+    report = {}
+    for export_type in EXPORT_TYPES:
+        snapshot = conn.execute(
+            'SELECT crawl_id, crawl_date, previous_crawl_id, new_count, fixed_count, persisting_count '
+            "FROM delta_snapshots WHERE export_type = ? AND status = 'computed' "
+            'ORDER BY crawl_date DESC, crawl_id DESC LIMIT 1',
+            (export_type,)
+        ).fetchone()
+        if not snapshot:
+            continue
+        crawl_id, crawl_date, previous_crawl_id, new_count, fixed_count, persisting_count = snapshot
+        entry = {
+            'crawl_date': crawl_date,
+            'baseline': previous_crawl_id is None,
+            'new': new_count,
+            'fixed': fixed_count,
+            'persisting': persisting_count
+        }
+        for change in ('new', 'fixed'):
+            entry[f'sample_{change}'] = [
+                {'page_url': page_url, 'detail': detail.strip('|')}
+                for page_url, detail in conn.execute(
+                    'SELECT k.page_url, k.detail FROM issue_deltas d '
+                    'JOIN issue_keys k ON k.export_type = d.export_type AND k.issue_key = d.issue_key '
+                    'WHERE d.crawl_id = ? AND d.change = ? LIMIT ?',
+                    (crawl_id, change, samples)
+                )
+            ]
+        report[export_type] = entry
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute crawl-over-crawl issue deltas')
+    parser.add_argument('files', nargs='*', help='New export CSVs to load before computing deltas')
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--output', default='crawl_deltas.json')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Computing Crawl-over-Crawl Deltas")
+    print("=" * 60)
+
+    conn = build_crawl_warehouse.connect(args.db)
+    ensure_delta_tables(conn)
+
+    for filename in args.files:
+        if build_crawl_warehouse.load_export(conn, filename):
+            print(f"  ✓ Loaded {filename}")
+
+    pending = pending_crawls(conn)
+    print(f"\n{len(pending)} snapshots to process")
+    for crawl_id, export_type, crawl_date in pending:
+        counts = compute_delta(conn, crawl_id, export_type, crawl_date)
+        if counts:
+            new_count, fixed_count, persisting_count = counts
+            print(f"  • {export_type} {crawl_date}: +{new_count} new, -{fixed_count} fixed, {persisting_count} persisting")
+
+    report = delta_report(conn)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Saved latest deltas to {args.output}")
+
+    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -2,104 +2,143 @@
 """
 Script to convert the Google Ads API Design Document to various formats
 Requires: pip install markdown pypandoc reportlab python-docx
+
+Outputs are only regenerated when the source or the converter options change
+(see doc_build_cache); the PDF, DOCX and RTF targets are all written from one
+pandoc JSON AST instead of each re-parsing the markdown. Dependency checks are
+cached and markdown is imported only when HTML is actually rebuilt. Pandoc
+conversions go through pandoc_backend, which keeps one warm `pandoc server`
+for the whole run, and the PDF is typeset from LaTeX cached beside the AST.
 """
 
+import argparse
 import os
-import subprocess
-import sys
-from pathlib import Path
-
-def install_requirements():
-    """Install required packages"""
-    packages = [
-        'markdown',
-        'pypandoc',
-        'reportlab',
-        'python-docx'
-    ]
-    
-    for package in packages:
-        try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
-            print(f"Installing {package}...")
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
+import time
+from html import escape
 
-def convert_to_pdf():
-    """Convert markdown to PDF using pandoc"""
-    try:
-        # Check if pandoc is installed
-        subprocess.run(['pandoc', '--version'], capture_output=True, check=True)
-        
-        # Convert to PDF
-        cmd = [
-            'pandoc',
-            'GOOGLE_ADS_API_DESIGN_DOCUMENT.md',
-            '-o',
-            'Google_Ads_API_Design_Document.pdf',
-            '--pdf-engine=xelatex',
-            '--variable', 'geometry:margin=1in',
-            '--variable', 'fontsize=11pt',
-            '--variable', 'documentclass=article',
-            '--toc',
-            '--number-sections'
-        ]
-        
-        subprocess.run(cmd, check=True)
-        print("✅ PDF created: Google_Ads_API_Design_Document.pdf")
-        
-    except subprocess.CalledProcessError:
-        print("❌ Pandoc not found. Please install pandoc: https://pandoc.org/installing.html")
-    except FileNotFoundError:
-        print("❌ Pandoc not found. Please install pandoc: https://pandoc.org/installing.html")
+from doc_build_cache import BuildCache, build_key, file_digest
+from doc_dependencies import check_dependencies, lazy_import, report_startup
+from pandoc_backend import PandocCommand, PandocError, open_backend, render_pdf
 
-def convert_to_docx():
-    """Convert markdown to DOCX using pandoc"""
-    try:
-        cmd = [
-            'pandoc',
-            'GOOGLE_ADS_API_DESIGN_DOCUMENT.md',
-            '-o',
-            'Google_Ads_API_Design_Document.docx',
-            '--toc',
-            '--number-sections'
-        ]
-        
-        subprocess.run(cmd, check=True)
-        print("✅ DOCX created: Google_Ads_API_Design_Document.docx")
-        
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("❌ Pandoc not found. Please install pandoc: https://pandoc.org/installing.html")
+STARTED = time.perf_counter()
+
+SOURCE = 'GOOGLE_ADS_API_DESIGN_DOCUMENT.md'
+OUTPUT_BASE = 'Google_Ads_API_Design_Document'
+
+# Converter options per target; part of each output's cache key
+HTML_EXTENSIONS = ['toc', 'tables', 'codehilite', 'fenced_code']
+PANDOC_FROM = 'markdown'
+PANDOC_READER = ['-f', PANDOC_FROM]
+PANDOC_OPTIONS = {
+    'pdf': [
+        '--pdf-engine=xelatex',
+        '--variable', 'geometry:margin=1in',
+        '--variable', 'fontsize=11pt',
+        '--variable', 'documentclass=article',
+        '--toc',
+        '--number-sections'
+    ],
+    'docx': ['--toc', '--number-sections'],
+    'rtf': ['--standalone', '--toc', '--number-sections']
+}
+# The PDF is typeset from standalone LaTeX: the engine runs locally, the rest goes to pandoc
+PDF_ENGINE = next(arg.split('=', 1)[1] for arg in PANDOC_OPTIONS['pdf'] if arg.startswith('--pdf-engine='))
+LATEX_OPTIONS = ['--standalone'] + [arg for arg in PANDOC_OPTIONS['pdf'] if not arg.startswith('--pdf-engine=')]
+PANDOC_LABELS = {'pdf': 'PDF', 'docx': 'DOCX', 'rtf': 'RTF'}
+FORMATS = ('html', 'pdf', 'docx', 'rtf')
+
+# Python modules each target needs; PDF, DOCX and RTF need the pandoc binary instead
+REQUIREMENTS = {'html': ['markdown']}
+
+def install_requirements(formats=FORMATS):
+    """Check the selected formats' dependencies (cached across runs), pip-installing missing modules"""
+    modules = sorted({module for fmt in formats for module in REQUIREMENTS.get(fmt, [])})
+    return check_dependencies(modules, pandoc=any(fmt in PANDOC_OPTIONS for fmt in formats), install=True)
+
+def pandoc_version():
+    """First line of `pandoc --version`, or None when pandoc is not installed"""
+    entry = check_dependencies(pandoc=True)['pandoc']
+    return entry['version'] if entry else None
+
+def pandoc_ast_key(source_digest, version):
+    return build_key(source_digest, 'pandoc-json', [version] + PANDOC_READER)
+
+def pandoc_latex_key(source_digest, version):
+    return build_key(source_digest, 'pandoc-latex', [version] + PANDOC_READER + LATEX_OPTIONS)
+
+def _write_atomic(path, data):
+    tmp_name = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_name, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_name, path)
 
-def convert_to_rtf():
-    """Convert markdown to RTF using pandoc"""
+def write_pandoc_ast(source, ast_path, backend=None):
+    """Parse markdown into pandoc's JSON AST (atomic, safe to run from several processes)"""
+    backend = backend or PandocCommand()
+    with open(source, 'r', encoding='utf-8') as f:
+        _write_atomic(ast_path, backend.convert(f.read(), PANDOC_FROM, 'json'))
+
+def pandoc_ast(source, cache, source_digest, version, backend=None):
+    """Parse the markdown once into pandoc's JSON AST, stored in the cache by content"""
+    ast_path = cache.object_path(pandoc_ast_key(source_digest, version), '.json')
+    if not os.path.exists(ast_path):
+        write_pandoc_ast(source, ast_path, backend)
+    return ast_path
+
+def run_pandoc(fmt, ast_path, output, backend=None, latex_path=None):
+    """Write one target from a JSON AST; raises PandocError on failure.
+
+    For PDF the intermediate LaTeX is kept at latex_path (when given), so a later
+    PDF rebuild from the same AST only reruns the LaTeX engine.
+    """
+    backend = backend or PandocCommand()
+    with open(ast_path, 'r', encoding='utf-8') as f:
+        ast = f.read()
+    if fmt != 'pdf':
+        _write_atomic(output, backend.convert(ast, 'json', fmt, PANDOC_OPTIONS[fmt]))
+        return
+    if latex_path and os.path.exists(latex_path):
+        with open(latex_path, 'rb') as f:
+            latex = f.read()
+    else:
+        latex = backend.convert(ast, 'json', 'latex', LATEX_OPTIONS)
+        if latex_path:
+            _write_atomic(latex_path, latex)
+    render_pdf(latex, output, PDF_ENGINE)
+
+def convert_with_pandoc(fmt, ast_path, output, backend=None, latex_path=None):
+    """Write one target from the shared JSON AST"""
     try:
-        cmd = [
-            'pandoc',
-            'GOOGLE_ADS_API_DESIGN_DOCUMENT.md',
-            '-o',
-            'Google_Ads_API_Design_Document.rtf',
-            '--toc',
-            '--number-sections'
-        ]
-        
-        subprocess.run(cmd, check=True)
-        print("✅ RTF created: Google_Ads_API_Design_Document.rtf")
-        
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("❌ Pandoc not found. Please install pandoc: https://pandoc.org/installing.html")
+        run_pandoc(fmt, ast_path, output, backend, latex_path)
+        print(f"✅ {PANDOC_LABELS[fmt]} created: {output}")
+    except (PandocError, OSError) as e:
+        print(f"❌ {PANDOC_LABELS[fmt]} conversion failed: {e}")
+
+def convert_to_pdf(ast_path, output=f'{OUTPUT_BASE}.pdf', backend=None, latex_path=None):
+    """Convert the pandoc AST to PDF (xelatex)"""
+    convert_with_pandoc('pdf', ast_path, output, backend, latex_path)
 
-def create_html_version():
+def convert_to_docx(ast_path, output=f'{OUTPUT_BASE}.docx', backend=None, latex_path=None):
+    """Convert the pandoc AST to DOCX"""
+    convert_with_pandoc('docx', ast_path, output, backend, latex_path)
+
+def convert_to_rtf(ast_path, output=f'{OUTPUT_BASE}.rtf', backend=None, latex_path=None):
+    """Convert the pandoc AST to RTF"""
+    convert_with_pandoc('rtf', ast_path, output, backend, latex_path)
+
+PANDOC_CONVERTERS = {'pdf': convert_to_pdf, 'docx': convert_to_docx, 'rtf': convert_to_rtf}
+
+def create_html_version(source=SOURCE, output=f'{OUTPUT_BASE}.html', title='Google Ads API Design Document'):
     """Create an HTML version for easy viewing"""
-    import markdown
+    markdown = lazy_import('markdown')
     
-    with open('GOOGLE_ADS_API_DESIGN_DOCUMENT.md', 'r', encoding='utf-8') as f:
+    with open(source, 'r', encoding='utf-8') as f:
         md_content = f.read()
     
     # Convert to HTML
     html = markdown.markdown(
         md_content, 
-        extensions=['toc', 'tables', 'codehilite', 'fenced_code']
+        extensions=HTML_EXTENSIONS
     )
     
     # Create full HTML document
@@ -108,7 +147,7 @@ def create_html_version():
     <html>
     <head>
         <meta charset="utf-8">
-        <title>Google Ads API Design Document</title>
+        <title>{escape(title)}</title>
         <style>
             body {{ font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px; line-height: 1.6; }}
             h1 {{ color: #1a73e8; border-bottom: 2px solid #1a73e8; padding-bottom: 10px; }}
@@ -128,52 +167,95 @@ def create_html_version():
     </html>
     """
     
-    with open('Google_Ads_API_Design_Document.html', 'w', encoding='utf-8') as f:
+    with open(output, 'w', encoding='utf-8') as f:
         f.write(full_html)
     
-    print("✅ HTML created: Google_Ads_API_Design_Document.html")
+    print(f"✅ HTML created: {output}")
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description='Convert the design document to HTML, PDF, DOCX and RTF')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='Comma-separated subset of html,pdf,docx,rtf')
+    parser.add_argument('--force', action='store_true', help='Rebuild every output even if it is up to date')
+    parser.add_argument('--startup-metrics', action='store_true', help='Report startup and import timings')
+    args = parser.parse_args()
+    formats = [fmt for fmt in FORMATS if fmt in args.formats.split(',')]
+
     print("🚀 Converting Google Ads API Design Document...")
     print("=" * 50)
     
     # Check if source file exists
-    if not os.path.exists('GOOGLE_ADS_API_DESIGN_DOCUMENT.md'):
-        print("❌ Source file not found: GOOGLE_ADS_API_DESIGN_DOCUMENT.md")
+    if not os.path.exists(SOURCE):
+        print(f"❌ Source file not found: {SOURCE}")
         return
     
-    # Install requirements
+    # Install requirements (probed once, then served from the dependency cache)
     try:
-        install_requirements()
+        dependencies = install_requirements(formats)
     except Exception as e:
         print(f"❌ Error installing requirements: {e}")
         return
     
+    cache = BuildCache(force=args.force)
+    source_digest = file_digest(SOURCE)
+    # The converter script itself is an input: changing it invalidates its outputs
+    tool_digest = file_digest(__file__)
+    first_work = time.perf_counter()
+    
     # Create HTML version (always works)
-    create_html_version()
+    if 'html' in formats:
+        html_key = build_key(source_digest, 'markdown-html',
+                             [dependencies['markdown']['version'], tool_digest] + HTML_EXTENSIONS)
+        if not cache.build(f'{OUTPUT_BASE}.html', html_key, create_html_version):
+            print(f"⏭  HTML up to date: {OUTPUT_BASE}.html")
     
-    # Try to convert to other formats
-    convert_to_pdf()
-    convert_to_docx()
-    convert_to_rtf()
+    # Try to convert to other formats, all from one parse of the source
+    pandoc_formats = [fmt for fmt in formats if fmt in PANDOC_OPTIONS]
+    version = dependencies['pandoc']['version'] if dependencies.get('pandoc') else None
+    if pandoc_formats and version is None:
+        print("❌ Pandoc not found. Please install pandoc: https://pandoc.org/installing.html")
+    elif pandoc_formats:
+        backend, ast_path = None, None
+        try:
+            for fmt in pandoc_formats:
+                convert = PANDOC_CONVERTERS[fmt]
+                output = f'{OUTPUT_BASE}.{fmt}'
+                key = build_key(source_digest, f'pandoc-{fmt}', [version, tool_digest] + PANDOC_READER + PANDOC_OPTIONS[fmt])
+                if cache.fresh(output, key):
+                    cache.hits += 1
+                    print(f"⏭  {PANDOC_LABELS[fmt]} up to date: {output}")
+                    continue
+                if backend is None:
+                    backend = open_backend()
+                    mode = f"pandoc server on port {backend.port}" if backend.warm else "one pandoc process per format"
+                    print(f"⚙  Converting with {mode}")
+                try:
+                    ast_path = ast_path or pandoc_ast(SOURCE, cache, source_digest, version, backend)
+                except (PandocError, OSError) as e:
+                    print(f"❌ Could not parse {SOURCE} with pandoc: {e}")
+                    break
+                latex_path = cache.object_path(pandoc_latex_key(source_digest, version), '.tex')
+                cache.build(output, key, lambda: convert(ast_path, output, backend, latex_path))
+        finally:
+            if backend is not None:
+                backend.close()
+    cache.save()
     
     print("=" * 50)
     print("✅ Document conversion complete!")
+    print(f"   Rebuilt {cache.misses} outputs, {cache.hits} already up to date")
     print("\nGenerated files:")
     
-    files = [
-        'Google_Ads_API_Design_Document.html',
-        'Google_Ads_API_Design_Document.pdf',
-        'Google_Ads_API_Design_Document.docx',
-        'Google_Ads_API_Design_Document.rtf'
-    ]
+    files = [f'{OUTPUT_BASE}.{ext}' for ext in formats]
     
     for file in files:
         if os.path.exists(file):
             size = os.path.getsize(file) / 1024  # KB
             print(f"  📄 {file} ({size:.1f} KB)")
     
+    if args.startup_metrics:
+        report_startup(STARTED, first_work)
+    
     print("\n📝 Note: PDF, DOCX, and RTF conversion requires pandoc.")
     print("   If those files weren't created, install pandoc from: https://pandoc.org/installing.html")
 
@@ -1,145 +1,214 @@
 #!/usr/bin/env python3
 """
 Create document formats for Google Ads API Design Document
+The markdown is parsed once into a stream of block events (markdown_events);
+the DOCX, RTF and PDF writers consume the same stream side by side, with
+tables, fenced code, nested lists and inline formatting preserved. Each output
+is skipped when its cache key (source hash + writer) matches the last build.
+python-docx, reportlab and markdown are imported only by the writer that needs
+them, so a single-format run never pays for the others.
 """
 
+import argparse
 import os
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
-import markdown
+import time
+from html import escape
 
-def create_docx():
-    """Create DOCX version"""
-    try:
-        # Read markdown content
-        with open('GOOGLE_ADS_API_DESIGN_DOCUMENT.md', 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Create new document
-        doc = Document()
+from doc_build_cache import BuildCache, build_key, file_digest
+from doc_dependencies import check_dependencies, lazy_import, report_startup
+import markdown_events
+from markdown_events import CodeBlock, Heading, ListItem, Paragraph, Quote, Rule, Table, iter_events
+
+STARTED = time.perf_counter()
+
+SOURCE = 'GOOGLE_ADS_API_DESIGN_DOCUMENT.md'
+OUTPUT_BASE = 'Google_Ads_API_Design_Document'
+HTML_EXTENSIONS = ['toc', 'tables', 'codehilite']
+
+# Front matter placed before the body in DOCX and PDF output
+DOC_TITLE = 'Marketing ROI Tool - Google Ads API Integration Design Document'
+DOC_INFO = [
+    'Document Version: 1.0',
+    'Date: January 2025',
+    'Company: SiteOptz.ai',
+    'Contact: [Your Contact Information]'
+]
+HTML_TITLE = 'Google Ads API Design Document'
+FORMATS = ('html', 'docx', 'rtf', 'pdf')
+
+# Modules each format imports (checked once and cached by doc_dependencies)
+REQUIREMENTS = {'html': ['markdown'], 'docx': ['docx'], 'rtf': [], 'pdf': ['reportlab']}
+
+# Writers: each consumes the block events from markdown_events one at a time
+
+class DocxWriter:
+    """python-docx writer"""
+    label = 'DOCX'
+
+    def __init__(self, output, title=DOC_TITLE, info=DOC_INFO):
+        self.output = output
+        self.Pt = lazy_import('docx.shared').Pt
+        self.doc = lazy_import('docx').Document()
         
         # Add title
-        title = doc.add_heading('Marketing ROI Tool - Google Ads API Integration Design Document', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        heading = self.doc.add_heading(title, 0)
+        heading.alignment = lazy_import('docx.enum.text').WD_ALIGN_PARAGRAPH.CENTER
         
         # Add document info
-        doc.add_paragraph('Document Version: 1.0')
-        doc.add_paragraph('Date: January 2025')
-        doc.add_paragraph('Company: SiteOptz.ai')
-        doc.add_paragraph('Contact: [Your Contact Information]')
-        doc.add_paragraph('')
-        
-        # Process content
-        lines = content.split('\n')
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            if not line:
-                doc.add_paragraph('')
-                continue
-                
-            # Handle headers
-            if line.startswith('# '):
-                doc.add_heading(line[2:], level=1)
-            elif line.startswith('## '):
-                doc.add_heading(line[3:], level=2)
-            elif line.startswith('### '):
-                doc.add_heading(line[4:], level=3)
-            elif line.startswith('#### '):
-                doc.add_heading(line[5:], level=4)
-            elif line.startswith('- '):
-                # Bullet point
-                p = doc.add_paragraph(line[2:], style='List Bullet')
-            elif line.startswith('**') and line.endswith('**'):
-                # Bold text
-                p = doc.add_paragraph(line[2:-2])
-                p.runs[0].bold = True
-            elif line.startswith('```'):
-                # Code block
-                continue  # Skip code block markers for now
-            else:
-                # Regular paragraph
-                doc.add_paragraph(line)
-        
-        # Save document
-        doc.save('Google_Ads_API_Design_Document.docx')
-        print("✅ DOCX created: Google_Ads_API_Design_Document.docx")
-        
-    except Exception as e:
-        print(f"❌ Error creating DOCX: {e}")
+        for line in info:
+            self.doc.add_paragraph(line)
+        self.doc.add_paragraph('')
 
-def create_rtf():
-    """Create RTF version"""
-    try:
-        # Read markdown content
-        with open('GOOGLE_ADS_API_DESIGN_DOCUMENT.md', 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Convert to HTML first
-        html = markdown.markdown(content)
-        
-        # Basic RTF conversion
-        rtf_content = f"""{{\\rtf1\\ansi\\deff0 {{
-\\fonttbl {{\\f0 Times New Roman;}}
-\\colortbl;\\red0\\green0\\blue0;
-\\margl1440\\margr1440\\margt1440\\margb1440
+    def _runs(self, paragraph, spans):
+        for span in spans:
+            run = paragraph.add_run(span.text)
+            run.bold = span.bold or None
+            run.italic = span.italic or None
+            if span.code:
+                run.font.name = 'Courier New'
+            if span.href:
+                run.underline = True
 
-\\f0\\fs24
-"""
-        
-        # Simple HTML to RTF conversion
-        lines = content.split('\n')
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith('# '):
-                rtf_content += f"\\b {line[2:]}\\b0\\par\\par\n"
-            elif line.startswith('## '):
-                rtf_content += f"\\b {line[3:]}\\b0\\par\\par\n"
-            elif line.startswith('### '):
-                rtf_content += f"\\b {line[4:]}\\b0\\par\n"
-            elif line.startswith('- '):
-                rtf_content += f"\\bullet {line[2:]}\\par\n"
-            elif line.startswith('**') and line.endswith('**'):
-                rtf_content += f"\\b {line[2:-2]}\\b0\\par\n"
-            elif line:
-                rtf_content += f"{line}\\par\n"
+    def write(self, event):
+        kind = type(event)
+        if kind is Heading:
+            self._runs(self.doc.add_heading('', level=min(event.level, 9)), event.inlines)
+        elif kind is Paragraph:
+            self._runs(self.doc.add_paragraph(), event.inlines)
+        elif kind is ListItem:
+            style = 'List Number' if event.number is not None else 'List Bullet'
+            if event.depth:
+                style += f' {min(event.depth + 1, 3)}'
+            self._runs(self.doc.add_paragraph(style=style), event.inlines)
+        elif kind is CodeBlock:
+            paragraph = self.doc.add_paragraph()
+            if event.depth is not None:
+                paragraph.paragraph_format.left_indent = self.Pt(18 * (event.depth + 1))
+            run = paragraph.add_run(event.text)
+            run.font.name = 'Courier New'
+            run.font.size = self.Pt(9)
+        elif kind is Table:
+            columns = max([len(event.header)] + [len(row) for row in event.rows])
+            table = self.doc.add_table(rows=1 + len(event.rows), cols=columns)
+            table.style = 'Table Grid'
+            for r, row in enumerate([event.header] + event.rows):
+                for c, cell in enumerate(row[:columns]):
+                    paragraph = table.cell(r, c).paragraphs[0]
+                    self._runs(paragraph, [s._replace(bold=True) for s in cell] if r == 0 else cell)
+        elif kind is Quote:
+            self._runs(self.doc.add_paragraph(style='Quote'), event.inlines)
+        elif kind is Rule:
+            self.doc.add_paragraph('')
+
+    def close(self):
+        self.doc.save(self.output)
+
+    def abort(self):
+        """Drop the document; nothing has been written yet"""
+        self.doc = None
+
+
+def _rtf_escape(text):
+    """Escape RTF control characters; non-ASCII becomes \\uN? escapes"""
+    out = []
+    for c in text:
+        if c in '\\{}':
+            out.append('\\' + c)
+        elif ord(c) < 128:
+            out.append(c)
+        else:
+            code = ord(c)
+            if code > 0xFFFF:
+                # RTF \u takes a signed 16-bit value: write astral characters as surrogate pairs
+                code -= 0x10000
+                pairs = (0xD800 + (code >> 10), 0xDC00 + (code & 0x3FF))
             else:
-                rtf_content += "\\par\n"
-        
-        rtf_content += "}"
-        
-        # Save RTF file
-        with open('Google_Ads_API_Design_Document.rtf', 'w', encoding='utf-8') as f:
-            f.write(rtf_content)
-        
-        print("✅ RTF created: Google_Ads_API_Design_Document.rtf")
-        
-    except Exception as e:
-        print(f"❌ Error creating RTF: {e}")
+                pairs = (code,)
+            out.extend(f"\\u{p - 65536 if p > 32767 else p}?" for p in pairs)
+    return ''.join(out)
 
-def create_simple_pdf():
-    """Create a simple PDF version using basic formatting"""
-    try:
+
+class RtfWriter:
+    """Streaming RTF writer: each event is written to disk as it arrives"""
+    label = 'RTF'
+    HEADING_SIZES = {1: 36, 2: 32, 3: 28}
+
+    def __init__(self, output, title=None, info=()):
+        self.output = output
+        self.tmp_name = output + '.tmp'
+        self.out = open(self.tmp_name, 'w', encoding='ascii')
+        self.out.write("{\\rtf1\\ansi\\deff0 {\\fonttbl {\\f0 Times New Roman;}{\\f1 Courier New;}}\n"
+                       "{\\colortbl;\\red0\\green0\\blue0;\\red26\\green115\\blue232;}\n"
+                       "\\margl1440\\margr1440\\margt1440\\margb1440\n\\f0\\fs24\n")
+
+    def _runs(self, spans):
+        parts = []
+        for span in spans:
+            codes = ''.join(code for flag, code in ((span.bold, '\\b'), (span.italic, '\\i'),
+                                                    (span.code, '\\f1'), (span.href, '\\cf2\\ul')) if flag)
+            text = _rtf_escape(span.text)
+            parts.append(f"{{{codes} {text}}}" if codes else text)
+        return ''.join(parts)
+
+    def write(self, event):
+        kind = type(event)
+        if kind is Heading:
+            size = self.HEADING_SIZES.get(event.level, 24)
+            self.out.write(f"{{\\pard\\sb240\\sa120\\keepn\\b\\fs{size} {self._runs(event.inlines)}\\par}}\n")
+        elif kind is Paragraph:
+            self.out.write(f"{{\\pard\\sa120 {self._runs(event.inlines)}\\par}}\n")
+        elif kind is ListItem:
+            indent = 360 * (event.depth + 1)
+            marker = f"{event.number}." if event.number is not None else '\\bullet'
+            self.out.write(f"{{\\pard\\li{indent}\\fi-240\\sa60 {marker}\\tab {self._runs(event.inlines)}\\par}}\n")
+        elif kind is CodeBlock:
+            lines = '\\line '.join(_rtf_escape(line) for line in event.text.split('\n'))
+            indent = 360 if event.depth is None else 360 * (event.depth + 2)
+            self.out.write(f"{{\\pard\\li{indent}\\sa120\\f1\\fs18 {lines}\\par}}\n")
+        elif kind is Table:
+            columns = max([len(event.header)] + [len(row) for row in event.rows])
+            width = 9360 // max(columns, 1)
+            cells = ''.join(f"\\clbrdrt\\brdrs\\clbrdrl\\brdrs\\clbrdrb\\brdrs\\clbrdrr\\brdrs\\cellx{width * (i + 1)}"
+                            for i in range(columns))
+            for r, row in enumerate([event.header] + event.rows):
+                row = row + [[]] * (columns - len(row))
+                bold = '\\b ' if r == 0 else ''
+                content = ''.join(f"\\pard\\intbl {bold}{self._runs(cell)}\\cell " for cell in row[:columns])
+                self.out.write(f"{{\\trowd\\trgaph108{cells}\n{content}\\row}}\n")
+            self.out.write("\\pard\\par\n")
+        elif kind is Quote:
+            self.out.write(f"{{\\pard\\li720\\sa120\\i {self._runs(event.inlines)}\\par}}\n")
+        elif kind is Rule:
+            self.out.write("{\\pard\\brdrb\\brdrs\\brdrw10\\brsp20 \\par}\n")
+
+    def close(self):
+        self.out.write("}")
+        self.out.close()
+        os.replace(self.tmp_name, self.output)
+
+    def abort(self):
+        """Close and remove the partial file, leaving any previous output in place"""
+        self.out.close()
+        if os.path.exists(self.tmp_name):
+            os.remove(self.tmp_name)
+
+
+class PdfWriter:
+    """reportlab writer"""
+    label = 'PDF'
+
+    def __init__(self, output, title=DOC_TITLE, info=DOC_INFO):
+        lazy_import('reportlab.platypus')
         from reportlab.lib.pagesizes import letter
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        from reportlab.platypus import SimpleDocTemplate
         from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        
-        # Read markdown content
-        with open('GOOGLE_ADS_API_DESIGN_DOCUMENT.md', 'r', encoding='utf-8') as f:
-            content = f.read()
         
-        # Create PDF
-        doc = SimpleDocTemplate("Google_Ads_API_Design_Document.pdf", pagesize=letter)
-        styles = getSampleStyleSheet()
+        self.output = output
+        self.doc = SimpleDocTemplate(output, pagesize=letter)
+        self.styles = styles = getSampleStyleSheet()
         
         # Custom styles
-        title_style = ParagraphStyle(
+        self.title_style = ParagraphStyle(
             'CustomTitle',
             parent=styles['Heading1'],
             fontSize=16,
@@ -147,77 +216,171 @@ def create_simple_pdf():
             alignment=1  # Center
         )
         
-        heading_style = ParagraphStyle(
+        self.heading_style = ParagraphStyle(
             'CustomHeading',
             parent=styles['Heading2'],
             fontSize=14,
             spaceAfter=8
         )
+        self.list_styles = {}
+        self.code_styles = {}
+        self.quote_style = ParagraphStyle('Quote', parent=styles['Normal'], leftIndent=24,
+                                          fontName='Times-Italic')
         
-        # Build content
-        story = []
-        
-        # Title
-        story.append(Paragraph("Marketing ROI Tool - Google Ads API Integration Design Document", title_style))
-        story.append(Spacer(1, 12))
-        
-        # Document info
-        story.append(Paragraph("Document Version: 1.0", styles['Normal']))
-        story.append(Paragraph("Date: January 2025", styles['Normal']))
-        story.append(Paragraph("Company: SiteOptz.ai", styles['Normal']))
-        story.append(Paragraph("Contact: [Your Contact Information]", styles['Normal']))
-        story.append(Spacer(1, 12))
-        
-        # Process content
-        lines = content.split('\n')
-        for line in lines:
-            line = line.strip()
-            
-            if not line:
-                story.append(Spacer(1, 6))
-                continue
-                
-            if line.startswith('# '):
-                story.append(Paragraph(line[2:], title_style))
-            elif line.startswith('## '):
-                story.append(Paragraph(line[3:], heading_style))
-            elif line.startswith('### '):
-                story.append(Paragraph(line[4:], styles['Heading3']))
-            elif line.startswith('- '):
-                story.append(Paragraph(f"• {line[2:]}", styles['Normal']))
-            elif line.startswith('**') and line.endswith('**'):
-                story.append(Paragraph(f"<b>{line[2:-2]}</b>", styles['Normal']))
-            else:
-                story.append(Paragraph(line, styles['Normal']))
-        
-        # Build PDF
-        doc.build(story)
-        print("✅ PDF created: Google_Ads_API_Design_Document.pdf")
-        
-    except Exception as e:
-        print(f"❌ Error creating PDF: {e}")
+        # Title and document info
+        self.story = [self._paragraph(escape(title, quote=False), self.title_style), self._spacer(12)]
+        for line in info:
+            self.story.append(self._paragraph(escape(line, quote=False), styles['Normal']))
+        self.story.append(self._spacer(12))
+
+    def _paragraph(self, markup, style, bullet=None):
+        from reportlab.platypus import Paragraph
+        return Paragraph(markup, style, bulletText=bullet)
+
+    def _spacer(self, height):
+        from reportlab.platypus import Spacer
+        return Spacer(1, height)
+
+    def _markup(self, spans):
+        """reportlab paragraph mini-markup for a list of spans"""
+        parts = []
+        for span in spans:
+            text = escape(span.text, quote=False)
+            if span.code:
+                text = f'<font face="Courier">{text}</font>'
+            if span.italic:
+                text = f'<i>{text}</i>'
+            if span.bold:
+                text = f'<b>{text}</b>'
+            if span.href:
+                text = f'<link href="{escape(span.href)}" color="blue">{text}</link>'
+            parts.append(text)
+        return ''.join(parts)
+
+    def _list_style(self, depth):
+        from reportlab.lib.styles import ParagraphStyle
+        if depth not in self.list_styles:
+            self.list_styles[depth] = ParagraphStyle(f'List{depth}', parent=self.styles['Normal'],
+                                                     leftIndent=18 * (depth + 1), bulletIndent=18 * depth + 6)
+        return self.list_styles[depth]
+
+    def _code_style(self, depth):
+        from reportlab.lib.styles import ParagraphStyle
+        if depth is None:
+            return self.styles['Code']
+        if depth not in self.code_styles:
+            self.code_styles[depth] = ParagraphStyle(f'Code{depth}', parent=self.styles['Code'],
+                                                     leftIndent=18 * (depth + 1))
+        return self.code_styles[depth]
+
+    def write(self, event):
+        kind = type(event)
+        styles = self.styles
+        if kind is Heading:
+            style = {1: self.title_style, 2: self.heading_style, 3: styles['Heading3']}.get(event.level, styles['Heading4'])
+            self.story.append(self._paragraph(self._markup(event.inlines), style))
+        elif kind is Paragraph:
+            self.story.append(self._paragraph(self._markup(event.inlines), styles['Normal']))
+            self.story.append(self._spacer(6))
+        elif kind is ListItem:
+            bullet = f"{event.number}." if event.number is not None else '•'
+            self.story.append(self._paragraph(self._markup(event.inlines), self._list_style(event.depth), bullet))
+        elif kind is CodeBlock:
+            from reportlab.platypus import Preformatted
+            self.story.append(Preformatted(event.text, self._code_style(event.depth)))
+        elif kind is Table:
+            from reportlab.platypus import Table as PdfTable, TableStyle
+            columns = max([len(event.header)] + [len(row) for row in event.rows])
+            data = []
+            for r, row in enumerate([event.header] + event.rows):
+                row = row + [[]] * (columns - len(row))
+                cells = [self._markup(cell) for cell in row[:columns]]
+                data.append([self._paragraph(f'<b>{c}</b>' if r == 0 else c, styles['BodyText']) for c in cells])
+            table = PdfTable(data, colWidths=[self.doc.width / columns] * columns, repeatRows=1)
+            table.setStyle(TableStyle([('GRID', (0, 0), (-1, -1), 0.5, '#dddddd'),
+                                       ('BACKGROUND', (0, 0), (-1, 0), '#f2f2f2'),
+                                       ('VALIGN', (0, 0), (-1, -1), 'TOP')]))
+            self.story.extend([table, self._spacer(6)])
+        elif kind is Quote:
+            self.story.append(self._paragraph(self._markup(event.inlines), self.quote_style))
+        elif kind is Rule:
+            from reportlab.platypus.flowables import HRFlowable
+            self.story.append(HRFlowable(width='100%', color='#dddddd'))
+
+    def close(self):
+        self.doc.build(self.story)
+
+    def abort(self):
+        """Drop the story; the PDF is only written by close()"""
+        self.story = []
+
+
+WRITERS = {'docx': DocxWriter, 'rtf': RtfWriter, 'pdf': PdfWriter}
+
+def write_documents(source, outputs, title=DOC_TITLE, info=DOC_INFO):
+    """Parse source once and stream its events into every requested writer.
+
+    outputs maps a format in WRITERS to its output path; returns the formats
+    that failed. A failing writer is aborted (its partial output removed) and
+    dropped without stopping the others.
+    """
+    writers = {}
+    for fmt, output in outputs.items():
+        try:
+            writers[fmt] = WRITERS[fmt](output, title=title, info=info)
+        except Exception as e:
+            print(f"❌ Error creating {fmt.upper()}: {e}")
+    failed = set(outputs) - set(writers)
 
-def main():
-    """Main function"""
-    print("🚀 Creating document formats...")
-    print("=" * 50)
-    
-    if not os.path.exists('GOOGLE_ADS_API_DESIGN_DOCUMENT.md'):
-        print("❌ Source file not found: GOOGLE_ADS_API_DESIGN_DOCUMENT.md")
-        return
-    
-    # Create HTML version
     try:
-        with open('GOOGLE_ADS_API_DESIGN_DOCUMENT.md', 'r', encoding='utf-8') as f:
-            md_content = f.read()
-        
-        html = markdown.markdown(md_content, extensions=['toc', 'tables', 'codehilite'])
+        with open(source, 'r', encoding='utf-8') as f:
+            for event in iter_events(f):
+                for fmt, writer in list(writers.items()):
+                    try:
+                        writer.write(event)
+                    except Exception as e:
+                        print(f"❌ Error creating {writer.label}: {e}")
+                        failed.add(fmt)
+                        del writers[fmt]
+                        writer.abort()
+    except BaseException:
+        # The source itself could not be read: no output is complete
+        for writer in writers.values():
+            writer.abort()
+        raise
+
+    for fmt, writer in writers.items():
+        try:
+            writer.close()
+            print(f"✅ {writer.label} created: {writer.output}")
+        except Exception as e:
+            print(f"❌ Error creating {writer.label}: {e}")
+            failed.add(fmt)
+            writer.abort()
+    return failed
+
+def create_docx(source=SOURCE, output=f'{OUTPUT_BASE}.docx', title=DOC_TITLE, info=DOC_INFO):
+    """Create DOCX version"""
+    write_documents(source, {'docx': output}, title, info)
+
+def create_rtf(source=SOURCE, output=f'{OUTPUT_BASE}.rtf'):
+    """Create RTF version"""
+    write_documents(source, {'rtf': output})
+
+def create_simple_pdf(source=SOURCE, output=f'{OUTPUT_BASE}.pdf', title=DOC_TITLE, info=DOC_INFO):
+    """Create a simple PDF version using basic formatting"""
+    write_documents(source, {'pdf': output}, title, info)
+
+def create_html(content, output=f'{OUTPUT_BASE}.html', title=HTML_TITLE):
+    """Create HTML version"""
+    try:
+        html = lazy_import('markdown').markdown(content, extensions=HTML_EXTENSIONS)
         
         full_html = f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
-    <title>Google Ads API Design Document</title>
+    <title>{escape(title)}</title>
     <style>
         body {{ font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px; line-height: 1.6; }}
         h1 {{ color: #1a73e8; border-bottom: 2px solid #1a73e8; padding-bottom: 10px; }}
@@ -235,35 +398,85 @@ def main():
 </body>
 </html>"""
         
-        with open('Google_Ads_API_Design_Document.html', 'w', encoding='utf-8') as f:
+        with open(output, 'w', encoding='utf-8') as f:
             f.write(full_html)
         
-        print("✅ HTML created: Google_Ads_API_Design_Document.html")
+        print(f"✅ HTML created: {output}")
         
     except Exception as e:
         print(f"❌ Error creating HTML: {e}")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Create HTML, DOCX, RTF and PDF versions of the design document')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='Comma-separated subset of html,docx,rtf,pdf')
+    parser.add_argument('--force', action='store_true', help='Rebuild every output even if it is up to date')
+    parser.add_argument('--startup-metrics', action='store_true', help='Report startup and import timings')
+    args = parser.parse_args()
+    formats = [fmt for fmt in FORMATS if fmt in args.formats.split(',')]
+
+    print("🚀 Creating document formats...")
+    print("=" * 50)
     
-    # Create other formats
-    create_docx()
-    create_rtf()
-    create_simple_pdf()
+    if not os.path.exists(SOURCE):
+        print(f"❌ Source file not found: {SOURCE}")
+        return
+    
+    # Skip formats whose library is missing instead of failing mid-run
+    dependencies = check_dependencies(sorted({m for fmt in formats for m in REQUIREMENTS[fmt]}))
+    for fmt in list(formats):
+        missing = [m for m in REQUIREMENTS[fmt] if dependencies[m] is None]
+        if missing:
+            print(f"❌ Skipping {fmt.upper()}: {', '.join(missing)} not installed")
+            formats.remove(fmt)
+    
+    cache = BuildCache(force=args.force)
+    source_digest = file_digest(SOURCE)
+    # The writers live in this script and markdown_events, so their hashes are part of every key
+    tool_digest = [file_digest(__file__), file_digest(markdown_events.__file__)]
+    
+    stale = {}
+    for fmt in formats:
+        output = f'{OUTPUT_BASE}.{fmt}'
+        versions = [dependencies[m]['version'] for m in REQUIREMENTS[fmt]]
+        key = build_key(source_digest, f'create_document_formats-{fmt}', tool_digest + versions)
+        if cache.fresh(output, key):
+            cache.hits += 1
+            print(f"⏭  {fmt.upper()} up to date: {output}")
+        else:
+            stale[fmt] = (output, key)
+    
+    # A failed writer may leave a stale file from an earlier build behind
+    before = {fmt: os.path.getmtime(output) if os.path.exists(output) else None
+              for fmt, (output, _) in stale.items()}
+    first_work = time.perf_counter()
+    if 'html' in stale:
+        with open(SOURCE, 'r', encoding='utf-8') as f:
+            create_html(f.read(), stale['html'][0])
+    # One parse of the source feeds every remaining writer
+    outputs = {fmt: output for fmt, (output, _) in stale.items() if fmt != 'html'}
+    failed = write_documents(SOURCE, outputs) if outputs else set()
+    for fmt, (output, key) in stale.items():
+        if fmt not in failed and os.path.exists(output) and os.path.getmtime(output) != before[fmt]:
+            cache.record(output, key)
+            cache.misses += 1
+    cache.save()
     
     print("=" * 50)
     print("✅ Document creation complete!")
+    print(f"   Rebuilt {cache.misses} outputs, {cache.hits} already up to date")
     
     # List created files
-    files = [
-        'Google_Ads_API_Design_Document.html',
-        'Google_Ads_API_Design_Document.pdf',
-        'Google_Ads_API_Design_Document.docx',
-        'Google_Ads_API_Design_Document.rtf'
-    ]
+    files = [f'{OUTPUT_BASE}.{ext}' for ext in formats]
     
     print("\nGenerated files:")
     for file in files:
         if os.path.exists(file):
             size = os.path.getsize(file) / 1024
             print(f"  📄 {file} ({size:.1f} KB)")
+    
+    if args.startup_metrics:
+        report_startup(STARTED, first_work)
 
 if __name__ == "__main__":
     main()
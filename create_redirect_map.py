@@ -6,7 +6,11 @@ Maps 404 URLs to appropriate redirect targets or 410 Gone status
 
 import csv
 import json
-from urllib.parse import urlparse, parse_qs, unquote
+from urllib.parse import urlparse, unquote
+
+import allowlist_index
+from redirect_rules import canonical_query
+from redirect_scoring import score_inventory, priority_labels
 
 def load_inventory(filename):
     """Load the 404 inventory"""
@@ -17,12 +21,10 @@ def load_inventory(filename):
     return inventory
 
 def load_allowlist(filename):
-    """Load the allowlist of valid URLs"""
-    with open(filename, 'r') as f:
-        allowlist = set(line.strip().lower() for line in f.readlines())
-    return allowlist
+    """Load the allowlist of valid URLs as a path-only AllowlistIndex"""
+    return allowlist_index.load_or_build(filename)
 
-def determine_redirect(path, hits_90d, allowlist):
+def determine_redirect(path, hits_90d, allowlist, site_url='https://siteoptz.ai'):
     """Determine the appropriate redirect action for a 404 URL"""
     
     # Convert hits to int for priority calculation
@@ -47,9 +49,10 @@ def determine_redirect(path, hits_90d, allowlist):
     
     # Tools with category querystring
     if '/tools?' in path and 'category=' in path:
-        parsed = urlparse('https://siteoptz.ai' + path)
-        params = parse_qs(parsed.query)
-        category = params.get('category', [''])[0].lower()
+        parsed = urlparse(site_url + path)
+        # Canonical decoding: encoding, case, stray whitespace and an unencoded '&' inside the value
+        params = dict(canonical_query(parsed.query))
+        category = params.get('category', '')
         
         # Map categories to canonical URLs
         category_map = {
@@ -81,11 +84,11 @@ def determine_redirect(path, hits_90d, allowlist):
         }
         
         mapped_category = category_map.get(category)
-        if mapped_category and f'https://siteoptz.ai{mapped_category}' in allowlist:
-            redirect['to_url'] = f'https://siteoptz.ai{mapped_category}'
+        if mapped_category and mapped_category in allowlist:
+            redirect['to_url'] = f'{site_url}{mapped_category}'
             redirect['rationale'] = f'Category param → canonical category page'
         else:
-            redirect['to_url'] = 'https://siteoptz.ai/tools'
+            redirect['to_url'] = f'{site_url}/tools'
             redirect['rationale'] = f'Invalid category → main tools page'
     
     # E-commerce category (discontinued)
@@ -117,8 +120,8 @@ def determine_redirect(path, hits_90d, allowlist):
             mapped_review = review_map[review_name]
             if mapped_review:
                 target_url = f'/reviews/{mapped_review}'
-                if f'https://siteoptz.ai{target_url}' in allowlist:
-                    redirect['to_url'] = f'https://siteoptz.ai{target_url}'
+                if target_url in allowlist:
+                    redirect['to_url'] = f'{site_url}{target_url}'
                     redirect['rationale'] = 'Old review URL → current review page'
                 else:
                     redirect['action'] = '410'
@@ -129,33 +132,33 @@ def determine_redirect(path, hits_90d, allowlist):
                 redirect['to_url'] = ''
                 redirect['rationale'] = 'Review discontinued'
         else:
-            redirect['to_url'] = 'https://siteoptz.ai/reviews'
+            redirect['to_url'] = f'{site_url}/reviews'
             redirect['rationale'] = 'Unknown review → main reviews page'
     
     # Compare pages
     elif '/compare/' in path:
         # Most comparison pages don't exist individually
-        redirect['to_url'] = 'https://siteoptz.ai/compare'
+        redirect['to_url'] = f'{site_url}/compare'
         redirect['rationale'] = 'Comparison page → main compare tool'
     
     # Case studies
     elif '/case-studies/' in path:
-        redirect['to_url'] = 'https://siteoptz.ai/case-studies'
+        redirect['to_url'] = f'{site_url}/case-studies'
         redirect['rationale'] = 'Missing case study → case studies hub'
     
     # Resources
     elif '/resources/' in path:
-        redirect['to_url'] = 'https://siteoptz.ai/resources'
+        redirect['to_url'] = f'{site_url}/resources'
         redirect['rationale'] = 'Missing resource → resources hub'
     
     # Reports
     elif '/reports/' in path:
         # Check if specific report exists
         if 'claude-gpt4-benchmark' in path:
-            redirect['to_url'] = 'https://siteoptz.ai/analysis/claude3-vs-gpt4'
+            redirect['to_url'] = f'{site_url}/analysis/claude3-vs-gpt4'
             redirect['rationale'] = 'Report moved → analysis page'
         else:
-            redirect['to_url'] = 'https://siteoptz.ai/resources'
+            redirect['to_url'] = f'{site_url}/resources'
             redirect['rationale'] = 'Missing report → resources hub'
     
     # ROI calculators
@@ -183,27 +186,59 @@ def determine_redirect(path, hits_90d, allowlist):
             mapped_calc = calc_map[tool_name]
             if mapped_calc:
                 target_url = f'/tools/{mapped_calc}'
-                if f'https://siteoptz.ai{target_url}' in allowlist:
-                    redirect['to_url'] = f'https://siteoptz.ai{target_url}'
+                if target_url in allowlist:
+                    redirect['to_url'] = f'{site_url}{target_url}'
                     redirect['rationale'] = 'Calculator URL → current calculator'
                 else:
-                    redirect['to_url'] = 'https://siteoptz.ai/tools'
+                    redirect['to_url'] = f'{site_url}/tools'
                     redirect['rationale'] = 'Missing calculator → tools page'
             else:
-                redirect['to_url'] = 'https://siteoptz.ai/tools'
+                redirect['to_url'] = f'{site_url}/tools'
                 redirect['rationale'] = 'Discontinued calculator → tools page'
         else:
-            redirect['to_url'] = 'https://siteoptz.ai/tools'
+            redirect['to_url'] = f'{site_url}/tools'
             redirect['rationale'] = 'Unknown tool → tools page'
     
     # Default fallback
     else:
-        redirect['to_url'] = 'https://siteoptz.ai/'
+        redirect['to_url'] = f'{site_url}/'
         redirect['rationale'] = 'Unknown page → homepage'
         redirect['priority'] = 'low'
     
     return redirect
 
+def build_redirects(inventory, allowlist, site_url='https://siteoptz.ai'):
+    """Map every inventory row to a redirect, ordered by traffic-weighted score"""
+    scores = score_inventory(inventory)
+    labels = priority_labels(scores)
+    redirects = []
+    for item, score, label in zip(inventory, scores, labels):
+        # A path that has gone live since the crawl must not be redirected (it would loop)
+        if item['path'].rstrip('/') in allowlist:
+            continue
+        redirect = determine_redirect(
+            item['path'], 
+            item['hits_90d'],
+            allowlist,
+            site_url
+        )
+        # The score replaces the fixed hits thresholds
+        redirect['priority'] = label
+        redirect['score'] = float(score)
+        redirects.append(redirect)
+    
+    # Highest score first; emitters keep this order
+    redirects.sort(key=lambda x: -x['score'])
+    return redirects
+
+def write_redirects(redirects, filename):
+    """Write the redirect map CSV consumed by generate_platform_config"""
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        fieldnames = ['path', 'action', 'to_url', 'priority', 'score', 'rationale']
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(redirects)
+
 def main():
     print("=" * 60)
     print("Creating Redirect Map for SiteOptz.ai")
@@ -220,27 +255,10 @@ def main():
     
     # Create redirects
     print("\nCreating redirect mappings...")
-    redirects = []
-    for item in inventory:
-        redirect = determine_redirect(
-            item['path'], 
-            item['hits_90d'],
-            allowlist
-        )
-        redirects.append(redirect)
-    
-    # Sort by priority and hits
-    redirects.sort(key=lambda x: (
-        0 if x['priority'] == 'high' else (1 if x['priority'] == 'med' else 2),
-        -int(next((i['hits_90d'] for i in inventory if i['path'] == x['path']), 0))
-    ))
+    redirects = build_redirects(inventory, allowlist)
     
     # Write redirects CSV
-    with open('redirects_map.csv', 'w', newline='', encoding='utf-8') as f:
-        fieldnames = ['path', 'action', 'to_url', 'priority', 'rationale']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(redirects)
+    write_redirects(redirects, 'redirects_map.csv')
     
     print(f"\n✓ Created redirects_map.csv with {len(redirects)} mappings")
     
@@ -266,19 +284,18 @@ def main():
         if priority in priority_counts:
             print(f"  • {priority}: {priority_counts[priority]} URLs")
     
-    print("\nTop 10 redirects by traffic:")
-    for i, item in enumerate(inventory[:10], 1):
-        redirect = next((r for r in redirects if r['path'] == item['path']), None)
-        if redirect:
-            action = redirect['action']
-            to_url = redirect['to_url'].replace('https://siteoptz.ai', '') if redirect['to_url'] else 'N/A'
-            print(f"\n{i:2}. {item['path'][:50]}")
-            print(f"    Hits: {int(item['hits_90d']):,}")
-            print(f"    Action: {action}")
-            if action == '301':
-                print(f"    Target: {to_url}")
-            else:
-                print(f"    Status: Gone (410)")
+    print("\nTop 10 redirects by score:")
+    hits_by_path = {item['path']: int(item['hits_90d']) for item in inventory}
+    for i, redirect in enumerate(redirects[:10], 1):
+        action = redirect['action']
+        to_url = redirect['to_url'].replace('https://siteoptz.ai', '') if redirect['to_url'] else 'N/A'
+        print(f"\n{i:2}. {redirect['path'][:50]}")
+        print(f"    Score: {redirect['score']:.2f} (hits: {hits_by_path.get(redirect['path'], 0):,})")
+        print(f"    Action: {action}")
+        if action == '301':
+            print(f"    Target: {to_url}")
+        else:
+            print(f"    Status: Gone (410)")
     
     # Save summary
     summary = {
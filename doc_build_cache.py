@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Build Cache for the Document Converters
+Keys every output (HTML, PDF, DOCX, RTF) on the SHA-256 of its markdown
+source, the converter that writes it and that converter's options, and keeps
+a manifest of the key each output was last built from. An output is rebuilt
+only when one of its inputs changed; intermediates shared by several outputs
+(such as the pandoc JSON AST) are stored once under their own key.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+CACHE_DIR = '.doc_build_cache'
+MANIFEST = 'manifest.json'
+CACHE_VERSION = 1
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_key(source_digest, converter, options=()):
+    """Cache key for one output: source content + converter + its options"""
+    payload = json.dumps([CACHE_VERSION, source_digest, converter, options], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class BuildCache:
+    """Manifest of output path -> key it was built from, plus a content-addressed object store"""
+
+    def __init__(self, cache_dir=CACHE_DIR, force=False):
+        self.cache_dir = cache_dir
+        self.force = force
+        self.outputs = {}
+        self.hits = 0
+        self.misses = 0
+        manifest = os.path.join(cache_dir, MANIFEST)
+        if os.path.exists(manifest):
+            try:
+                with open(manifest, 'r') as f:
+                    data = json.load(f)
+                if data.get('v') == CACHE_VERSION:
+                    self.outputs = data['outputs']
+            except (OSError, ValueError, KeyError):
+                self.outputs = {}
+        self._dirty = False
+
+    def fresh(self, output, key):
+        """True when output exists and was last built from exactly this key"""
+        if self.force:
+            return False
+        entry = self.outputs.get(os.path.abspath(output))
+        return (entry is not None and entry['key'] == key and os.path.exists(output)
+                and os.path.getsize(output) == entry['size'])
+
+    def record(self, output, key):
+        self.outputs[os.path.abspath(output)] = {'key': key, 'size': os.path.getsize(output)}
+        self._dirty = True
+
+    def build(self, output, key, make):
+        """Run make() unless output is fresh; returns True when it was rebuilt"""
+        if self.fresh(output, key):
+            self.hits += 1
+            return False
+        before = os.path.getmtime(output) if os.path.exists(output) else None
+        make()
+        # A failed converter may leave a stale file from an earlier build behind
+        if os.path.exists(output) and os.path.getmtime(output) != before:
+            self.record(output, key)
+        self.misses += 1
+        return True
+
+    def object_path(self, key, suffix=''):
+        """Location of a shared intermediate stored under its own key"""
+        directory = os.path.join(self.cache_dir, 'objects', key[:2])
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, key + suffix)
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        manifest = os.path.join(self.cache_dir, MANIFEST)
+        tmp_name = manifest + '.tmp'
+        with open(tmp_name, 'w') as f:
+            json.dump({'v': CACHE_VERSION, 'outputs': self.outputs}, f, indent=1)
+        os.replace(tmp_name, manifest)
+        self._dirty = False
+
+
+def main():
+    cache = BuildCache(sys.argv[1] if len(sys.argv) > 1 else CACHE_DIR)
+    print("=" * 60)
+    print("Document Build Cache")
+    print("=" * 60)
+    print(f"\n{len(cache.outputs)} outputs tracked in {cache.cache_dir}/")
+    for output, entry in sorted(cache.outputs.items()):
+        size = os.path.getsize(output) if os.path.exists(output) else None
+        state = 'fresh' if size == entry['size'] else 'missing' if size is None else 'modified'
+        print(f"  {entry['key'][:12]}  {os.path.relpath(output)} [{state}]")
+
+if __name__ == '__main__':
+    main()
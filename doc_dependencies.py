@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Deferred Imports and Cached Dependency Checks for the Document Converters
+Heavy libraries (python-docx, reportlab, markdown) are imported only when a
+writer that needs them runs, and each import is timed. Whether a dependency is
+installed, its version and the pandoc binary's version are probed once and
+cached next to the build cache, so a warm run starts without pip, import
+probes or a `pandoc --version` subprocess.
+"""
+
+import importlib
+import json
+import os
+import shutil
+import sys
+import time
+
+from doc_build_cache import CACHE_DIR
+
+DEPENDENCY_CACHE = os.path.join(CACHE_DIR, 'dependencies.json')
+
+# Importable module -> pip distribution that provides it
+DISTRIBUTIONS = {
+    'markdown': 'markdown',
+    'reportlab': 'reportlab',
+    'docx': 'python-docx',
+    'pypandoc': 'pypandoc'
+}
+
+IMPORT_TIMES = {}
+
+
+def lazy_import(name):
+    """Import a module on first use, recording how long the import took"""
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+
+# Probing is the slow path (cache misses only), so its imports are deferred too
+
+def _probe_module(name):
+    import importlib.util
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return None
+    from importlib import metadata
+    try:
+        version = metadata.version(DISTRIBUTIONS.get(name, name))
+    except metadata.PackageNotFoundError:
+        version = None
+    return {'origin': spec.origin, 'version': version}
+
+
+def _probe_pandoc():
+    import subprocess
+    path = shutil.which('pandoc')
+    if not path:
+        return None
+    result = subprocess.run([path, '--version'], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return {'path': path, 'mtime': os.path.getmtime(path), 'version': result.stdout.split('\n', 1)[0]}
+
+
+def _still_valid(name, entry):
+    if name == 'pandoc':
+        return (shutil.which('pandoc') == entry['path'] and os.path.exists(entry['path'])
+                and os.path.getmtime(entry['path']) == entry['mtime'])
+    return entry['origin'] is None or os.path.exists(entry['origin'])
+
+
+def check_dependencies(modules=(), pandoc=False, install=False, cache_file=DEPENDENCY_CACHE):
+    """Map each module (and 'pandoc') to its cached probe result, or None when missing.
+
+    Hits are revalidated with a stat of the module file or pandoc binary;
+    missing dependencies are re-probed every run (and pip-installed when asked).
+    """
+    cached = {}
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r') as f:
+                data = json.load(f)
+            if data.get('python') == [sys.executable, sys.version]:
+                cached = data['found']
+        except (OSError, ValueError, KeyError):
+            cached = {}
+
+    names = list(modules) + (['pandoc'] if pandoc else [])
+    results, changed = {}, False
+    for name in names:
+        entry = cached.get(name)
+        if entry is not None and _still_valid(name, entry):
+            results[name] = entry
+            continue
+        entry = _probe_pandoc() if name == 'pandoc' else _probe_module(name)
+        if entry is None and install and name != 'pandoc':
+            import subprocess
+            print(f"Installing {DISTRIBUTIONS.get(name, name)}...")
+            subprocess.check_call([sys.executable, '-m', 'pip', 'install', DISTRIBUTIONS.get(name, name)])
+            importlib.invalidate_caches()
+            entry = _probe_module(name)
+        results[name] = entry
+        if entry is not None:
+            cached[name] = entry
+            changed = True
+
+    if changed:
+        os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+        tmp_name = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_name, 'w') as f:
+            json.dump({'python': [sys.executable, sys.version], 'found': cached}, f, indent=1)
+        os.replace(tmp_name, cache_file)
+    return results
+
+
+def report_startup(started, first_work):
+    """Print -X importtime style numbers: time to first conversion and each deferred import"""
+    print(f"\n⏱  Startup: {(first_work - started) * 1000:.1f} ms before the first conversion")
+    for name, seconds in sorted(IMPORT_TIMES.items(), key=lambda item: item[1], reverse=True):
+        print(f"   import {name:<24} {seconds * 1000:8.1f} ms")
+    print("   (run with python -X importtime for a per-module breakdown)")
+
+
+def main():
+    started = time.perf_counter()
+    results = check_dependencies(list(DISTRIBUTIONS), pandoc=True)
+    print("=" * 60)
+    print("Document Converter Dependencies")
+    print("=" * 60)
+    for name, entry in results.items():
+        if entry is None:
+            print(f"  ❌ {name}: not installed")
+        else:
+            print(f"  ✓ {name}: {entry.get('version') or 'installed'}")
+    print(f"\nChecked in {(time.perf_counter() - started) * 1000:.1f} ms (cached in {DEPENDENCY_CACHE})")
+
+if __name__ == '__main__':
+    main()
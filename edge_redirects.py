@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Edge Redirect Lookup Artifact
+Compiles parsed redirect rules into a compact JSON lookup table for Next.js
+middleware: a hashed path -> (status, target) map, per-path query conditions
+and a small table of pattern rules bucketed by first segment. Also generates
+the TypeScript loader and a Python emulator used to verify lookups.
+"""
+
+import json
+import re
+import sys
+from functools import lru_cache
+
+from redirect_rules import (is_pattern, pattern_regex, first_static_segment, expand_target, source_of,
+                            lookup_key, canonical_query)
+
+ARTIFACT_VERSION = 1
+
+
+def build_edge_artifact(rules):
+    """Compile rules into the artifact dict; first rule for a key wins"""
+    targets = []
+    target_ids = {}
+
+    def target_id(rule):
+        if rule.action != '301':
+            return -1
+        if rule.target not in target_ids:
+            target_ids[rule.target] = len(targets)
+            targets.append(rule.target)
+        return target_ids[rule.target]
+
+    exact = {}
+    query = {}
+    patterns = {}
+    for rule in rules:
+        entry = [int(rule.action), target_id(rule)]
+        if is_pattern(rule.path):
+            source, names = pattern_regex(lookup_key(rule.path))
+            patterns.setdefault(first_static_segment(rule.path), []).append([source, list(names)] + entry)
+        elif rule.query:
+            conditions = [[key, value] for key, value in rule.query]
+            query.setdefault(lookup_key(rule.path), []).append([conditions] + entry)
+        else:
+            exact.setdefault(lookup_key(rule.path), entry)
+
+    return {'v': ARTIFACT_VERSION, 't': targets, 'e': exact, 'q': query, 'p': patterns}
+
+
+def lookup(artifact, path, query_string=''):
+    """Python emulator of the generated TypeScript lookup"""
+    key = lookup_key(path)
+
+    if query_string and key in artifact['q']:
+        params = {}
+        for k, v in canonical_query(query_string):
+            params.setdefault(k, v)
+        for conditions, status, tid in artifact['q'][key]:
+            if all(params.get(k) == v for k, v in conditions):
+                return status, artifact['t'][tid] if tid >= 0 else None
+
+    if key in artifact['e']:
+        status, tid = artifact['e'][key]
+        return status, artifact['t'][tid] if tid >= 0 else None
+
+    candidates = artifact['p'].get(first_static_segment(key), []) + artifact['p'].get('*', [])
+    for source, names, status, tid in candidates:
+        match = _regex(source).match(key)
+        if match:
+            params = dict(zip(names, match.groups()))
+            return status, expand_target(artifact['t'][tid], params) if tid >= 0 else None
+
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _regex(source):
+    return re.compile(source)
+
+
+def verify_artifact(artifact, rules):
+    """Check every concrete rule resolves through the emulator; returns mismatches"""
+    mismatches = []
+    for rule in rules:
+        if is_pattern(rule.path):
+            continue
+        expected = (int(rule.action), rule.target if rule.action == '301' else None)
+        actual = lookup(artifact, rule.path, rule.raw_query)
+        if actual != expected:
+            mismatches.append((source_of(rule), expected, actual))
+    return mismatches
+
+
+def write_edge_artifact(rules, out):
+    """Stream the compact artifact JSON; returns the number of lookup entries"""
+    artifact = build_edge_artifact(rules)
+    json.dump(artifact, out, separators=(',', ':'))
+    return len(artifact['e']) + sum(len(v) for v in artifact['q'].values()) + sum(len(v) for v in artifact['p'].values())
+
+
+EDGE_LOADER = """// Generated by generate_platform_config.py - do not edit.
+// Loads redirects-edge.json once per edge isolate and resolves redirects in O(1).
+import artifact from './redirects-edge.json';
+
+type Entry = [number, number];
+type QueryEntry = [[string, string][], number, number];
+type PatternEntry = [string, string[], number, number];
+
+interface EdgeArtifact {
+  v: number;
+  t: string[];
+  e: Record<string, Entry>;
+  q: Record<string, QueryEntry[]>;
+  p: Record<string, PatternEntry[]>;
+}
+
+const table = artifact as unknown as EdgeArtifact;
+
+export interface EdgeRedirect {
+  status: number;
+  destination: string | null;
+}
+
+function lookupKey(pathname: string): string {
+  const path = pathname.toLowerCase().replace(/\\/+$/, '');
+  return path || '/';
+}
+
+function canonical(text: string): string {
+  // URLSearchParams decoded once; undo double encoding like the Python side
+  for (let i = 0; i < 2; i++) {
+    let decoded: string;
+    try {
+      decoded = decodeURIComponent(text.replace(/\\+/g, ' '));
+    } catch {
+      break;
+    }
+    if (decoded === text) break;
+    text = decoded;
+  }
+  return text.trim().replace(/\\s+/g, ' ').toLowerCase();
+}
+
+// Same decoding as redirect_rules.canonical_query: an unencoded '&' inside a
+// value leaves a name-only fragment starting with whitespace, e.g. ' optimization'
+function canonicalParams(searchParams: URLSearchParams): Record<string, string> {
+  const pairs: [string, string][] = [];
+  searchParams.forEach((value, name) => {
+    if (value === '' && pairs.length && /^\\s/.test(name)) {
+      pairs[pairs.length - 1][1] += '&' + name;
+    } else {
+      pairs.push([name, value]);
+    }
+  });
+  const params: Record<string, string> = {};
+  for (const [name, value] of pairs) {
+    const k = canonical(name);
+    if (k && !(k in params)) params[k] = canonical(value);
+  }
+  return params;
+}
+
+const compiled = new Map<string, RegExp>();
+
+function regex(source: string): RegExp {
+  let re = compiled.get(source);
+  if (!re) {
+    re = new RegExp(source);
+    compiled.set(source, re);
+  }
+  return re;
+}
+
+function firstStaticSegment(path: string): string {
+  const segment = path.replace(/^\\/+/, '').split('/')[0];
+  return segment.includes(':') ? '*' : segment;
+}
+
+function expandTarget(target: string, params: Record<string, string>): string {
+  const names = Object.keys(params).sort((a, b) => b.length - a.length);
+  for (const name of names) {
+    target = target.split(`:${name}*`).join(params[name]).split(`:${name}`).join(params[name]);
+  }
+  return target;
+}
+
+function result(status: number, tid: number, params?: Record<string, string>): EdgeRedirect {
+  if (tid < 0) return { status, destination: null };
+  const target = table.t[tid];
+  return { status, destination: params ? expandTarget(target, params) : target };
+}
+
+export function lookupRedirect(pathname: string, searchParams?: URLSearchParams): EdgeRedirect | null {
+  const key = lookupKey(pathname);
+
+  const queryRules = searchParams ? table.q[key] : undefined;
+  if (queryRules && searchParams) {
+    const params = canonicalParams(searchParams);
+    for (const [conditions, status, tid] of queryRules) {
+      if (conditions.every(([k, v]) => params[k] === v)) return result(status, tid);
+    }
+  }
+
+  const exact = table.e[key];
+  if (exact) return result(exact[0], exact[1]);
+
+  const candidates = (table.p[firstStaticSegment(key)] ?? []).concat(table.p['*'] ?? []);
+  for (const [source, names, status, tid] of candidates) {
+    const match = regex(source).exec(key);
+    if (match) {
+      const params: Record<string, string> = {};
+      names.forEach((name, i) => { params[name] = match[i + 1]; });
+      return result(status, tid, params);
+    }
+  }
+  return null;
+}
+"""
+
+
+def write_edge_loader(rules, out):
+    """Write the TypeScript loader that pairs with redirects-edge.json"""
+    out.write(EDGE_LOADER)
+
+
+def main():
+    artifact_file = sys.argv[1] if len(sys.argv) > 1 else 'redirects-edge.json'
+    with open(artifact_file, 'r') as f:
+        artifact = json.load(f)
+
+    for url in sys.argv[2:]:
+        path, _, query_string = url.partition('?')
+        print(f"{url} -> {lookup(artifact, path, query_string)}")
+
+if __name__ == '__main__':
+    main()
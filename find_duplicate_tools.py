@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Find Duplicate Tools in the SiteOptz.ai Catalogue
+MinHashes every tool's name, website, description and features and uses
+locality-sensitive hashing (banded signatures) to find candidate duplicate
+pairs in near-linear time instead of comparing every pair. Candidates are
+verified with the exact Jaccard similarity, grouped, and each group gets a
+canonical record (live review page first, then the most complete record).
+Members that share a website or non-name content with their canonical record
+become /reviews/ redirects in the redirect map format, so they go through
+generate_platform_config like every other redirect; pairs matched on the name
+alone only go into the merge plan for review.
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+import re
+from collections import defaultdict
+from itertools import combinations
+from urllib.parse import urlparse
+
+import numpy as np
+
+from catalogue_index import DEFAULT_CATALOGUE, iter_tools, tool_description, tool_features, tool_name, tool_slug
+from create_redirect_map import load_allowlist, write_redirects
+
+NUM_PERM = 128
+THRESHOLD = 0.5
+MAX_BUCKET = 200      # skip LSH buckets this large: shared boilerplate, not duplicates
+MAX_TOKEN_SHARE = 0.02  # tokens in more than this share of tools are template text, not evidence
+MIN_TOKEN_TOOLS = 5
+PRIME = (1 << 61) - 1
+SEED = 1
+
+WORD = re.compile(r'[a-z0-9]+')
+# Separated slug endings that vary between copies of the same tool (cohere / cohere-ai, videotube / videotube-ai)
+NAME_SUFFIXES = re.compile(r'[^a-z0-9](ai|app|io|hq)$')
+
+
+def compact(text):
+    """Letters and digits only: 'Universe - No-Code' and 'universe-nocode' give the same key"""
+    return ''.join(WORD.findall(str(text).lower()))
+
+
+def slug_key(tool):
+    """Punctuation- and suffix-insensitive slug; equal keys are duplicates outright"""
+    slug = str(tool_slug(tool)).lower()
+    return compact(NAME_SUFFIXES.sub('', slug)) or compact(slug)
+
+
+def website_host(tool):
+    website = (tool.get('overview') or {}).get('website') or tool.get('website') or tool.get('affiliate_link') or ''
+    host = urlparse(website if '://' in website else f'//{website}').netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def shingles(tool):
+    """Token set of a tool: name trigrams, website host, description 3-word shingles, features
+
+    The name's own words are left out of the description shingles: templated
+    descriptions ("X - AI-powered tool for ...") would otherwise count the name twice.
+    """
+    tokens = set()
+    name = compact(tool_name(tool))
+    tokens.update(f'n:{name[i:i + 3]}' for i in range(max(1, len(name) - 2)))
+    host = website_host(tool)
+    if host:
+        tokens.add(f'h:{host}')
+    # Shingle the runs between name words, so no shingle spans a removed name
+    name_words = set(WORD.findall(str(tool_name(tool)).lower()))
+    words = []
+    for word in WORD.findall(tool_description(tool).lower()) + ['']:
+        if word and word not in name_words:
+            words.append(word)
+            continue
+        tokens.update('d:' + ' '.join(words[i:i + 3]) for i in range(len(words) - 2))
+        words = []
+    tokens.update(f'f:{compact(f)}' for f in tool_features(tool) if compact(f))
+    return tokens
+
+
+def drop_boilerplate(token_sets, max_share=MAX_TOKEN_SHARE):
+    """Remove tokens shared by many tools (templated descriptions, stock feature lists)"""
+    counts = defaultdict(int)
+    for tokens in token_sets:
+        for token in tokens:
+            counts[token] += 1
+    limit = max(MIN_TOKEN_TOOLS, int(max_share * len(token_sets)))
+    common = {token for token, count in counts.items() if count > limit}
+    return [tokens - common for tokens in token_sets], common
+
+
+def _token_hashes(tokens):
+    return np.fromiter((int.from_bytes(hashlib.blake2b(t.encode('utf-8'), digest_size=8).digest(), 'little')
+                        & 0xFFFFFFFF for t in tokens), dtype=np.uint64, count=len(tokens))
+
+
+def minhash_signatures(token_sets, num_perm=NUM_PERM, seed=SEED, chunk=16):
+    """(tools x num_perm) MinHash matrix using universal hashes (a*x + b) mod p"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+    lengths = np.array([len(tokens) for tokens in token_sets], dtype=np.int64)
+    values = np.concatenate([_token_hashes(tokens) for tokens in token_sets if tokens] or [np.zeros(0, np.uint64)])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    present = lengths > 0
+
+    signatures = np.full((len(token_sets), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    if not len(values):
+        return signatures
+    for lo in range(0, num_perm, chunk):
+        hashed = (a[lo:lo + chunk, None] * values[None, :] + b[lo:lo + chunk, None]) % PRIME
+        # Minimum per tool: reduce over each tool's slice of the concatenated tokens
+        signatures[present, lo:lo + chunk] = np.minimum.reduceat(hashed, starts[present], axis=1).T
+    return signatures
+
+
+def lsh_params(num_perm, threshold):
+    """Bands x rows with b*r = num_perm whose S-curve threshold (1/b)^(1/r) is closest to threshold"""
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+def candidate_pairs(signatures, bands, rows, max_bucket=MAX_BUCKET):
+    """Pairs that share at least one identical band"""
+    pairs = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for i, key in enumerate(map(bytes, block)):
+            buckets[key].append(i)
+        for members in buckets.values():
+            if 1 < len(members) <= max_bucket:
+                pairs.update(combinations(members, 2))
+    return pairs
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def evidence(a, b, threshold=THRESHOLD):
+    """What besides the name two token sets share: 'website', 'content' or ''"""
+    if any(token.startswith('h:') for token in a & b):
+        return 'website'
+    content_a = {token for token in a if not token.startswith('n:')}
+    content_b = {token for token in b if not token.startswith('n:')}
+    return 'content' if content_a and content_b and jaccard(content_a, content_b) >= threshold else ''
+
+
+def find_duplicates(tools, threshold=THRESHOLD, num_perm=NUM_PERM):
+    """Verified duplicate pairs: [(i, j, similarity, method, evidence)]"""
+    token_sets, common = drop_boilerplate([shingles(tool) for tool in tools])
+    signatures = minhash_signatures(token_sets, num_perm)
+    bands, rows = lsh_params(num_perm, threshold)
+
+    candidates = candidate_pairs(signatures, bands, rows)
+    found = {}
+    for i, j in candidates:
+        similarity = jaccard(token_sets[i], token_sets[j])
+        if similarity >= threshold:
+            found[(i, j)] = (similarity, 'minhash')
+
+    # Slugs that differ only by punctuation or an -ai style suffix are the same tool
+    by_key = defaultdict(list)
+    for i, tool in enumerate(tools):
+        key = slug_key(tool)
+        if key:
+            by_key[key].append(i)
+    for members in by_key.values():
+        for i, j in combinations(members, 2):
+            if (i, j) not in found:
+                found[(i, j)] = (jaccard(token_sets[i], token_sets[j]), 'slug')
+
+    stats = {'candidates': len(candidates), 'bands': bands, 'rows': rows, 'boilerplate': len(common)}
+    return [(i, j, similarity, method, evidence(token_sets[i], token_sets[j], threshold))
+            for (i, j), (similarity, method) in sorted(found.items())], stats
+
+
+def group_duplicates(pairs, count):
+    """Union-find over the pairs: lists of member indexes, largest first"""
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j, *_ in pairs:
+        parent[find(i)] = find(j)
+    groups = defaultdict(list)
+    for i in sorted({k for i, j, *_ in pairs for k in (i, j)}):
+        groups[find(i)].append(i)
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+def completeness(tool):
+    return sum(1 for value in tool.values() if value not in (None, '', [], {}))
+
+
+def choose_canonical(tools, members, allowlist=None):
+    """Live review page first, then the most complete record, then the shortest slug"""
+    def rank(i):
+        live = allowlist is not None and f"/reviews/{tool_slug(tools[i])}" in allowlist
+        return (not live, -completeness(tools[i]), len(tool_slug(tools[i])), i)
+    return min(members, key=rank)
+
+
+def merge_fields(canonical, duplicate):
+    """Fields the duplicate has that the canonical record lacks"""
+    return sorted(key for key, value in duplicate.items()
+                  if value not in (None, '', [], {}) and canonical.get(key) in (None, '', [], {}))
+
+
+def build_merge_plan(tools, pairs, allowlist=None):
+    similarity = {}
+    for i, j, score, method, shared in pairs:
+        similarity[(i, j)] = similarity[(j, i)] = (score, method, shared)
+
+    plan = []
+    for members in group_duplicates(pairs, len(tools)):
+        canonical = choose_canonical(tools, members, allowlist)
+        for i in members:
+            if i == canonical:
+                continue
+            score, method, shared = similarity.get((i, canonical)) or max(
+                similarity[(i, j)] for j in members if (i, j) in similarity)
+            plan.append({
+                'canonical': tool_slug(tools[canonical]),
+                'duplicate': tool_slug(tools[i]),
+                'canonical_name': tool_name(tools[canonical]),
+                'duplicate_name': tool_name(tools[i]),
+                'similarity': round(score, 3),
+                'method': method,
+                'evidence': shared,
+                'group_size': len(members),
+                'merge_fields': ', '.join(merge_fields(tools[canonical], tools[i]))
+            })
+    return plan
+
+
+def build_duplicate_redirects(plan, site_url='https://siteoptz.ai'):
+    """Redirect map rows: each duplicate's review page -> its canonical review page.
+
+    Only pairs backed by a shared website or shared non-name content are
+    redirected; name-only matches stay in the merge plan for review.
+    """
+    redirects = []
+    for item in plan:
+        if item['duplicate'] == item['canonical'] or not item['evidence']:
+            continue
+        redirects.append({
+            'path': f"/reviews/{item['duplicate']}",
+            'action': '301',
+            'to_url': f"{site_url}/reviews/{item['canonical']}",
+            'priority': 'high' if item['similarity'] >= 0.8 else 'med' if item['similarity'] >= 0.6 else 'low',
+            'rationale': (f"Duplicate tool → {item['canonical']} "
+                          f"({item['method']} {item['similarity']:.2f}, same {item['evidence']})")
+        })
+    return redirects
+
+
+def write_merge_plan(plan, filename):
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        fieldnames = ['canonical', 'duplicate', 'canonical_name', 'duplicate_name', 'similarity',
+                      'method', 'evidence', 'group_size', 'merge_fields']
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(plan)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find duplicate tools and emit merge redirects')
+    parser.add_argument('catalogue', nargs='?', default=DEFAULT_CATALOGUE)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='Jaccard similarity for duplicates')
+    parser.add_argument('--num-perm', type=int, default=NUM_PERM)
+    parser.add_argument('--allowlist', default='siteoptz_allowlist.txt',
+                        help='Prefer tools whose review page is live as the merge target')
+    parser.add_argument('--site-url', default='https://siteoptz.ai')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Finding Duplicate Tools in the SiteOptz.ai Catalogue")
+    print("=" * 60)
+
+    if not os.path.exists(args.catalogue):
+        print(f"❌ Catalogue not found: {args.catalogue}")
+        return
+
+    tools = [tool for tool in iter_tools(args.catalogue) if isinstance(tool, dict)]
+    allowlist = load_allowlist(args.allowlist) if os.path.exists(args.allowlist) else None
+    print(f"\nLoaded {len(tools)} tools from {args.catalogue}")
+
+    pairs, stats = find_duplicates(tools, args.threshold, args.num_perm)
+    print(f"Ignored {stats['boilerplate']} boilerplate tokens shared by many tools")
+    print(f"LSH with {stats['bands']} bands × {stats['rows']} rows: {stats['candidates']} candidate pairs, "
+          f"{len(pairs)} verified duplicates")
+
+    plan = build_merge_plan(tools, pairs, allowlist)
+    redirects = build_duplicate_redirects(plan, args.site_url)
+    write_merge_plan(plan, 'duplicate_tools.csv')
+    write_redirects(redirects, 'duplicate_redirects.csv')
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    print(f"\nDuplicate groups: {len({item['canonical'] for item in plan})}")
+    print(f"Records to merge: {len(plan)}")
+
+    print("\nTop merge suggestions:")
+    for item in sorted(plan, key=lambda p: p['similarity'], reverse=True)[:15]:
+        print(f"  {item['similarity']:.2f} [{item['method']}] {item['duplicate']:<40} → {item['canonical']}")
+
+    print(f"\n✓ Saved duplicate_tools.csv and duplicate_redirects.csv ({len(redirects)} redirects)")
+    if len(redirects) < len(plan):
+        print(f"⚠ {len(plan) - len(redirects)} name-only matches are in duplicate_tools.csv but not redirected")
+    print("\nNext step: python3 generate_platform_config.py redirects_map.csv duplicate_redirects.csv")
+
+if __name__ == '__main__':
+    main()
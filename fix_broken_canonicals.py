@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Fix Broken Canonical URLs for SiteOptz.ai
+Streams the broken_canonical_urls crawler export, resolves every canonical
+against the allowlist and the generated redirect map, and emits redirect rules
+plus a per-template canonical correction list, so one template fix replaces
+thousands of per-page rules.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+from collections import OrderedDict
+
+from allowlist_index import url_to_key
+from build_404_inventory import normalize_url, path_template, path_template_params
+from create_redirect_map import load_allowlist, write_redirects
+from edge_redirects import build_edge_artifact, lookup
+from generate_platform_config import load_redirects
+from redirect_conflicts import live_pages_matching
+from redirect_rules import parse_rules, match_pattern
+
+SAMPLE_SIZE = 5
+
+def latest_export(pattern='siteoptz.ai_broken_canonical_urls_*.csv'):
+    files = sorted(glob.glob(pattern))
+    return files[-1] if files else None
+
+def iter_canonical_rows(filename):
+    """Stream (page URL, canonical URL) pairs from the crawler export"""
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            yield row['Page URL'], row['Canonical link URL']
+
+def site_path(url, canonical_host):
+    """Shared cached normalization, reduced to the allowlist's path key"""
+    return url_to_key(normalize_url(url, canonical_host)).rstrip('/') or '/'
+
+def derive_canonical_template(canonical, params):
+    """Rewrite a canonical path with the page's placeholders, e.g. /compare/:slug1-vs-:slug2"""
+    template = canonical
+    for name, value in sorted(params.items(), key=lambda item: len(item[1]), reverse=True):
+        template = template.replace(value, f':{name}', 1)
+    # Only trust the template if it reproduces exactly the same parameters
+    if params and match_pattern(template, canonical) == params:
+        return template
+    return path_template(canonical)
+
+def resolve_canonicals(rows, allowlist, redirect_artifact, canonical_host):
+    """Resolve every broken canonical in one pass, grouped by URL template"""
+    groups = OrderedDict()
+    for page_url, canonical_url in rows:
+        page = site_path(page_url, canonical_host)
+        canonical = site_path(canonical_url, canonical_host)
+        page_template, params = path_template_params(page)
+
+        if canonical in allowlist:
+            resolution, corrected = 'live', canonical
+        else:
+            hit = lookup(redirect_artifact, canonical) if redirect_artifact else None
+            if hit and hit[0] == 301:
+                resolution, corrected = 'redirected', hit[1]
+            else:
+                # The crawled page answers itself, so it is the right canonical
+                resolution, corrected = 'self', page
+
+        canonical_template = derive_canonical_template(canonical, params)
+        corrected_template = page_template if resolution == 'self' else corrected
+        key = (page_template, canonical_template, resolution, corrected_template)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'page_template': page_template,
+                'current_canonical': canonical_template,
+                'corrected_canonical': corrected_template,
+                'resolution': resolution,
+                'pages': 0,
+                'sample_pages': [],
+                'pairs': {}
+            }
+        group['pages'] += 1
+        if len(group['sample_pages']) < SAMPLE_SIZE:
+            group['sample_pages'].append(page)
+        if resolution == 'self':
+            group['pairs'].setdefault(canonical, page)
+    return list(groups.values())
+
+def build_canonical_redirects(groups, allowlist, site_url, min_group=2):
+    """One pattern rule per template group where safe, per-page rules otherwise"""
+    redirects = []
+    for group in groups:
+        if group['resolution'] != 'self':
+            continue
+        pattern = group['current_canonical']
+        live = live_pages_matching(pattern, allowlist) if ':' in pattern else []
+        if live:
+            group['pattern_blocked_by'] = live[:SAMPLE_SIZE]
+        if group['pages'] >= min_group and ':' in pattern and not live:
+            redirects.append({
+                'path': pattern,
+                'action': '301',
+                'to_url': f"{site_url}{group['page_template']}",
+                'priority': 'high' if group['pages'] >= 100 else 'med',
+                'rationale': f"Broken canonical template → page template ({group['pages']} pages)"
+            })
+            group['rules'] = 1
+        else:
+            for canonical, page in group['pairs'].items():
+                redirects.append({
+                    'path': canonical,
+                    'action': '301',
+                    'to_url': f"{site_url}{page}",
+                    'priority': 'low',
+                    'rationale': 'Broken canonical → page declaring it'
+                })
+            group['rules'] = len(group['pairs'])
+    return redirects
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve broken canonical URLs into redirects and template fixes')
+    parser.add_argument('export', nargs='?', help='broken_canonical_urls CSV (default: latest in current directory)')
+    parser.add_argument('--allowlist', default='siteoptz_allowlist.txt')
+    parser.add_argument('--redirects', action='append', help='Redirect map CSV(s) (default: redirects_map.csv if present)')
+    parser.add_argument('--site-url', default='https://siteoptz.ai')
+    parser.add_argument('--min-group', type=int, default=2, help='Smallest group collapsed into one pattern rule')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Fixing Broken Canonical URLs")
+    print("=" * 60)
+
+    export = args.export or latest_export()
+    if not export:
+        print("❌ No broken_canonical_urls export found")
+        return
+    canonical_host = args.site_url.split('://', 1)[-1]
+
+    allowlist = load_allowlist(args.allowlist)
+    print(f"\nLoaded {len(allowlist)} allowlisted URLs")
+
+    redirect_files = args.redirects or [f for f in ['redirects_map.csv'] if os.path.exists(f)]
+    redirect_rows = []
+    for filename in redirect_files:
+        redirect_rows.extend(load_redirects(filename))
+    artifact = build_edge_artifact(parse_rules(redirect_rows, args.site_url)) if redirect_rows else None
+    print(f"Loaded {len(redirect_rows)} existing redirect rules")
+
+    print(f"\nStreaming {export}...")
+    groups = resolve_canonicals(iter_canonical_rows(export), allowlist, artifact, canonical_host)
+    redirects = build_canonical_redirects(groups, allowlist, args.site_url, args.min_group)
+
+    write_redirects(redirects, 'canonical_redirects.csv')
+    corrections = sorted(
+        ({k: v for k, v in g.items() if k != 'pairs'} for g in groups),
+        key=lambda g: g['pages'], reverse=True
+    )
+    with open('canonical_corrections.json', 'w') as f:
+        json.dump(corrections, f, indent=2)
+
+    total_pages = sum(g['pages'] for g in groups)
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    print(f"\nBroken canonicals: {total_pages}")
+    print(f"Template groups: {len(groups)}")
+    print(f"Redirect rules emitted: {len(redirects)}")
+    print("\nTop template corrections:")
+    for group in corrections[:10]:
+        print(f"  • {group['page_template']}: canonical {group['current_canonical']} → "
+              f"{group['corrected_canonical']} ({group['pages']} pages, {group['resolution']})")
+        if group.get('pattern_blocked_by'):
+            print(f"    Pattern rule would hijack live pages ({', '.join(group['pattern_blocked_by'][:3])}); "
+                  f"emitted {group['rules']} per-page rules until the template is fixed")
+
+    print("\n✓ Saved canonical_redirects.csv and canonical_corrections.json")
+    print("\nNext step: python3 generate_platform_config.py redirects_map.csv canonical_redirects.csv")
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,27 @@
 #!/usr/bin/env python3
 """
 Generate Platform-Specific Redirect Configuration
-Creates redirect configurations for Vercel, Netlify, Nginx, and Apache
+Creates redirect configurations for Vercel, Netlify, Nginx, Apache, Cloudflare,
+Caddy and Next.js from one parsed set of redirect rules
 """
 
+import argparse
 import csv
+import io
 import json
-from urllib.parse import urlparse, parse_qs
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import allowlist_index
+from redirect_rules import (parse_rules, order_rules, collapse_query_rules, source_of, is_pattern, pattern_regex,
+                            numbered_target, segment_pattern, query_condition_regex, select_rules, regex_escape)
+from edge_redirects import write_edge_artifact, write_edge_loader, verify_artifact
+from redirect_conflicts import ERROR_TYPES, RedirectConflictError, analyze_rules, print_conflicts
+
+VERCEL_REDIRECT_LIMIT = 1024
 
 def load_redirects(filename):
     """Load the redirect map"""
@@ -16,132 +31,284 @@ def load_redirects(filename):
         redirects = list(reader)
     return redirects
 
-def generate_vercel_config(redirects):
-    """Generate Vercel configuration (vercel.json)"""
-    vercel_redirects = []
-    
-    for r in redirects:
-        if r['action'] == '301':
-            source_path = r['path']
-            dest_url = r['to_url'].replace('https://siteoptz.ai', '')
-            
-            # Handle query strings specially in Vercel
-            if '?' in source_path:
-                path_part, query_part = source_path.split('?', 1)
-                # Parse query parameters
-                params = parse_qs(query_part)
-                
-                # Create has conditions for each parameter
-                has_conditions = []
-                for key, values in params.items():
-                    for value in values:
-                        has_conditions.append({
-                            "type": "query",
-                            "key": key,
-                            "value": value
-                        })
-                
-                vercel_redirects.append({
-                    "source": path_part,
-                    "has": has_conditions,
-                    "destination": dest_url,
-                    "permanent": True
-                })
-            else:
-                vercel_redirects.append({
-                    "source": source_path,
-                    "destination": dest_url,
-                    "permanent": True
-                })
+# Streaming emitters: each takes the parsed rules and a writable text stream
+
+def query_has(r):
+    """Vercel/Next.js has conditions; values are regexes, so escape the canonical value"""
+    return [{"type": "query", "key": key, "value": regex_escape(value)} for key, value in r.query]
+
+def write_vercel(rules, out):
+    """Stream Vercel configuration (vercel.json); returns the redirect count"""
+    redirect_rules = [r for r in rules if r.action == '301']
     
-    # Vercel has a limit of 1024 redirects
-    if len(vercel_redirects) > 1024:
-        print(f"Warning: Vercel supports max 1024 redirects, limiting to first 1024 (from {len(vercel_redirects)})")
-        vercel_redirects = vercel_redirects[:1024]
+    # Vercel has a limit of 1024 redirects; keep the most valuable, still in first-match order
+    if len(redirect_rules) > VERCEL_REDIRECT_LIMIT:
+        print(f"Warning: Vercel supports max {VERCEL_REDIRECT_LIMIT} redirects, keeping the {VERCEL_REDIRECT_LIMIT} highest-scoring (from {len(redirect_rules)}; patterns count the paths they cover)")
+        redirect_rules = select_rules(redirect_rules, VERCEL_REDIRECT_LIMIT)
     
-    vercel_config = {
-        "redirects": vercel_redirects
-    }
+    out.write('{\n  "redirects": [')
+    for i, r in enumerate(redirect_rules):
+        entry = {"source": r.path}
+        # Handle query strings specially in Vercel: a has condition per canonical parameter
+        if r.query:
+            entry["has"] = query_has(r)
+        entry["destination"] = r.target
+        entry["permanent"] = True
+        out.write((',' if i else '') + '\n    ' + json.dumps(entry))
+    out.write('\n  ]')
     
     # Add 410 Gone handling via rewrites to a custom 410 page
-    gone_paths = [r['path'] for r in redirects if r['action'] == '410']
-    if gone_paths:
-        vercel_config["rewrites"] = [
-            {
-                "source": path,
-                "destination": "/410.html"
-            } for path in gone_paths
-        ]
-    
-    return vercel_config
+    gone_rules = [r for r in rules if r.action == '410']
+    if gone_rules:
+        out.write(',\n  "rewrites": [')
+        for i, r in enumerate(gone_rules):
+            entry = {"source": r.path}
+            if r.query:
+                entry["has"] = query_has(r)
+            entry["destination"] = "/410.html"
+            out.write((',' if i else '') + '\n    ' + json.dumps(entry))
+        out.write('\n  ]')
+    out.write('\n}\n')
+    return len(redirect_rules)
+
+def netlify_paths(r):
+    """Source and target in Netlify syntax: a trailing ':name*' becomes '*' / ':splat'"""
+    source, target = r.path, r.target
+    if r.query:
+        # Netlify matches query parameters as space-separated key=value pairs after the path
+        source += ''.join(f" {quote(key, safe='')}={quote(value, safe='')}" for key, value in r.query)
+    splat = re.search(r':(\w+)\*$', r.path)
+    if splat:
+        source = r.path[:splat.start()] + '*'
+        target = target.replace(f':{splat.group(1)}*', ':splat').replace(f':{splat.group(1)}', ':splat')
+    return source, target
 
-def generate_netlify_config(redirects):
+def write_netlify(rules, out):
+    """Stream Netlify configuration (_redirects file)"""
+    for r in rules:
+        if is_pattern(r.path) and not segment_pattern(r.path):
+            # Netlify placeholders must fill whole segments
+            out.write(f"# unsupported pattern, handled at the edge: {r.path}\n")
+        elif r.action == '301':
+            source, target = netlify_paths(r)
+            out.write(f"{source}  {target}  301!\n")
+        elif r.action == '410':
+            out.write(f"{netlify_paths(r)[0]}  /410.html  410!\n")
+
+def write_nginx(rules, out):
+    """Stream Nginx configuration"""
+    for r in rules:
+        if is_pattern(r.path):
+            regex, names = pattern_regex(r.path)
+            if r.action == '301':
+                out.write(f'location ~ {regex} {{ return 301 {numbered_target(r.target_url, names)}; }}\n')
+            elif r.action == '410':
+                out.write(f'location ~ {regex} {{ return 410; }}\n')
+        elif r.query:
+            # One case-insensitive match per rule over the raw request URI, in any
+            # parameter order and encoding, ignoring extra (tracking) parameters
+            status = f'301 {r.target_url}' if r.action == '301' else '410'
+            out.write(f'if ($request_uri ~* "^{regex_escape(r.path)}/?\\?{query_condition_regex(r.query)}") {{ return {status}; }}\n')
+        elif r.action == '301':
+            out.write(f'location = {r.path} {{ return 301 {r.target_url}; }}\n')
+        elif r.action == '410':
+            out.write(f'location = {r.path} {{ return 410; }}\n')
+
+def write_apache(rules, out):
+    """Stream Apache .htaccess configuration"""
+    out.write('RewriteEngine On\n')
+    for r in rules:
+        if is_pattern(r.path):
+            regex, names = pattern_regex(r.path)
+            if r.action == '301':
+                out.write(f'RedirectMatch 301 {regex} {numbered_target(r.target, names)}\n')
+            elif r.action == '410':
+                out.write(f'RedirectMatch 410 {regex}\n')
+        elif r.query:
+            # Handle query strings in Apache: parameter order, encoding and extra params ignored
+            out.write(f'RewriteCond %{{REQUEST_URI}} ^{regex_escape(r.path)}/?$ [NC]\n')
+            out.write(f'RewriteCond %{{QUERY_STRING}} ^{query_condition_regex(r.query)} [NC]\n')
+            if r.action == '301':
+                out.write(f'RewriteRule .* {r.target}? [R=301,L]\n')
+            else:
+                out.write('RewriteRule .* - [G,L]\n')
+        elif r.action == '301':
+            out.write(f'Redirect 301 {r.path} {r.target}\n')
+        elif r.action == '410':
+            out.write(f'Redirect 410 {r.path}\n')
+
+def write_cloudflare(rules, out, host='siteoptz.ai'):
+    """Stream a Cloudflare bulk redirects CSV (301s on plain paths only)"""
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(['source_url', 'target_url', 'status_code', 'preserve_query_string',
+                     'include_subdomains', 'subpath_matching', 'preserve_path_suffix'])
+    for r in rules:
+        # Bulk redirects cannot match query strings or patterns, or answer 410
+        if r.action == '301' and not r.query and not is_pattern(r.path):
+            writer.writerow([f"{host}{r.path}", r.target_url, 301, 'FALSE', 'TRUE', 'FALSE', 'FALSE'])
+
+def write_caddy(rules, out):
+    """Stream Caddyfile directives for a site block"""
+    for i, r in enumerate(rules):
+        target = r.target
+        if is_pattern(r.path):
+            regex, names = pattern_regex(r.path)
+            matcher = f"@redirect{i}"
+            out.write(f"{matcher} path_regexp p {regex}\n")
+            target = numbered_target(r.target, names, '{{re.p.{}}}')
+        elif r.query:
+            matcher = f"@redirect{i}"
+            query = ' '.join(json.dumps(f"{key}={value}") for key, value in r.query)
+            out.write(f"{matcher} {{\n\tpath {r.path}\n\tquery {query}\n}}\n")
+        else:
+            matcher = r.path
+        if r.action == '301':
+            out.write(f"redir {matcher} {target} 301\n")
+        elif r.action == '410':
+            out.write(f"respond {matcher} 410\n")
+
+def write_nextjs(rules, out):
+    """Stream a Next.js module exporting redirects() entries and 410 paths"""
+    out.write('module.exports = {\n  redirects: [')
+    count = 0
+    for r in rules:
+        if r.action != '301':
+            continue
+        entry = {"source": r.path}
+        if r.query:
+            entry["has"] = query_has(r)
+        entry["destination"] = r.target
+        entry["permanent"] = True
+        out.write((',' if count else '') + '\n    ' + json.dumps(entry))
+        count += 1
+    out.write('\n  ],\n  gone: [')
+    gone = [source_of(r) for r in rules if r.action == '410']
+    for i, path in enumerate(gone):
+        out.write((',' if i else '') + '\n    ' + json.dumps(path))
+    out.write('\n  ]\n};\n')
+
+# Platform registry: output file, comment header and streaming emitter
+EMITTERS = {
+    'vercel': {'label': 'Vercel', 'filename': 'vercel.json', 'header': None, 'write': write_vercel},
+    'netlify': {'label': 'Netlify', 'filename': '_redirects', 'write': write_netlify,
+                'header': "# Netlify redirect rules for {site_name}\n# Generated from 404 inventory analysis\n\n"},
+    'nginx': {'label': 'Nginx', 'filename': 'nginx_redirects.conf', 'write': write_nginx,
+              'header': "# Nginx redirect configuration for {site_name}\n# Add these rules to your server block\n\n"},
+    'apache': {'label': 'Apache', 'filename': '.htaccess_redirects', 'write': write_apache,
+               'header': "# Apache redirect rules for {site_name}\n# Add these to your .htaccess file\n\n"},
+    'cloudflare': {'label': 'Cloudflare', 'filename': 'cloudflare_bulk_redirects.csv', 'header': None,
+                   'write': write_cloudflare},
+    'caddy': {'label': 'Caddy', 'filename': 'Caddyfile.redirects', 'write': write_caddy,
+              'header': "# Caddy redirect directives for {site_name}\n# Import inside your site block\n\n"},
+    'nextjs': {'label': 'Next.js', 'filename': 'redirects.generated.js', 'write': write_nextjs,
+               'header': "// Next.js redirects for {site_name}\n// Use from next.config.js: async redirects() {{ return require('./redirects.generated').redirects }}\n\n"},
+    'edge': {'label': 'Edge middleware', 'filename': 'redirects-edge.json', 'header': None, 'write': write_edge_artifact,
+             'companions': [('edgeRedirects.generated.ts', write_edge_loader)]}
+}
+
+def _render(write, redirects, site_url):
+    out = io.StringIO()
+    write(order_rules(collapse_query_rules(parse_rules(redirects, site_url))), out)
+    return out.getvalue()
+
+# String/dict wrappers kept for callers that want the config in memory
+
+def generate_vercel_config(redirects, site_url='https://siteoptz.ai'):
+    """Generate Vercel configuration (vercel.json)"""
+    return json.loads(_render(write_vercel, redirects, site_url))
+
+def generate_netlify_config(redirects, site_url='https://siteoptz.ai'):
     """Generate Netlify configuration (_redirects file)"""
-    netlify_rules = []
-    
-    for r in redirects:
-        source = r['path']
-        
-        if r['action'] == '301':
-            dest = r['to_url'].replace('https://siteoptz.ai', '')
-            netlify_rules.append(f"{source}  {dest}  301!")
-        elif r['action'] == '410':
-            netlify_rules.append(f"{source}  /410.html  410!")
-    
-    return '\n'.join(netlify_rules)
+    return _render(write_netlify, redirects, site_url).rstrip('\n')
 
-def generate_nginx_config(redirects):
+def generate_nginx_config(redirects, site_url='https://siteoptz.ai'):
     """Generate Nginx configuration"""
-    nginx_rules = []
-    
-    for r in redirects:
-        source = r['path']
-        
-        if r['action'] == '301':
-            dest = r['to_url']
-            if '?' in source:
-                # Handle query strings in Nginx
-                path_part = source.split('?')[0]
-                query_part = source.split('?')[1]
-                nginx_rules.append(f'if ($request_uri ~* "^{path_part}\?{query_part}$") {{ return 301 {dest}; }}')
-            else:
-                nginx_rules.append(f'location = {source} {{ return 301 {dest}; }}')
-        elif r['action'] == '410':
-            nginx_rules.append(f'location = {source} {{ return 410; }}')
-    
-    return '\n'.join(nginx_rules)
+    return _render(write_nginx, redirects, site_url).rstrip('\n')
 
-def generate_apache_config(redirects):
+def generate_apache_config(redirects, site_url='https://siteoptz.ai'):
     """Generate Apache .htaccess configuration"""
-    apache_rules = ['RewriteEngine On']
+    return _render(write_apache, redirects, site_url).rstrip('\n')
+
+def emit_platform(platform, rules, output_dir, site_url, site_name):
+    """Stream one platform's configuration to disk"""
+    emitter = EMITTERS[platform]
+    filename = os.path.join(output_dir, emitter['filename'])
+    with open(filename, 'w', newline='') as f:
+        if emitter['header']:
+            f.write(emitter['header'].format(site_name=site_name))
+        if platform == 'cloudflare':
+            result = emitter['write'](rules, f, host=site_url.split('://', 1)[-1])
+        else:
+            result = emitter['write'](rules, f)
+    for companion, write in emitter.get('companions', []):
+        with open(os.path.join(output_dir, companion), 'w') as f:
+            write(rules, f)
+    return filename, result
+
+def write_platform_configs(redirects, platforms=('vercel', 'netlify', 'nginx', 'apache'),
+                           output_dir='.', site_url='https://siteoptz.ai', site_name='SiteOptz.ai',
+                           allowlist=None, allow_conflicts=False):
+    """Parse the redirect map once, check it for conflicts and write every platform's config concurrently"""
+    rules = order_rules(collapse_query_rules(parse_rules(redirects, site_url)))
     
-    for r in redirects:
-        source = r['path']
-        
-        if r['action'] == '301':
-            dest = r['to_url'].replace('https://siteoptz.ai', '')
-            if '?' in source:
-                # Handle query strings in Apache
-                path_part = source.split('?')[0]
-                query_part = source.split('?')[1]
-                apache_rules.append(f'RewriteCond %{{REQUEST_URI}} ^{path_part}$')
-                apache_rules.append(f'RewriteCond %{{QUERY_STRING}} ^{query_part}$')
-                apache_rules.append(f'RewriteRule .* {dest}? [R=301,L]')
+    print("\nChecking rules for conflicts...")
+    conflicts = analyze_rules(rules, allowlist)
+    if conflicts:
+        print_conflicts(conflicts)
+    else:
+        print("   ✓ No duplicate, contradictory, shadowed or hijacking rules")
+    if not allow_conflicts and any(c['type'] in ERROR_TYPES for c in conflicts):
+        raise RedirectConflictError(conflicts)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    
+    for platform in platforms:
+        if platform not in EMITTERS:
+            print(f"\nSkipping unknown platform: {platform}")
+    platforms = [p for p in platforms if p in EMITTERS]
+    
+    print(f"\nGenerating {', '.join(EMITTERS[p]['label'] for p in platforms)} configurations...")
+    with ThreadPoolExecutor(max_workers=max(1, len(platforms))) as pool:
+        futures = [pool.submit(emit_platform, p, rules, output_dir, site_url, site_name) for p in platforms]
+        written = []
+        for platform, future in zip(platforms, futures):
+            filename, result = future.result()
+            if platform == 'vercel':
+                print(f"   ✓ Created {filename} with {result} redirects")
+            elif platform == 'edge':
+                print(f"   ✓ Created {filename} with {result} lookup entries (+ {EMITTERS['edge']['companions'][0][0]})")
             else:
-                apache_rules.append(f'Redirect 301 {source} {dest}')
-        elif r['action'] == '410':
-            apache_rules.append(f'Redirect 410 {source}')
+                print(f"   ✓ Created {filename}")
+            written.append(filename)
+    
+    if 'edge' in platforms:
+        # Replay every rule through the Python emulator of the edge lookup
+        with open(os.path.join(output_dir, EMITTERS['edge']['filename']), 'r') as f:
+            mismatches = verify_artifact(json.load(f), rules)
+        if mismatches:
+            print(f"   ⚠ {len(mismatches)} rules resolve differently at the edge (first: {mismatches[0]})")
+        else:
+            print("   ✓ Verified every rule against the edge lookup emulator")
     
-    return '\n'.join(apache_rules)
+    return written
 
 def main():
     print("=" * 60)
     print("Generating Platform-Specific Redirect Configurations")
     print("=" * 60)
     
-    # Load redirects
+    parser = argparse.ArgumentParser(description='Generate platform redirect configs from redirect maps')
+    parser.add_argument('maps', nargs='*', default=['redirects_map.csv'],
+                        help='Redirect map CSVs, e.g. redirects_map.csv canonical_redirects.csv')
+    parser.add_argument('--allowlist', default='siteoptz_allowlist.txt', help='Live pages that must not be redirected')
+    parser.add_argument('--allow-conflicts', action='store_true', help='Emit even when the conflict check fails')
+    args = parser.parse_args()
+    
+    # Load redirects (extra maps such as canonical_redirects.csv can be passed as arguments)
     print("\nLoading redirect map...")
-    redirects = load_redirects('redirects_map.csv')
+    redirects = []
+    for filename in args.maps:
+        redirects.extend(load_redirects(filename))
     print(f"Loaded {len(redirects)} redirect rules")
     
     # Count actions
@@ -153,46 +320,17 @@ def main():
     print(f"  • 301 Redirects: {action_counts.get('301', 0)}")
     print(f"  • 410 Gone: {action_counts.get('410', 0)}")
     
-    # Generate Vercel configuration
-    print("\n1. Generating Vercel configuration...")
-    vercel_config = generate_vercel_config(redirects)
-    
-    with open('vercel.json', 'w') as f:
-        json.dump(vercel_config, f, indent=2)
-    print(f"   ✓ Created vercel.json with {len(vercel_config['redirects'])} redirects")
-    
-    # Generate Netlify configuration
-    print("\n2. Generating Netlify configuration...")
-    netlify_config = generate_netlify_config(redirects)
-    
-    with open('_redirects', 'w') as f:
-        f.write("# Netlify redirect rules for SiteOptz.ai\n")
-        f.write("# Generated from 404 inventory analysis\n\n")
-        f.write(netlify_config)
-    print(f"   ✓ Created _redirects file")
-    
-    # Generate Nginx configuration
-    print("\n3. Generating Nginx configuration...")
-    nginx_config = generate_nginx_config(redirects)
-    
-    with open('nginx_redirects.conf', 'w') as f:
-        f.write("# Nginx redirect configuration for SiteOptz.ai\n")
-        f.write("# Add these rules to your server block\n\n")
-        f.write(nginx_config)
-    print(f"   ✓ Created nginx_redirects.conf")
-    
-    # Generate Apache configuration
-    print("\n4. Generating Apache configuration...")
-    apache_config = generate_apache_config(redirects)
-    
-    with open('.htaccess_redirects', 'w') as f:
-        f.write("# Apache redirect rules for SiteOptz.ai\n")
-        f.write("# Add these to your .htaccess file\n\n")
-        f.write(apache_config)
-    print(f"   ✓ Created .htaccess_redirects")
+    allowlist = allowlist_index.load_or_build(args.allowlist) if os.path.exists(args.allowlist) else None
+    try:
+        write_platform_configs(redirects, platforms=list(EMITTERS), allowlist=allowlist,
+                               allow_conflicts=args.allow_conflicts)
+    except RedirectConflictError as e:
+        print(f"\n❌ Refusing to emit configs: {e}")
+        print("   Fix the redirect map (see above) or rerun with --allow-conflicts")
+        sys.exit(1)
     
     # Create a sample 410.html page
-    print("\n5. Creating 410 Gone page template...")
+    print("\nCreating 410 Gone page template...")
     gone_page = """<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -287,6 +425,25 @@ def main():
     print("  2. Ensure mod_rewrite is enabled")
     print("  3. Test with: apachectl configtest")
     
+    print("\nFor Cloudflare:")
+    print("  1. Upload cloudflare_bulk_redirects.csv as a Bulk Redirect List")
+    print("  2. Query-string and 410 rules are not supported there; keep them at the origin")
+    
+    print("\nFor Caddy:")
+    print("  1. import Caddyfile.redirects inside your site block")
+    print("  2. Validate with: caddy validate")
+    
+    print("\nFor Next.js:")
+    print("  1. Copy redirects.generated.js next to next.config.js")
+    print("  2. Return require('./redirects.generated').redirects from redirects()")
+    
+    print("\nFor Edge middleware (no redirect count cap):")
+    print("  1. Copy redirects-edge.json and edgeRedirects.generated.ts into lib/")
+    print("  2. In middleware.ts: const hit = lookupRedirect(pathname, searchParams)")
+    print("  3. Return NextResponse.redirect(new URL(hit.destination, request.url), hit.status),")
+    print("     or rewrite to /410.html with status 410 when hit.destination is null")
+    print("  4. Verify lookups offline: python3 edge_redirects.py redirects-edge.json /some/path")
+    
     print("\n✓ All configuration files generated successfully!")
     print("\nNext steps:")
     print("  1. Review the generated configurations")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Internal Link Provenance for SiteOptz.ai
+Keeps the complete source page -> broken target edge list from the
+internal_broken_links export as an integer-encoded CSR adjacency, clusters
+broken targets that share the same set of source pages, and searches pages/
+and components/ for the file that emits each cluster's links. Fixing one
+emitter removes its 404s at the source instead of redirecting them forever.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+from collections import defaultdict
+from urllib.parse import quote, unquote, urlparse
+
+import numpy as np
+
+from build_404_inventory import load_broken_links, path_template
+from redirect_rules import match_pattern
+
+DEFAULT_GRAPH = 'link_graph.npz'
+SOURCE_DIRS = ('pages', 'components')
+SOURCE_EXTENSIONS = ('.tsx', '.ts', '.jsx', '.js')
+IMPORT_PATTERN = re.compile(r'''(?:from\s+|import\s+|require\()\s*['"]([^'"]+)['"]''')
+ROUTE_PARAM = re.compile(r'\[(\.\.\.)?(\w+)\]')
+
+# Needle weights: literal link > template literal building it > bare static prefix
+EXACT_WEIGHT = 3.0
+DYNAMIC_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.5
+ROUTE_BOOST = 2.0
+MAX_NEEDLE_TARGETS = 50
+SAMPLE_SIZE = 5
+
+
+def latest_export(pattern='siteoptz.ai_internal_broken_links_*.csv'):
+    files = sorted(glob.glob(pattern))
+    return files[-1] if files else None
+
+
+def link_target(url):
+    """Inventory key of a broken link: lowercase path plus query, as in create_404_inventory"""
+    parsed = urlparse(url.lower())
+    return parsed.path + ('?' + parsed.query if parsed.query else '')
+
+
+def link_source(url):
+    return urlparse(url.strip().lower()).path.rstrip('/') or '/'
+
+
+class LinkGraph:
+    """Broken-link edges as CSR: targets index rows, source page ids are the columns"""
+
+    def __init__(self, sources, targets, indptr, indices):
+        self.sources = sources
+        self.targets = targets
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_links(cls, broken_links):
+        source_ids, target_ids = {}, {}
+        src, tgt = [], []
+        for link in broken_links:
+            src.append(source_ids.setdefault(link_source(link['source_page']), len(source_ids)))
+            tgt.append(target_ids.setdefault(link_target(link['broken_url']), len(target_ids)))
+
+        num_sources = max(len(source_ids), 1)
+        # One int64 key per edge; unique() sorts by target then source and drops repeats
+        keys = np.unique(np.asarray(tgt, dtype=np.int64) * num_sources + np.asarray(src, dtype=np.int64))
+        rows = keys // num_sources
+        indices = (keys % num_sources).astype(np.int32)
+        indptr = np.zeros(len(target_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(target_ids)), out=indptr[1:])
+        return cls(list(source_ids), list(target_ids), indptr, indices)
+
+    @classmethod
+    def load(cls, filename):
+        data = np.load(filename)
+        sources = bytes(data['sources']).decode('utf-8').split('\n') if data['sources'].size else []
+        targets = bytes(data['targets']).decode('utf-8').split('\n') if data['targets'].size else []
+        return cls(sources, targets, data['indptr'], data['indices'])
+
+    def save(self, filename):
+        """Compact on-disk form: newline-joined string tables plus the CSR arrays"""
+        np.savez_compressed(
+            filename,
+            sources=np.frombuffer('\n'.join(self.sources).encode('utf-8'), dtype=np.uint8),
+            targets=np.frombuffer('\n'.join(self.targets).encode('utf-8'), dtype=np.uint8),
+            indptr=self.indptr,
+            indices=self.indices
+        )
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def sources_of(self, target_id):
+        return self.indices[self.indptr[target_id]:self.indptr[target_id + 1]]
+
+
+def cluster_targets(graph):
+    """Group targets whose source page sets are identical"""
+    clusters = defaultdict(list)
+    for t in range(len(graph.targets)):
+        clusters[graph.sources_of(t).tobytes()].append(t)
+    result = []
+    for target_ids in clusters.values():
+        source_ids = graph.sources_of(target_ids[0])
+        result.append({'targets': target_ids, 'sources': source_ids, 'edges': len(target_ids) * len(source_ids)})
+    result.sort(key=lambda c: c['edges'], reverse=True)
+    return result
+
+
+class SourceTree:
+    """Lowercased text of every page/component file plus the Next.js route table and import graph"""
+
+    def __init__(self, root='.', dirs=SOURCE_DIRS):
+        self.root = root
+        self.files = {}
+        for directory in dirs:
+            for dirpath, _, filenames in os.walk(os.path.join(root, directory)):
+                for name in filenames:
+                    if name.endswith(SOURCE_EXTENSIONS):
+                        path = os.path.relpath(os.path.join(dirpath, name), root)
+                        with open(os.path.join(root, path), 'r', encoding='utf-8', errors='replace') as f:
+                            self.files[path] = f.read()
+        self.lowered = {path: text.lower() for path, text in self.files.items()}
+        self.routes = self._build_routes()
+        self.imports = {path: self._resolve_imports(path, text) for path, text in self.files.items()}
+        self._closure = {}
+
+    def _build_routes(self):
+        routes = []
+        for path in self.files:
+            parts = path.split(os.sep)
+            if parts[0] != 'pages' or parts[1:2] == ['api'] or os.path.basename(path).startswith('_'):
+                continue
+            route = '/' + '/'.join(parts[1:])
+            route = os.path.splitext(route)[0]
+            route = re.sub(r'/index$', '', route) or '/'
+            pattern = ROUTE_PARAM.sub(lambda m: f":{m.group(2)}{'*' if m.group(1) else ''}", route).lower()
+            # Static routes win over dynamic ones, as in Next.js
+            routes.append((pattern.count(':'), pattern, path))
+        routes.sort()
+        return routes
+
+    def _resolve_imports(self, path, text):
+        resolved = []
+        for spec in IMPORT_PATTERN.findall(text):
+            if spec.startswith('@/'):
+                base = os.path.join(self.root, spec[2:])
+            elif spec.startswith('.'):
+                base = os.path.join(self.root, os.path.dirname(path), spec)
+            else:
+                continue
+            base = os.path.relpath(os.path.normpath(base), self.root)
+            for candidate in [base] + [base + ext for ext in SOURCE_EXTENSIONS] + \
+                    [os.path.join(base, 'index' + ext) for ext in SOURCE_EXTENSIONS]:
+                if candidate in self.files:
+                    resolved.append(candidate)
+                    break
+        return resolved
+
+    def route_file(self, page_path):
+        for _, pattern, path in self.routes:
+            if match_pattern(pattern, page_path) is not None:
+                return path
+        return None
+
+    def rendered_files(self, route_path):
+        """The page file plus everything it (transitively) imports, and the _app shell"""
+        if route_path not in self._closure:
+            seen = set()
+            stack = [route_path] + [p for p in self.files if os.path.basename(p).startswith('_app.')]
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                stack.extend(self.imports.get(current, []))
+            self._closure[route_path] = seen
+        return self._closure[route_path]
+
+
+def target_needles(target):
+    """(needle, weight) pairs that would appear in code emitting this link"""
+    path, _, query = target.partition('?')
+    decoded = unquote(target)
+    needles = {(target, EXACT_WEIGHT), (decoded, EXACT_WEIGHT),
+               (quote(decoded, safe='/?=&').lower(), EXACT_WEIGHT)}
+    if query:
+        prefix = path + '?' + query.split('=', 1)[0] + '='
+    else:
+        template = path_template(path)
+        prefix = template.split(':', 1)[0] if ':' in template else ''
+    if prefix and prefix != '/':
+        needles.add((prefix + '${', DYNAMIC_WEIGHT))
+        if prefix.count('/') > 1 or '?' in prefix:
+            needles.add((prefix, PREFIX_WEIGHT))
+    return needles
+
+
+def locate_emitters(cluster, graph, tree, limit=3):
+    """Rank source files by how many of the cluster's links they appear to emit"""
+    target_ids = cluster['targets'][:MAX_NEEDLE_TARGETS]
+    needles = [target_needles(graph.targets[t]) for t in target_ids]
+
+    # Files actually rendered by the pages that carry the broken links
+    rendered = set()
+    for source_id in cluster['sources'][:MAX_NEEDLE_TARGETS]:
+        route_path = tree.route_file(graph.sources[source_id])
+        if route_path:
+            rendered |= tree.rendered_files(route_path)
+
+    scores = {}
+    for path, text in tree.lowered.items():
+        score = 0.0
+        for target_needles_ in needles:
+            score += max((w for needle, w in target_needles_ if needle in text), default=0.0)
+        if score:
+            scores[path] = score * (ROUTE_BOOST if path in rendered else 1.0)
+
+    emitters = []
+    for path, score in sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]:
+        strong = {needle for target_needles_ in needles for needle, w in target_needles_ if w >= DYNAMIC_WEIGHT}
+        lines = [i for i, line in enumerate(tree.files[path].lower().split('\n'), 1)
+                 if any(needle in line for needle in strong)]
+        emitters.append({
+            'file': path,
+            'score': round(score / len(target_ids), 2),
+            'rendered_by_sources': path in rendered,
+            'lines': lines[:10]
+        })
+    return emitters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trace broken internal links back to the code emitting them')
+    parser.add_argument('export', nargs='?', help='internal_broken_links CSV (default: latest in current directory)')
+    parser.add_argument('--graph', default=DEFAULT_GRAPH, help='Where to save the CSR link graph')
+    parser.add_argument('--root', default='.', help='Repository root containing pages/ and components/')
+    parser.add_argument('--clusters', type=int, default=25, help='Clusters to trace to source files')
+    parser.add_argument('--output', default='link_provenance.json')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Tracing Broken Link Provenance for SiteOptz.ai")
+    print("=" * 60)
+
+    export = args.export or latest_export()
+    if not export:
+        print("❌ No internal_broken_links export found")
+        return
+
+    print(f"\nLoading {export}...")
+    graph = LinkGraph.from_links(load_broken_links(export))
+    graph.save(args.graph)
+    print(f"Graph: {len(graph.sources)} source pages, {len(graph.targets)} broken targets, {graph.num_edges} edges")
+    print(f"✓ Saved {args.graph} ({os.path.getsize(args.graph) / 1024:.1f} KB)")
+
+    clusters = cluster_targets(graph)
+    print(f"Clustered into {len(clusters)} shared-source groups")
+
+    print("\nIndexing pages/ and components/...")
+    tree = SourceTree(args.root)
+    print(f"Indexed {len(tree.files)} source files, {len(tree.routes)} routes")
+
+    report = []
+    for cluster in clusters[:args.clusters]:
+        report.append({
+            'edges': cluster['edges'],
+            'target_count': len(cluster['targets']),
+            'source_count': len(cluster['sources']),
+            'sample_targets': [graph.targets[t] for t in cluster['targets'][:SAMPLE_SIZE]],
+            'sample_sources': [graph.sources[s] for s in cluster['sources'][:SAMPLE_SIZE]],
+            'emitters': locate_emitters(cluster, graph, tree)
+        })
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    print(f"\nTop clusters by broken-link edges ({graph.num_edges} total):")
+    for i, entry in enumerate(report[:10], 1):
+        print(f"\n{i:2}. {entry['target_count']} targets × {entry['source_count']} pages = {entry['edges']} edges")
+        print(f"    e.g. {entry['sample_targets'][0]}")
+        if entry['emitters']:
+            top = entry['emitters'][0]
+            lines = f" (lines {', '.join(map(str, top['lines'][:5]))})" if top['lines'] else ''
+            print(f"    Likely emitter: {top['file']}{lines}")
+        else:
+            print("    No emitter found in pages/ or components/")
+
+    print(f"\n✓ Saved {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Streaming Markdown Event Parser
+Turns markdown, line by line, into a stream of typed block events (headings,
+paragraphs, nested list items, fenced code, tables, quotes, rules) whose text
+is already split into inline spans (bold, italic, code, links). Only the block
+being assembled is held in memory, so one parse can feed every document
+writer (see create_document_formats) regardless of file size.
+"""
+
+import re
+import sys
+from collections import namedtuple
+
+# Block events
+Heading = namedtuple('Heading', ['level', 'inlines'])
+Paragraph = namedtuple('Paragraph', ['inlines'])
+ListItem = namedtuple('ListItem', [
+    'depth',      # 0 for top-level items, +1 per nesting level
+    'number',     # item number for ordered lists, None for bullets
+    'inlines'
+])
+CodeBlock = namedtuple('CodeBlock', [
+    'language',
+    'text',
+    'depth'       # depth of the list item it is nested in, None at top level
+], defaults=(None,))
+Table = namedtuple('Table', ['header', 'rows'])  # lists of cells, each cell a list of spans
+Quote = namedtuple('Quote', ['inlines'])
+Rule = namedtuple('Rule', [])
+
+# Inline text run
+Span = namedtuple('Span', ['text', 'bold', 'italic', 'code', 'href'], defaults=(False, False, False, None))
+
+FENCE = re.compile(r'^( *)(`{3,}|~{3,})\s*([\w+#.-]*)')
+HEADING = re.compile(r'^\s{0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+RULE = re.compile(r'^\s{0,3}([-*_])(?:\s*\1){2,}\s*$')
+LIST_ITEM = re.compile(r'^(\s*)(?:[-*+]|(\d{1,9})[.)])\s+(.*)$')
+QUOTE = re.compile(r'^\s{0,3}>\s?(.*)$')
+TABLE_SEPARATOR = re.compile(r'^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$')
+
+INLINE = re.compile(
+    r'`([^`]+)`'                                  # code
+    r'|!\[([^\]]*)\]\([^)]*\)'                    # image: keep the alt text
+    r'|\[([^\]]+)\]\(\s*<?([^)\s>]+)>?[^)]*\)'    # link
+    r'|\*\*(.+?)\*\*|__(.+?)__'                   # bold
+    r'|\*(?!\s)(.+?)\*|(?<!\w)_(?!\s)(.+?)_(?!\w)'  # italic
+)
+
+
+def parse_inlines(text, bold=False, italic=False, href=None):
+    """Split inline markdown into Spans; emphasis and links may nest"""
+    spans = []
+    pos = 0
+    for match in INLINE.finditer(text):
+        if match.start() > pos:
+            spans.append(Span(text[pos:match.start()], bold, italic, False, href))
+        code, alt, link_text, url, bold1, bold2, italic1, italic2 = match.groups()
+        if code is not None:
+            spans.append(Span(code, bold, italic, True, href))
+        elif alt is not None:
+            if alt:
+                spans.append(Span(alt, bold, italic, False, href))
+        elif link_text is not None:
+            spans.extend(parse_inlines(link_text, bold, italic, url))
+        elif bold1 is not None or bold2 is not None:
+            spans.extend(parse_inlines(bold1 if bold1 is not None else bold2, True, italic, href))
+        else:
+            spans.extend(parse_inlines(italic1 if italic1 is not None else italic2, bold, True, href))
+        pos = match.end()
+    if pos < len(text):
+        spans.append(Span(text[pos:], bold, italic, False, href))
+    return spans
+
+
+def plain_text(spans):
+    return ''.join(span.text for span in spans)
+
+
+def _cells(line):
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    cells = re.split(r'(?<!\\)\|', line)
+    return [parse_inlines(cell.strip().replace('\\|', '|')) for cell in cells]
+
+
+class MarkdownParser:
+    """Incremental block parser: feed() lines, get back the events they complete"""
+
+    def __init__(self):
+        self.paragraph = []
+        self.quote = []
+        self.item = None        # [depth, number, lines]
+        self.indents = []       # indentation of each open list level
+        self.columns = []       # column where the latest item's text starts, per open level
+        self.fence = None       # [marker, language, lines, depth, indent]
+        self.table = None       # [header cells, rows]
+        self.candidate = None   # a '|' line that becomes a table header if a separator follows
+
+    def _flush(self):
+        events = []
+        if self.paragraph:
+            events.append(Paragraph(parse_inlines(' '.join(self.paragraph))))
+            self.paragraph = []
+        if self.item:
+            depth, number, lines = self.item
+            events.append(ListItem(depth, number, parse_inlines(' '.join(lines))))
+            self.item = None
+        if self.quote:
+            events.append(Quote(parse_inlines(' '.join(self.quote))))
+            self.quote = []
+        return events
+
+    def _close_lists(self, keep=0):
+        del self.indents[keep:]
+        del self.columns[keep:]
+
+    def _container(self, indent):
+        """Deepest open list level whose item text starts at or before this column"""
+        for depth in range(len(self.columns) - 1, -1, -1):
+            if self.columns[depth] <= indent:
+                return depth
+        return None
+
+    def feed(self, line):
+        line = line.rstrip('\r\n').expandtabs(4)
+
+        if self.fence:
+            marker, language, lines, depth, indent = self.fence
+            stripped = line.strip()
+            if stripped.startswith(marker) and not stripped.strip(marker[0]):
+                self.fence = None
+                return [CodeBlock(language, '\n'.join(lines), depth)]
+            # Drop the fence's own indentation from its contents
+            lines.append(line[min(indent, len(line) - len(line.lstrip(' '))):])
+            return []
+
+        events = []
+        if self.candidate is not None:
+            header, self.candidate = self.candidate, None
+            if TABLE_SEPARATOR.match(line):
+                self.table = [_cells(header), []]
+                return events
+            self.paragraph.append(header.strip())
+
+        if self.table is not None:
+            if line.strip().startswith('|'):
+                self.table[1].append(_cells(line))
+                return events
+            events.append(Table(*self.table))
+            self.table = None
+
+        stripped = line.strip()
+        if not stripped:
+            return events + self._flush()
+
+        # A fence may be indented up to 3 columns past the text of the list item it belongs to
+        fence = FENCE.match(line)
+        if fence:
+            indent = len(fence.group(1))
+            depth = self._container(indent)
+            if indent - (self.columns[depth] if depth is not None else 0) <= 3:
+                self._close_lists(0 if depth is None else depth + 1)
+                self.fence = [fence.group(2), fence.group(3), [], depth, indent]
+                return events + self._flush()
+
+        heading = HEADING.match(line)
+        if heading:
+            self._close_lists()
+            return events + self._flush() + [Heading(len(heading.group(1)), parse_inlines(heading.group(2)))]
+
+        if RULE.match(line):
+            self._close_lists()
+            return events + self._flush() + [Rule()]
+
+        item = LIST_ITEM.match(line)
+        if item:
+            events += self._flush()
+            indent = len(item.group(1))
+            while self.indents and self.indents[-1] > indent:
+                self._close_lists(len(self.indents) - 1)
+            if not self.indents or self.indents[-1] < indent:
+                self.indents.append(indent)
+            self.columns[len(self.indents) - 1:] = [item.start(3)]
+            number = int(item.group(2)) if item.group(2) else None
+            self.item = [len(self.indents) - 1, number, [item.group(3).strip()]]
+            return events
+
+        quote = QUOTE.match(line)
+        if quote:
+            if not self.quote:
+                events += self._flush()
+            self.quote.append(quote.group(1).strip())
+            return events
+
+        if stripped.startswith('|'):
+            events += self._flush()
+            self.candidate = line
+            return events
+
+        # Plain text continues the open list item, quote or paragraph (lazy continuation)
+        if self.item:
+            self.item[2].append(stripped)
+        elif self.quote:
+            self.quote.append(stripped)
+        else:
+            if not self.paragraph:
+                self._close_lists()
+            self.paragraph.append(stripped)
+        return events
+
+    def close(self):
+        events = []
+        if self.fence:
+            events.append(CodeBlock(self.fence[1], '\n'.join(self.fence[2]), self.fence[3]))
+            self.fence = None
+        if self.candidate is not None:
+            self.paragraph.append(self.candidate.strip())
+            self.candidate = None
+        if self.table is not None:
+            events.append(Table(*self.table))
+            self.table = None
+        return events + self._flush()
+
+
+def iter_events(lines):
+    """Stream block events from any iterable of lines (e.g. an open file)"""
+    parser = MarkdownParser()
+    for line in lines:
+        yield from parser.feed(line)
+    yield from parser.close()
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'GOOGLE_ADS_API_DESIGN_DOCUMENT.md'
+    counts = {}
+    with open(source, 'r', encoding='utf-8') as f:
+        for event in iter_events(f):
+            kind = type(event).__name__
+            counts[kind] = counts.get(kind, 0) + 1
+    print(f"{source}: " + ', '.join(f"{count} {kind}" for kind, count in sorted(counts.items())))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Warm Pandoc Backend for the Document Converters
+Starts `pandoc server` once and sends every conversion to it over a local
+keep-alive HTTP connection, so converting hundreds of documents no longer pays
+pandoc's process start-up per (source, format). PDFs are rendered from
+standalone LaTeX that the caller can cache next to the JSON AST. When the
+server is unavailable (pandoc < 3, or a build without working server support)
+the same interface falls back to one pandoc process per conversion.
+"""
+
+import base64
+import http.client
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+STARTUP_TIMEOUT = 5.0
+REQUEST_TIMEOUT = 120
+LATEX_RUNS = 3  # like pandoc: rerun until the table of contents settles
+
+
+class PandocError(Exception):
+    """A conversion failed (pandoc or the LaTeX engine reported an error)"""
+
+
+def server_options(args):
+    """Translate pandoc command-line options into pandoc server request fields"""
+    options, variables = {}, {}
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg in ('--toc', '--table-of-contents'):
+            options['table-of-contents'] = True
+        elif arg in ('-N', '--number-sections'):
+            options['number-sections'] = True
+        elif arg in ('-s', '--standalone'):
+            options['standalone'] = True
+        elif arg in ('-V', '--variable'):
+            name, *value = re.split(r'[=:]', args.pop(0), maxsplit=1)
+            variables[name] = value[0] if value else True
+        else:
+            raise PandocError(f"Option not supported by pandoc server: {arg}")
+    if variables:
+        options['variables'] = variables
+    return options
+
+
+class PandocCommand:
+    """Cold fallback: one pandoc process per conversion"""
+
+    warm = False
+    port = None
+
+    def convert(self, text, reader, writer, args=()):
+        """Convert text and return the output bytes"""
+        result = subprocess.run(['pandoc', '-f', reader, '-t', writer, *args, '-o', '-'],
+                                input=text.encode('utf-8'), capture_output=True)
+        if result.returncode != 0:
+            raise PandocError(result.stderr.decode('utf-8', 'replace').strip())
+        return result.stdout
+
+    def close(self):
+        pass
+
+
+class PandocServer:
+    """Client for a `pandoc server` process; one keep-alive connection per client"""
+
+    warm = True
+
+    def __init__(self, port, process=None):
+        self.port = port
+        self.process = process
+        self.connection = None
+
+    @classmethod
+    def start(cls, timeout=STARTUP_TIMEOUT):
+        """Spawn `pandoc server` on a free port and wait until it converts a probe document"""
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        try:
+            process = subprocess.Popen(['pandoc', 'server', '--port', str(port)],
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            raise PandocError(f"Could not start pandoc server: {e}")
+
+        server = cls(port, process)
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise PandocError(f"pandoc server exited with status {process.returncode}")
+            try:
+                if server.convert('ok', 'markdown', 'plain').strip() == b'ok':
+                    return server
+                break
+            except ConnectionRefusedError:
+                server._disconnect()
+                if time.monotonic() > deadline:
+                    break
+                time.sleep(0.05)
+            except (OSError, http.client.HTTPException, PandocError):
+                break
+        server.close()
+        raise PandocError("pandoc server did not answer a probe conversion")
+
+    @classmethod
+    def attach(cls, port):
+        """Client for a server another process started (e.g. in pool workers)"""
+        return cls(port)
+
+    def _disconnect(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _post(self, body):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=REQUEST_TIMEOUT)
+        self.connection.request('POST', '/', body, {'Content-Type': 'application/json',
+                                                     'Accept': 'application/json'})
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def convert(self, text, reader, writer, args=()):
+        """Convert text and return the output bytes"""
+        body = json.dumps({'text': text, 'from': reader, 'to': writer, **server_options(args)})
+        try:
+            status, data = self._post(body)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            # The server closed an idle keep-alive connection: reconnect once
+            self._disconnect()
+            status, data = self._post(body)
+        except Exception:
+            self._disconnect()
+            raise
+
+        try:
+            result = json.loads(data)
+        except ValueError:
+            raise PandocError(f"pandoc server returned {status}: {data[:200].decode('utf-8', 'replace')}")
+        if status != 200 or 'error' in result:
+            raise PandocError(result.get('error') or f"pandoc server returned {status}")
+        if result.get('base64'):
+            return base64.b64decode(result['output'])
+        return result['output'].encode('utf-8')
+
+    def close(self):
+        self._disconnect()
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+
+def open_backend(server=True):
+    """A warm pandoc server when one can be started, else the one-process-per-conversion fallback"""
+    if server:
+        try:
+            return PandocServer.start()
+        except PandocError:
+            pass
+    return PandocCommand()
+
+
+def render_pdf(latex, output, engine='pdflatex'):
+    """Typeset standalone LaTeX (bytes) into output, rerunning while the TOC changes"""
+    if not shutil.which(engine):
+        raise PandocError(f"{engine} not found")
+    with tempfile.TemporaryDirectory() as tmp:
+        tex = os.path.join(tmp, 'document.tex')
+        with open(tex, 'wb') as f:
+            f.write(latex)
+        toc = os.path.join(tmp, 'document.toc')
+        previous = None
+        for _ in range(LATEX_RUNS):
+            # Run from the current directory so relative image paths resolve as they would for pandoc
+            result = subprocess.run([engine, '-interaction=nonstopmode', '-halt-on-error',
+                                     f'-output-directory={tmp}', tex], capture_output=True)
+            if result.returncode != 0:
+                log = result.stdout.decode('utf-8', 'replace').strip().splitlines()
+                raise PandocError(f"{engine} failed: " + ' '.join(log[-3:]))
+            current = open(toc, 'rb').read() if os.path.exists(toc) else None
+            if current == previous:
+                break
+            previous = current
+        shutil.move(os.path.join(tmp, 'document.pdf'), output)
+
+
+def main():
+    sources = sys.argv[1:] or ['GOOGLE_ADS_API_DESIGN_DOCUMENT.md']
+    print("=" * 60)
+    print("Pandoc Backend")
+    print("=" * 60)
+    backends = [('cold process per conversion', PandocCommand())]
+    try:
+        backends.insert(0, ('pandoc server', PandocServer.start()))
+    except PandocError as e:
+        print(f"⚠ pandoc server unavailable: {e}")
+    for label, backend in backends:
+        start = time.perf_counter()
+        count = 0
+        try:
+            for source in sources:
+                with open(source, 'r', encoding='utf-8') as f:
+                    ast = backend.convert(f.read(), 'markdown', 'json').decode('utf-8')
+                for writer in ('docx', 'rtf', 'latex'):
+                    backend.convert(ast, 'json', writer, ['--standalone'])
+                count += 4
+        finally:
+            backend.close()
+        print(f"  ✓ {label}: {count} conversions in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Redirect Rule Conflict Analyzer
+Indexes every rule in a path-segment trie and reports duplicate,
+contradictory, shadowed and live-page-hijacking rules by walking each rule's
+path once (total rules × path depth) instead of comparing every pair.
+generate_platform_config refuses to emit configs while errors remain.
+"""
+
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+
+import allowlist_index
+from redirect_rules import PARAM, is_pattern, lookup_key, match_pattern, source_of
+
+# Conflict types that block emitting configs; the rest are reported only
+ERROR_TYPES = {'contradictory', 'shadowed', 'hijack', 'self_redirect'}
+
+
+class RedirectConflictError(ValueError):
+    """Raised when a redirect map has conflicts that would change behaviour"""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        errors = [c for c in conflicts if c['type'] in ERROR_TYPES]
+        super().__init__(f"{len(errors)} conflicting redirect rules (first: {errors[0]['detail'] if errors else '-'})")
+
+
+class _Node:
+    __slots__ = ('literal', 'dynamic', 'splats', 'rules')
+
+    def __init__(self):
+        self.literal = {}   # segment -> _Node
+        self.dynamic = {}   # segment with placeholders -> (compiled regex, _Node)
+        self.splats = []    # rule indexes whose pattern ends in ':name*' here
+        self.rules = []     # rule indexes whose path ends exactly here
+
+
+def _segments(path):
+    return [s for s in path.split('/') if s]
+
+
+def _segment_regex(segment):
+    parts, pos = [], 0
+    for match in PARAM.finditer(segment):
+        parts.append(re.escape(segment[pos:match.start()]))
+        parts.append('.+?' if segment[match.end():] else '.+')
+        pos = match.end()
+    parts.append(re.escape(segment[pos:]))
+    return re.compile(''.join(parts) + r'\Z')
+
+
+class RuleTrie:
+    """Segment trie over rule paths; patterns live on dynamic or splat edges"""
+
+    def __init__(self):
+        self.root = _Node()
+
+    def insert(self, path, index):
+        node = self.root
+        for segment in _segments(path):
+            match = PARAM.fullmatch(segment)
+            if match and match.group(2):
+                node.splats.append(index)
+                return
+            if ':' in segment:
+                if segment not in node.dynamic:
+                    node.dynamic[segment] = (_segment_regex(segment), _Node())
+                node = node.dynamic[segment][1]
+            else:
+                node = node.literal.setdefault(segment, _Node())
+        node.rules.append(index)
+
+    def matching(self, path):
+        """Indexes of every rule whose path or pattern matches a concrete path"""
+        segments = _segments(path)
+        found = []
+        stack = [(self.root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if i == len(segments):
+                found.extend(node.rules)
+                continue
+            found.extend(node.splats)
+            child = node.literal.get(segments[i])
+            if child:
+                stack.append((child, i + 1))
+            for regex, child in node.dynamic.values():
+                if regex.match(segments[i]):
+                    stack.append((child, i + 1))
+        return found
+
+
+def _sample_paths(pattern):
+    """Concrete stand-ins for a pattern: placeholders kept literally, and splats spanning segments"""
+    literal = pattern
+    spanning = re.sub(r':\w+\*', 'x/y', pattern)
+    return {literal, spanning}
+
+
+def live_pages_matching(pattern, allowlist):
+    """Live allowlisted pages a pattern rule would also catch"""
+    prefix = pattern.split(':', 1)[0]
+    return [path for path in allowlist.iter_prefix(prefix) if match_pattern(pattern, path) is not None]
+
+
+def _describe(rule):
+    target = rule.target or '410 Gone'
+    return f"{source_of(rule)} → {target}" if rule.action == '301' else f"{source_of(rule)} → 410"
+
+
+def analyze_rules(rules, allowlist=None):
+    """Report conflicts for rules in emission order (see redirect_rules.order_rules)"""
+    keys = [lookup_key(r.path) for r in rules]
+    trie = RuleTrie()
+    for i, key in enumerate(keys):
+        trie.insert(key, i)
+
+    conflicts = []
+
+    def report(kind, rule, other, detail):
+        conflicts.append({
+            'type': kind,
+            'severity': 'error' if kind in ERROR_TYPES else 'warning',
+            'rule': _describe(rule),
+            'other': _describe(other) if other is not None else None,
+            'detail': detail
+        })
+
+    # Same source and query conditions: duplicates or contradictions
+    first_by_source = {}
+    repeated = set()
+    for i, rule in enumerate(rules):
+        source = (keys[i], tuple(sorted((k.lower(), v.lower()) for k, v in rule.query)))
+        first = first_by_source.setdefault(source, i)
+        if first != i:
+            repeated.add(i)
+            other = rules[first]
+            if (other.action, other.target) == (rule.action, rule.target):
+                report('duplicate', rule, other, f"{source_of(rule)} appears more than once")
+            else:
+                report('contradictory', rule, other,
+                       f"{source_of(rule)} is both {_describe(other)} and {_describe(rule)}")
+            continue
+        if rule.action == '301' and not rule.query and lookup_key(rule.target.partition('?')[0]) == keys[i]:
+            report('self_redirect', rule, None, f"{source_of(rule)} redirects to itself")
+
+    # Shadowing: an earlier rule catches every request this one would see
+    for i, rule in enumerate(rules):
+        if i in repeated:
+            continue
+        conditions = set((k.lower(), v.lower()) for k, v in rule.query)
+        samples = _sample_paths(keys[i]) if is_pattern(rule.path) else {keys[i]}
+        earlier = None
+        for sample in samples:
+            candidates = {j for j in trie.matching(sample) if j != i}
+            if earlier is None:
+                earlier = candidates
+            else:
+                earlier &= candidates
+        for j in sorted(earlier or ()):
+            other = rules[j]
+            if keys[j] == keys[i] and not is_pattern(rule.path):
+                # Same path: only a rule with fewer query conditions swallows this one
+                other_conditions = set((k.lower(), v.lower()) for k, v in other.query)
+                if j < i and other_conditions < conditions:
+                    report('shadowed', rule, other, f"{source_of(rule)} never fires: {source_of(other)} comes first")
+                    break
+                continue
+            if not is_pattern(other.path) or other.query:
+                continue
+            if j < i:
+                report('shadowed', rule, other, f"{source_of(rule)} never fires: pattern {other.path} comes first")
+                break
+            if not is_pattern(rule.path):
+                report('overlap', rule, other,
+                       f"{source_of(rule)} is also matched by pattern {other.path} (exact rule wins)")
+                break
+
+    # Hijacking: redirecting a page the sitemap says is live
+    if allowlist is not None:
+        for i, rule in enumerate(rules):
+            if rule.query:
+                continue
+            if is_pattern(rule.path):
+                live = live_pages_matching(keys[i], allowlist)
+                if live:
+                    report('hijack', rule, None, f"pattern {rule.path} would catch {len(live)} live pages "
+                                                 f"(e.g. {live[0]})")
+            elif keys[i] in allowlist:
+                report('hijack', rule, None, f"{rule.path} is a live allowlisted page")
+
+    return conflicts
+
+
+def summarize(conflicts):
+    counts = defaultdict(int)
+    for conflict in conflicts:
+        counts[conflict['type']] += 1
+    return dict(counts)
+
+
+def print_conflicts(conflicts, limit=10):
+    for kind, count in sorted(summarize(conflicts).items()):
+        marker = '❌' if kind in ERROR_TYPES else '⚠'
+        print(f"   {marker} {kind}: {count}")
+        for conflict in [c for c in conflicts if c['type'] == kind][:limit]:
+            print(f"      {conflict['detail']}")
+
+
+def main():
+    # Imported here: generate_platform_config itself runs the analyzer
+    from generate_platform_config import load_redirects
+    from redirect_rules import collapse_query_rules, order_rules, parse_rules
+
+    files = sys.argv[1:] or ['redirects_map.csv']
+    print("=" * 60)
+    print("Analyzing Redirect Rule Conflicts")
+    print("=" * 60)
+
+    redirects = []
+    for filename in files:
+        redirects.extend(load_redirects(filename))
+    rules = order_rules(collapse_query_rules(parse_rules(redirects)))
+    allowlist = None
+    if os.path.exists('siteoptz_allowlist.txt'):
+        allowlist = allowlist_index.load_or_build('siteoptz_allowlist.txt')
+    conflicts = analyze_rules(rules, allowlist)
+
+    live = f"{len(allowlist)} live pages" if allowlist is not None else "no allowlist (hijack check skipped)"
+    print(f"\nAnalyzed {len(rules)} rules against {live}")
+    if conflicts:
+        print_conflicts(conflicts)
+    else:
+        print("   ✓ No conflicts")
+
+    with open('redirect_conflicts.json', 'w') as f:
+        json.dump(conflicts, f, indent=2)
+    print("\n✓ Saved redirect_conflicts.json")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Redirect Rule Intermediate Representation
+Parses redirects_map.csv rows once into RedirectRule tuples (path, query
+params, action, target) that every platform emitter consumes, so no emitter
+re-splits paths or query strings on its own. Query strings are decoded into a
+canonical form (tracking parameters stripped, values lowercased and
+whitespace-normalized) so encoding variants of one URL become one rule.
+"""
+
+import re
+import sys
+from collections import Counter, defaultdict, namedtuple
+from functools import lru_cache
+from urllib.parse import quote, unquote_plus
+
+RedirectRule = namedtuple('RedirectRule', [
+    'path',        # path without the query string, e.g. /tools
+    'query',       # canonical (key, value) pairs, see canonical_query
+    'raw_query',   # query string as written in the map (canonical once collapsed)
+    'action',      # '301' or '410'
+    'target',      # site-relative destination, e.g. /categories/ux ('' for 410)
+    'target_url',  # absolute destination as written in the redirect map
+    'priority',
+    'score'        # traffic-weighted score from redirect_scoring (0 when absent)
+], defaults=(0.0,))
+
+
+def parse_rule(row, site_url='https://siteoptz.ai'):
+    """Parse one redirect map row into a RedirectRule"""
+    source = row['path']
+    path, _, raw_query = source.partition('?')
+    target_url = row.get('to_url', '') or ''
+    target = target_url
+    if target.startswith(site_url):
+        target = target[len(site_url):] or '/'
+
+    return RedirectRule(
+        path=path,
+        query=canonical_query(raw_query),
+        raw_query=raw_query,
+        action=row['action'],
+        target=target,
+        target_url=target_url,
+        priority=row.get('priority', ''),
+        score=_parse_score(row.get('score'))
+    )
+
+
+def _parse_score(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def lookup_key(path):
+    """Lowercase the path and drop a trailing slash (except for the root)"""
+    path = path.lower()
+    return path.rstrip('/') or '/'
+
+
+def parse_rules(redirects, site_url='https://siteoptz.ai'):
+    """Parse a full redirect map; the result is shared by all emitters"""
+    return [parse_rule(r, site_url) for r in redirects]
+
+
+def order_rules(rules):
+    """Highest-scoring rules first without changing which rule matches a request.
+
+    Rules sharing a path stay together (query-conditioned before the plain
+    rule) and pattern rules stay behind exact ones in map order, so
+    first-match platforms resolve every request the way the edge lookup does;
+    unscored paths keep their map order after the scored ones.
+    """
+    best, first = {}, {}
+    for i, r in enumerate(rules):
+        best[r.path] = max(best.get(r.path, r.score), r.score)
+        first.setdefault(r.path, i)
+
+    def key(item):
+        i, r = item
+        if is_pattern(r.path):
+            return (1, i)
+        # Scored paths by score (name breaks ties), unscored paths by first map position
+        group = r.path if best[r.path] else first[r.path]
+        return (0, -best[r.path], bool(best[r.path]), group, bool(not r.query), -r.score, i)
+    return [r for _, r in sorted(enumerate(rules), key=key)]
+
+
+# Query canonicalization: crawlers report the same /tools?category= URL
+# percent-encoded, plus-encoded, double-encoded, in mixed case and with
+# campaign parameters attached. Every variant decodes to one set of pairs.
+
+TRACKING_PARAMS = frozenset({
+    'gclid', 'gbraid', 'wbraid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref'
+})
+TRACKING_PREFIXES = ('utm_',)
+
+
+def is_tracking_param(key):
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def _decode(text, rounds=3):
+    """unquote_plus until stable, to undo double encoding (%2520 -> %20 -> ' ')"""
+    for _ in range(rounds):
+        decoded = unquote_plus(text)
+        if decoded == text:
+            break
+        text = decoded
+    return text
+
+
+def canonical_value(value):
+    return ' '.join(value.split()).lower()
+
+
+@lru_cache(maxsize=4096)
+def canonical_query(raw_query):
+    """Sorted (key, value) pairs with tracking params removed.
+
+    A fragment with no '=' whose name starts with whitespace is the rest of
+    the previous value, split off by an unencoded '&' ('category=seo & optimization').
+    """
+    pairs = []
+    for fragment in raw_query.split('&'):
+        if not fragment:
+            continue
+        key, sep, value = fragment.partition('=')
+        key, value = _decode(key), _decode(value)
+        if not sep and pairs and key[:1].isspace():
+            pairs[-1][1] += '&' + key
+            continue
+        pairs.append([key, value])
+    canonical = set()
+    for key, value in pairs:
+        key = canonical_value(key)
+        if key and not is_tracking_param(key):
+            canonical.add((key, canonical_value(value)))
+    return tuple(sorted(canonical))
+
+
+def canonical_query_string(query):
+    """Encode canonical pairs back into a query string (spaces as %20)"""
+    return '&'.join(f"{quote(k, safe='')}={quote(v, safe='')}" for k, v in query)
+
+
+def _encoded_regex(text):
+    """Regex matching any raw encoding of a canonical value (case-insensitive use)"""
+    parts = []
+    for c in text:
+        if c.isalnum() and c.isascii():
+            parts.append(c)
+        elif c == ' ':
+            parts.append('(?:\\+|%20)+')
+        else:
+            encoded = quote(c, safe='')
+            parts.append(f"(?:{regex_escape(c)}|{regex_escape(encoded)})" if encoded != c else regex_escape(c))
+    return ''.join(parts)
+
+
+def query_condition_regex(query):
+    """Unanchored lookaheads requiring each pair anywhere in a raw query string"""
+    blank = '(?:\\+|%20)*'
+    return ''.join(f"(?=(?:.*&)?{_encoded_regex(k)}={blank}{_encoded_regex(v)}{blank}(?:&|$))"
+                   for k, v in query)
+
+
+def _dedupe(rules):
+    """One rule per (path, conditions, outcome), keeping the best score"""
+    kept, index = [], {}
+    for r in rules:
+        if is_pattern(r.path):
+            kept.append(r)
+            continue
+        key = (lookup_key(r.path), r.query, r.action, r.target)
+        if key in index:
+            i = index[key]
+            if r.score > kept[i].score:
+                kept[i] = kept[i]._replace(score=r.score, priority=r.priority)
+            continue
+        index[key] = len(kept)
+        kept.append(r)
+    return kept
+
+
+def deciding_keys(rules):
+    """Per path, the query keys whose value alone decides the outcome.
+
+    A key qualifies when it appears in every multi-parameter rule for the
+    path, every value of it leads to a single outcome across all the path's
+    query rules, and at least one value is seen in several rules (so the other
+    parameters demonstrably do not matter). A value seen once proves nothing:
+    /tools?page=2 -> /categories/ux must not come from one rule that also had
+    category=ux.
+    """
+    outcomes = defaultdict(lambda: defaultdict(set))
+    seen = defaultdict(Counter)
+    multi = defaultdict(list)
+    for r in rules:
+        if r.query and not is_pattern(r.path):
+            path = lookup_key(r.path)
+            for pair in r.query:
+                outcomes[path][pair].add((r.action, r.target))
+                seen[path][pair] += 1
+            if len(r.query) > 1:
+                multi[path].append({key for key, _ in r.query})
+
+    deciding = {}
+    for path, key_sets in multi.items():
+        keys = set.intersection(*key_sets)
+        pairs = outcomes[path]
+        counts = Counter()
+        for (key, _), count in seen[path].items():
+            counts[key] += count
+        deciding[path] = sorted(
+            (key for key in keys
+             if all(len(found) == 1 for (k, _), found in pairs.items() if k == key)
+             and any(count > 1 for (k, _), count in seen[path].items() if k == key)),
+            key=lambda k: (-counts[k], k)
+        )
+    return deciding
+
+
+def collapse_query_rules(rules):
+    """Merge encoding variants and reduce query rules to one parameter value each.
+
+    A multi-parameter rule is reduced to its deciding key (see deciding_keys),
+    so /tools?category=ux&sort=new and /tools?category=ux&page=2 become a
+    single category=ux rule; when no key decides, the full canonical
+    conditions are kept. raw_query is rewritten to the canonical string.
+    """
+    rules = _dedupe(rules)
+    deciding = deciding_keys(rules)
+
+    reduced = []
+    for r in rules:
+        if len(r.query) > 1 and not is_pattern(r.path):
+            keys = deciding.get(lookup_key(r.path))
+            if keys:
+                values = dict(r.query)
+                r = r._replace(query=((keys[0], values[keys[0]]),))
+        if r.raw_query or r.query:
+            r = r._replace(raw_query=canonical_query_string(r.query))
+        reduced.append(r)
+    return _dedupe(reduced)
+
+
+def source_of(rule):
+    """Rebuild the original source path (with query string) of a rule"""
+    return f"{rule.path}?{rule.raw_query}" if rule.raw_query else rule.path
+
+
+# Path patterns use the Vercel/Next.js syntax: ':name' matches text within one
+# segment (so '/compare/:a-vs-:b' works), a trailing ':name*' matches the rest.
+
+PARAM = re.compile(r':([A-Za-z_]\w*)(\*?)')
+REGEX_SPECIAL = set('.^$*+?()[]{}|\\')
+
+
+def is_pattern(path):
+    return PARAM.search(path) is not None
+
+
+def regex_escape(text):
+    return ''.join('\\' + c if c in REGEX_SPECIAL else c for c in text)
+
+
+@lru_cache(maxsize=4096)
+def pattern_regex(path):
+    """Translate a path pattern into (anchored regex source, param names)"""
+    names = []
+    parts = []
+    pos = 0
+    for match in PARAM.finditer(path):
+        parts.append(regex_escape(path[pos:match.start()]))
+        names.append(match.group(1))
+        following = path[match.end():match.end() + 1]
+        if match.group(2):
+            parts.append('(.*)')
+        elif following and following != '/':
+            parts.append('([^/]+?)')
+        else:
+            parts.append('([^/]+)')
+        pos = match.end()
+    parts.append(regex_escape(path[pos:]))
+    return '^' + ''.join(parts) + '$', tuple(names)
+
+
+@lru_cache(maxsize=4096)
+def _compiled(path):
+    source, names = pattern_regex(path)
+    return re.compile(source), names
+
+
+def match_pattern(pattern, path):
+    """Match a concrete path against a pattern; returns params or None"""
+    regex, names = _compiled(pattern)
+    match = regex.match(path)
+    return dict(zip(names, match.groups())) if match else None
+
+
+def select_rules(rules, limit):
+    """The limit highest-scoring rules, kept in the order given (first-match order).
+
+    A pattern rule is worth the summed score of the exact paths it covers (or
+    its own score, if higher): one template rule standing in for thousands of
+    URLs outranks any single exact rule it covers.
+    """
+    if len(rules) <= limit:
+        return list(rules)
+    exact = [r for r in rules if not is_pattern(r.path)]
+
+    def worth(r):
+        if not is_pattern(r.path):
+            return r.score
+        covered = sum(e.score for e in exact if match_pattern(r.path, e.path) is not None)
+        return max(r.score, covered)
+
+    worths = [worth(r) for r in rules]
+    keep = sorted(range(len(rules)), key=lambda i: -worths[i])[:limit]
+    return [rules[i] for i in sorted(keep)]
+
+
+def expand_target(target, params):
+    """Substitute ':name' placeholders in a destination, longest names first"""
+    for name in sorted(params, key=len, reverse=True):
+        target = target.replace(f':{name}*', params[name]).replace(f':{name}', params[name])
+    return target
+
+
+def numbered_target(target, names, ref='${}'):
+    """Rewrite ':name' placeholders as numbered capture references ($1, {re.p.1}, ...)"""
+    order = sorted(range(len(names)), key=lambda i: len(names[i]), reverse=True)
+    for i in order:
+        target = target.replace(f':{names[i]}*', ref.format(i + 1)).replace(f':{names[i]}', ref.format(i + 1))
+    return target
+
+
+def first_static_segment(path):
+    """Leading literal segment of a path or pattern, '*' when it is dynamic"""
+    segment = path.lstrip('/').split('/', 1)[0]
+    return '*' if ':' in segment else segment
+
+
+def segment_pattern(path):
+    """True when every placeholder fills a whole segment (Netlify-compatible)"""
+    segments = [s for s in path.split('/') if s]
+    return all(':' not in s or PARAM.fullmatch(s) for s in segments)
+
+
+# Self-checks for the rule transformations: python3 redirect_rules.py
+
+def _rules(rows):
+    return parse_rules([{'path': path, 'action': '301', 'to_url': f'https://siteoptz.ai{target}'}
+                        for path, target in rows])
+
+
+def _collapsed(rows):
+    return sorted((source_of(r), r.target) for r in collapse_query_rules(_rules(rows)))
+
+
+SELF_CHECKS = [
+    ('variants of one category collapse to the category',
+     [('/tools?category=ux&sort=new', '/categories/ux'), ('/tools?category=ux&page=2', '/categories/ux'),
+      ('/tools?category=UX&utm_source=x', '/categories/ux')],
+     [('/tools?category=ux', '/categories/ux')]),
+    ('a key seen once per value does not decide (page must not pick the category)',
+     [('/tools?category=ux&page=2', '/categories/ux'), ('/tools?category=seo&page=3', '/categories/seo'),
+      ('/tools?sort=new&page=4', '/tools')],
+     [('/tools?category=seo&page=3', '/categories/seo'), ('/tools?category=ux&page=2', '/categories/ux'),
+      ('/tools?page=4&sort=new', '/tools')]),
+]
+
+
+def _ordered(rows):
+    return [(source_of(r), r.score) for r in order_rules(parse_rules(
+        [{'path': path, 'action': '301', 'to_url': '/', 'score': score} for path, score in rows]))]
+
+
+ORDER_CHECKS = [
+    ('unscored paths keep map order, query rules before their plain rule',
+     [('/b', ''), ('/a?x=1', ''), ('/a', ''), ('/c', '2'), ('/b?y=1', ''), ('/p/:slug', '9')],
+     [('/c', 2.0), ('/b?y=1', 0.0), ('/b', 0.0), ('/a?x=1', 0.0), ('/a', 0.0), ('/p/:slug', 9.0)]),
+]
+
+
+def main():
+    print("=" * 60)
+    print("Redirect Rule Self-Checks")
+    print("=" * 60)
+    failures = 0
+    for name, rows, expected in SELF_CHECKS:
+        result = _collapsed(rows)
+        if result == sorted(expected):
+            print(f"✓ {name}")
+        else:
+            failures += 1
+            print(f"❌ {name}\n   expected {sorted(expected)}\n   got      {result}")
+    for name, rows, expected in ORDER_CHECKS:
+        result = _ordered(rows)
+        if result == expected:
+            print(f"✓ {name}")
+        else:
+            failures += 1
+            print(f"❌ {name}\n   expected {expected}\n   got      {result}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Traffic-Weighted Redirect Priority Scoring
+Scores the whole 404 inventory at once with vectorized NumPy: estimated hits,
+distinct referring pages, recency of the last sighting and the share of
+referrers that are live pages combine into a 0-100 score. The score replaces
+the fixed hits thresholds and orders rules in every emitter.
+"""
+
+import csv
+import sys
+from datetime import date, datetime
+
+import numpy as np
+
+# Relative weight of each signal in the final score
+DEFAULT_WEIGHTS = {
+    'hits': 0.45,
+    'sources': 0.25,
+    'recency': 0.15,
+    'live_referrers': 0.15
+}
+
+# Days after which a 404 last seen that long ago counts half as much
+RECENCY_HALF_LIFE = 30
+
+# Score quantiles separating low / med / high
+PRIORITY_QUANTILES = (0.6, 0.9)
+
+
+def _column(inventory, field, default=0):
+    values = []
+    for item in inventory:
+        try:
+            values.append(float(item.get(field) or default))
+        except (TypeError, ValueError):
+            values.append(float(default))
+    return np.asarray(values, dtype=np.float64)
+
+
+def _days_since(inventory, today):
+    days = []
+    for item in inventory:
+        try:
+            last_seen = datetime.strptime(item.get('last_seen') or '', '%Y-%m-%d').date()
+            days.append((today - last_seen).days)
+        except ValueError:
+            days.append(np.nan)
+    return np.asarray(days, dtype=np.float64)
+
+
+def _scaled_log(values):
+    """log1p scaled to 0..1 so one viral URL does not flatten everything else"""
+    logged = np.log1p(np.maximum(values, 0))
+    peak = logged.max() if logged.size else 0
+    return logged / peak if peak > 0 else np.zeros_like(logged)
+
+
+def score_inventory(inventory, today=None, weights=None):
+    """Return a 0-100 score per inventory row as one NumPy array"""
+    if not inventory:
+        return np.zeros(0)
+    weights = weights or DEFAULT_WEIGHTS
+    today = today or date.today()
+
+    hits = _column(inventory, 'hits_90d')
+    # Inventories built before the sources column default to one referrer
+    sources = _column(inventory, 'sources', default=1)
+    live = _column(inventory, 'live_referrers')
+
+    days = _days_since(inventory, today)
+    # Relative to the freshest sighting, so old crawl exports still rank sensibly
+    days = days - np.nanmin(days) if not np.all(np.isnan(days)) else days
+    recency = np.where(np.isnan(days), 0.0, np.exp2(-np.maximum(days, 0) / RECENCY_HALF_LIFE))
+
+    live_share = np.divide(live, sources, out=np.zeros_like(live), where=sources > 0)
+
+    total = sum(weights.values())
+    score = (weights['hits'] * _scaled_log(hits)
+             + weights['sources'] * _scaled_log(sources)
+             + weights['recency'] * recency
+             + weights['live_referrers'] * np.clip(live_share, 0, 1)) / total
+    return np.round(score * 100, 2)
+
+
+def priority_labels(scores, quantiles=PRIORITY_QUANTILES):
+    """Map scores onto the high / med / low labels used in redirects_map.csv"""
+    if not len(scores):
+        return []
+    med_cut, high_cut = np.quantile(scores, quantiles)
+    labels = np.where(scores >= high_cut, 'high', np.where(scores >= med_cut, 'med', 'low'))
+    # A flat inventory has no signal to rank on
+    if high_cut == scores.min():
+        labels[:] = 'low'
+    return labels.tolist()
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else '404_inventory.csv'
+    print("=" * 60)
+    print("Scoring Redirect Priorities")
+    print("=" * 60)
+
+    with open(source, 'r', encoding='utf-8') as f:
+        inventory = list(csv.DictReader(f))
+    scores = score_inventory(inventory)
+    labels = priority_labels(scores)
+
+    print(f"\nScored {len(inventory)} inventory rows from {source}")
+    for label in ('high', 'med', 'low'):
+        print(f"  • {label}: {labels.count(label)} URLs")
+
+    print("\nTop 10 by score:")
+    for i in np.argsort(-scores, kind='stable')[:10]:
+        print(f"  {scores[i]:6.2f}  {inventory[i]['path'][:60]}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Multi-Site 404 -> Redirect Pipeline
+Runs build_404_inventory, create_redirect_map and generate_platform_config for
+every site in sites.json in one invocation. Sites share one process pool, and
+each worker keeps its URL normalization cache and rule engine warm across the
+sites it processes; outputs are written per site.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from build_404_inventory import build_allowlist, load_broken_links, create_404_inventory, write_inventory
+from create_redirect_map import build_redirects, write_redirects
+from generate_platform_config import write_platform_configs
+
+DEFAULT_PLATFORMS = ['vercel', 'netlify', 'nginx', 'apache']
+
+def load_site_configs(filename):
+    """Load site configs and fill in defaults derived from each domain"""
+    with open(filename, 'r') as f:
+        config = json.load(f)
+    
+    sites = []
+    for site in config['sites']:
+        domain = site['domain']
+        canonical_host = site.get('canonical_host', domain)
+        sites.append({
+            'name': site.get('name', domain),
+            'domain': domain,
+            'canonical_host': canonical_host,
+            'crawl_host': site.get('crawl_host', f'www.{domain}'),
+            'site_url': site.get('site_url', f'https://{canonical_host}'),
+            'site_name': site.get('site_name', domain),
+            'broken_links': site['broken_links'],
+            'sitemaps': site.get('sitemaps', [f'https://{canonical_host}/sitemap.xml']),
+            'platforms': site.get('platforms', DEFAULT_PLATFORMS),
+            'output_dir': site.get('output_dir', os.path.join(config.get('output_dir', 'sites_output'), site.get('name', domain)))
+        })
+    return sites
+
+def run_site(site):
+    """Run the full pipeline for one site and return a summary"""
+    start = time.perf_counter()
+    output_dir = site['output_dir']
+    os.makedirs(output_dir, exist_ok=True)
+    
+    allowlist = build_allowlist(site['sitemaps'], os.path.join(output_dir, 'allowlist.txt'))
+    broken_links = load_broken_links(site['broken_links'])
+    inventory = create_404_inventory(
+        broken_links,
+        allowlist,
+        site_url=f"https://{site['crawl_host']}",
+        canonical_host=site['canonical_host']
+    )
+    write_inventory(inventory, os.path.join(output_dir, '404_inventory.csv'))
+    
+    redirects = build_redirects(inventory, allowlist, site['site_url'])
+    write_redirects(redirects, os.path.join(output_dir, 'redirects_map.csv'))
+    
+    written = write_platform_configs(
+        redirects,
+        site['platforms'],
+        output_dir,
+        site_url=site['site_url'],
+        site_name=site['site_name'],
+        allowlist=allowlist
+    )
+    
+    return {
+        'name': site['name'],
+        'broken_links': len(broken_links),
+        'allowlist': len(allowlist),
+        'inventory': len(inventory),
+        'redirects': len(redirects),
+        'files': written,
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the 404 -> redirect pipeline for several sites')
+    parser.add_argument('--config', default='sites.json', help='Site config file')
+    parser.add_argument('--site', action='append', help='Only run the named site (repeatable)')
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("Running Multi-Site Redirect Pipeline")
+    print("=" * 60)
+    
+    sites = load_site_configs(args.config)
+    if args.site:
+        sites = [s for s in sites if s['name'] in args.site]
+    print(f"\nLoaded {len(sites)} site configs from {args.config}")
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(run_site, site): site['name'] for site in sites}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"\n❌ {name}: {e}")
+    
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    for result in sorted(results, key=lambda r: r['name']):
+        print(f"\n{result['name']} ({result['seconds']}s)")
+        print(f"  • Broken links: {result['broken_links']}")
+        print(f"  • Unique 404s: {result['inventory']}")
+        print(f"  • Redirect rules: {result['redirects']}")
+        print(f"  • Files: {', '.join(result['files'])}")
+    
+    print(f"\n✓ Processed {len(results)}/{len(sites)} sites")
+
+if __name__ == '__main__':
+    main()
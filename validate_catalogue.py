@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Catalogue Validator for SiteOptz.ai
+Streams aiToolsData.json once, checks every tool record against the production
+data rules (the same rules as validate-production-data.js, compiled once into
+check functions) and computes the summary aggregates in the same pass. Large
+catalogues are validated in shards on a process pool. Writes
+validation-report.json and tools-summary.json next to the catalogue.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+
+from catalogue_index import DEFAULT_CATALOGUE, iter_tools, tool_category
+
+SHARD_SIZE = 500
+
+# Production data rules; missing required fields and bad pricing plans fail a tool, the rest warn
+SCHEMA = {
+    'required_fields': ['id', 'name', 'slug', 'logo', 'meta', 'schema', 'overview',
+                        'features', 'pros', 'cons', 'pricing', 'benchmarks'],
+    'object_fields': {
+        'meta': ['title', 'description', 'keywords', 'canonical', 'openGraph', 'twitter'],
+        'schema': ['@type', '@context', 'name', 'description', 'image', 'url', 'brand', 'category'],
+        'overview': ['developer', 'release_year', 'category', 'description', 'website']
+    },
+    'min_lengths': {('meta', 'title'): 30, ('meta', 'description'): 120},
+    'pricing_fields': ['plan', 'price_per_month', 'features'],
+    'benchmark_fields': ['speed', 'accuracy', 'integration', 'ease_of_use', 'value_for_money'],
+    'non_empty_lists': ['features', 'pros', 'cons']
+}
+
+# SEO completeness counter -> (path, ...) that must all be set
+SEO_CHECKS = {
+    'complete_meta_tags': [('meta', 'title'), ('meta', 'description'), ('meta', 'keywords')],
+    'complete_open_graph': [('meta', 'openGraph', 'title'), ('meta', 'openGraph', 'description'),
+                            ('meta', 'openGraph', 'image')],
+    'complete_twitter_cards': [('meta', 'twitter', 'title'), ('meta', 'twitter', 'description'),
+                               ('meta', 'twitter', 'image')],
+    'complete_schema': [('schema', '@type'), ('schema', 'name'), ('schema', 'description')]
+}
+
+
+def _get(record, path):
+    for key in path:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(key)
+    return record
+
+
+def compile_schema(schema, public_root='public'):
+    """Turn the rule tables into a flat list of checks: tool -> [(level, message)]"""
+    checks = []
+
+    required = schema['required_fields']
+    checks.append(lambda tool: [('error', f"Missing required field: {field}")
+                                for field in required if not tool.get(field)])
+
+    for parent, fields in schema['object_fields'].items():
+        def check_object(tool, parent=parent, fields=fields):
+            value = tool.get(parent)
+            if not isinstance(value, dict) or not value:
+                return []
+            return [('warning', f"Missing {parent} field: {field}") for field in fields if not value.get(field)]
+        checks.append(check_object)
+
+    for path, minimum in schema['min_lengths'].items():
+        def check_length(tool, path=path, minimum=minimum):
+            value = _get(tool, path)
+            if isinstance(value, str) and value and len(value) < minimum:
+                return [('warning', f"{' '.join(path).capitalize()} too short (should be {minimum}+ characters)")]
+            return []
+        checks.append(check_length)
+
+    pricing_fields = schema['pricing_fields']
+    def check_pricing(tool):
+        pricing = tool.get('pricing')
+        if not isinstance(pricing, list):
+            return [('error', 'Pricing must be an array')]
+        return [('error', f"Missing pricing field in plan {i}: {field}")
+                for i, plan in enumerate(pricing) for field in pricing_fields
+                if not isinstance(plan, dict) or field not in plan]
+    checks.append(check_pricing)
+
+    benchmark_fields = schema['benchmark_fields']
+    def check_benchmarks(tool):
+        benchmarks = tool.get('benchmarks')
+        if not isinstance(benchmarks, dict) or not benchmarks:
+            return []
+        return [('warning', f"Benchmark field should be numeric: {field}") for field in benchmark_fields
+                if isinstance(benchmarks.get(field), bool) or not isinstance(benchmarks.get(field), (int, float))]
+    checks.append(check_benchmarks)
+
+    def check_logo(tool):
+        logo = tool.get('logo')
+        if isinstance(logo, str) and logo and not os.path.exists(os.path.join(public_root, logo.lstrip('/'))):
+            return [('warning', f"Logo file not found: {logo}")]
+        return []
+    checks.append(check_logo)
+
+    non_empty = schema['non_empty_lists']
+    checks.append(lambda tool: [('warning', f"No {field} listed") for field in non_empty
+                                if isinstance(tool.get(field), list) and not tool[field]])
+
+    def check_website(tool):
+        website = _get(tool, ('overview', 'website'))
+        if isinstance(website, str) and website and not website.startswith('http'):
+            return [('warning', 'Website URL should start with http/https')]
+        return []
+    checks.append(check_website)
+
+    return checks
+
+
+def tool_rating(tool):
+    """Numeric 0-5 rating: the rating field, else the benchmark total score out of 100"""
+    for value, scale in ((tool.get('rating'), 1), (_get(tool, ('benchmarks', 'total_score')), 20)):
+        try:
+            rating = float(value) / scale
+        except (TypeError, ValueError):
+            continue
+        if 0 <= rating <= 5:
+            return rating
+    return None
+
+
+def new_totals():
+    return {
+        'total_tools': 0, 'passed': 0, 'failed': 0, 'warnings': 0, 'errors': [],
+        'warning_counts': Counter(), 'seo': Counter(), 'categories': Counter(),
+        'rating_sum': 0.0, 'rating_count': 0
+    }
+
+
+def validate_tools(tools, public_root='public'):
+    """One pass over tool records: rule checks plus every summary aggregate"""
+    checks = compile_schema(SCHEMA, public_root)
+    totals = new_totals()
+    seo = totals['seo']
+    for tool in tools:
+        totals['total_tools'] += 1
+        if not isinstance(tool, dict):
+            totals['failed'] += 1
+            totals['errors'].append(f"Record {totals['total_tools']}: not a JSON object")
+            continue
+        name = tool.get('name') or tool.get('tool_name') or f"Record {totals['total_tools']}"
+        errors = []
+        for check in checks:
+            for level, message in check(tool):
+                if level == 'error':
+                    errors.append(f"{name}: {message}")
+                else:
+                    totals['warnings'] += 1
+                    totals['warning_counts'][message] += 1
+        if errors:
+            totals['failed'] += 1
+            totals['errors'].extend(errors)
+        else:
+            totals['passed'] += 1
+
+        for counter, paths in SEO_CHECKS.items():
+            if all(_get(tool, path) for path in paths):
+                seo[counter] += 1
+        if not _get(tool, ('meta', 'canonical')):
+            seo['missing_canonicals'] += 1
+
+        category = tool_category(tool)
+        if category:
+            totals['categories'][category] += 1
+        rating = tool_rating(tool)
+        if rating is not None:
+            totals['rating_sum'] += rating
+            totals['rating_count'] += 1
+    return totals
+
+
+def merge_totals(parts):
+    totals = new_totals()
+    for part in parts:
+        for key, value in part.items():
+            if isinstance(value, list):
+                totals[key].extend(value)
+            else:
+                totals[key] += value
+    return totals
+
+
+def _shards(tools, size):
+    tools = iter(tools)
+    while True:
+        shard = list(islice(tools, size))
+        if not shard:
+            return
+        yield shard
+
+
+def validate_catalogue(catalogue, public_root='public', workers=1, shard_size=SHARD_SIZE):
+    """Validate a streamed catalogue, fanning shards out to a process pool when workers > 1"""
+    tools = iter_tools(catalogue)
+    if workers <= 1:
+        return validate_tools(tools, public_root)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(validate_tools, shard, public_root) for shard in _shards(tools, shard_size)]
+        return merge_totals(future.result() for future in futures)
+
+
+def _timestamp():
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def build_reports(totals, previous_summary=None):
+    """validation-report.json and tools-summary.json, in the layout the JS tooling wrote"""
+    total = totals['total_tools']
+    seo = totals['seo']
+    report = {
+        'timestamp': _timestamp(),
+        'total_tools': total,
+        'validation_results': {
+            'passed': totals['passed'],
+            'failed': totals['failed'],
+            'success_rate': f"{totals['passed'] / total * 100:.1f}" if total else '0.0'
+        },
+        'seo_completeness': {name: seo[name] for name in list(SEO_CHECKS) + ['missing_canonicals']},
+        'production_ready': totals['failed'] == 0,
+        'errors': totals['errors']
+    }
+    previous_total = (previous_summary or {}).get('totalTools') or total
+    summary = {
+        'totalTools': total,
+        'newToolsAdded': max(0, total - previous_total),
+        'categoriesCount': len(totals['categories']),
+        'categories': sorted(totals['categories']),
+        'avgRating': f"{totals['rating_sum'] / totals['rating_count']:.1f}" if totals['rating_count'] else '0.0',
+        'lastUpdated': _timestamp()
+    }
+    return report, summary
+
+
+def _write_json(data, filename):
+    tmp_name = filename + '.tmp'
+    with open(tmp_name, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_name, filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate aiToolsData.json and regenerate its reports')
+    parser.add_argument('catalogue', nargs='?', default=DEFAULT_CATALOGUE)
+    parser.add_argument('--output-dir', help='Where to write the reports (default: next to the catalogue)')
+    parser.add_argument('--public', default='public', help='Static root that logo paths resolve against')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    parser.add_argument('--check', action='store_true',
+                        help='Only validate: write nothing and exit 1 when a tool fails (for commit hooks)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Validating SiteOptz.ai Tool Catalogue")
+    print("=" * 60)
+
+    if not os.path.exists(args.catalogue):
+        print(f"❌ Catalogue not found: {args.catalogue}")
+        sys.exit(1)
+
+    # Sharding only pays off once the catalogue is a few shards long
+    workers = args.workers if os.path.getsize(args.catalogue) > 4 << 20 else 1
+    start = time.perf_counter()
+    try:
+        totals = validate_catalogue(args.catalogue, args.public, workers, args.shard_size)
+    except ValueError as e:
+        print(f"❌ Error parsing JSON: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    output_dir = args.output_dir or os.path.dirname(args.catalogue) or '.'
+    summary_file = os.path.join(output_dir, 'tools-summary.json')
+    previous = None
+    if os.path.exists(summary_file):
+        with open(summary_file, 'r') as f:
+            previous = json.load(f)
+    report, summary = build_reports(totals, previous)
+
+    total = totals['total_tools']
+    print(f"\nValidated {total} tools in {elapsed * 1000:.1f} ms on {workers} worker(s)")
+    print(f"  ✓ Passed: {totals['passed']}")
+    print(f"  ❌ Failed: {totals['failed']}")
+    print(f"  ⚠ Warnings: {totals['warnings']}")
+    print(f"\nSuccess rate: {report['validation_results']['success_rate']}%")
+
+    print("\nSEO completeness:")
+    for name, count in report['seo_completeness'].items():
+        print(f"  {name.replace('_', ' ').capitalize():<24} {count:6}/{total}")
+
+    print("\nMost common warnings:")
+    for message, count in totals['warning_counts'].most_common(10):
+        print(f"  {count:6}  {message}")
+    for error in totals['errors'][:10]:
+        print(f"❌ {error}")
+    if len(totals['errors']) > 10:
+        print(f"   ... and {len(totals['errors']) - 10} more errors")
+
+    print(f"\n{summary['categoriesCount']} categories, average rating {summary['avgRating']}")
+
+    if args.check:
+        sys.exit(0 if report['production_ready'] else 1)
+
+    _write_json(report, os.path.join(output_dir, 'validation-report.json'))
+    _write_json(summary, summary_file)
+    print(f"\n✓ Saved validation-report.json and tools-summary.json to {output_dir}/")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Validate Sitemaps for SiteOptz.ai
+Streams every sitemap with iterparse and checks each <loc> against the
+generated redirect map (301s and the 410 list), the permanent_redirects crawler
+export and the wrong_pages_found_in_sitemap export. Writes corrected sitemaps,
+split at the protocol limits (50,000 URLs / 50 MB) with a sitemap index.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import xml.etree.ElementTree as ET
+from datetime import date
+from urllib.parse import urlparse
+from xml.sax.saxutils import escape
+
+from edge_redirects import build_edge_artifact, lookup
+from generate_platform_config import load_redirects
+from redirect_rules import parse_rules
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+MAX_HOPS = 5
+SAMPLE_SIZE = 10
+
+URLSET_OPEN = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+URLSET_CLOSE = '</urlset>\n'
+
+def latest_export(pattern):
+    files = sorted(glob.glob(pattern))
+    return files[-1] if files else None
+
+def url_key(url):
+    return url.strip().lower().rstrip('/')
+
+def load_permanent_redirects(filename):
+    """Initial redirect URL -> final destination, from the crawler export"""
+    redirects = {}
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            redirects[url_key(row['Initial Redirect URL'])] = row['Final Destination URL'].strip()
+    return redirects
+
+def load_wrong_pages(filename):
+    """Sitemap URLs the crawler flagged (redirects, 4xx, noindex, ...) -> issue type"""
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+        return {url_key(row['Link URL']): row['Issue Type'] for row in csv.DictReader(f)}
+
+def load_gone_list(filename, site_url):
+    """Extra 410 URLs; bare paths are taken relative to the site"""
+    with open(filename, 'r') as f:
+        return {url_key(line if '://' in line else site_url + line.strip()) for line in f if line.strip()}
+
+def _tag(name):
+    return f'{{{SITEMAP_NS}}}{name}'
+
+def iter_sitemap(source):
+    """Stream <url> entries as dicts; a sitemap index yields its <sitemap> locs instead"""
+    for _, elem in ET.iterparse(source, events=('end',)):
+        if elem.tag == _tag('url'):
+            yield 'url', {child.tag.split('}')[-1]: (child.text or '').strip() for child in elem}
+            elem.clear()
+        elif elem.tag == _tag('sitemap'):
+            yield 'sitemap', (elem.findtext(_tag('loc')) or '').strip()
+            elem.clear()
+
+def expand_sources(sources):
+    """Replace sitemap index files by the local sitemaps they list, found next to the index"""
+    expanded = []
+    for source in sources:
+        children = []
+        for kind, value in iter_sitemap(source):
+            if kind != 'sitemap':
+                break
+            children.append(os.path.join(os.path.dirname(source), os.path.basename(urlparse(value).path)))
+        expanded.extend(expand_sources(children) if children else [source])
+    return expanded
+
+class SitemapResolver:
+    """Resolve a sitemap URL through every redirect source, following chains"""
+
+    def __init__(self, site_url, artifact=None, permanent=None, wrong_pages=None, gone=None):
+        self.site_url = site_url
+        self.host = urlparse(site_url).netloc.replace('www.', '')
+        self.artifact = artifact
+        self.permanent = permanent or {}
+        self.wrong_pages = wrong_pages or {}
+        self.gone = gone or set()
+
+    def resolve(self, loc):
+        """Returns (status, url): keep, redirected, gone, flagged or external"""
+        url = loc
+        status = 'keep'
+        for _ in range(MAX_HOPS):
+            key = url_key(url)
+            if key in self.gone:
+                return 'gone', None
+            parsed = urlparse(url)
+            hit = lookup(self.artifact, parsed.path or '/', parsed.query) if self.artifact else None
+            if hit and hit[0] == 410:
+                return 'gone', None
+            if hit:
+                target = hit[1]
+                url = f"{self.site_url}{target}" if target.startswith('/') else target
+            elif key in self.permanent:
+                url = self.permanent[key]
+            else:
+                break
+            status = 'redirected'
+            if urlparse(url).netloc.replace('www.', '') != self.host:
+                return 'external', None
+
+        # A flagged URL the redirect sources cannot explain has no known replacement
+        if status == 'keep' and url_key(url) in self.wrong_pages:
+            return 'flagged', None
+        return status, url
+
+class SitemapWriter:
+    """Write <url> entries to numbered parts, rolling over at the protocol limits"""
+
+    def __init__(self, output_dir, base_name, max_urls=MAX_URLS, max_bytes=MAX_BYTES):
+        self.output_dir = output_dir
+        self.base_name = base_name
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.parts = []
+        self._file = None
+
+    def _open_part(self):
+        self._close_part()
+        filename = os.path.join(self.output_dir, f"{self.base_name}-{len(self.parts) + 1}.xml")
+        self._file = open(filename, 'w', encoding='utf-8')
+        self._file.write(URLSET_OPEN)
+        self._urls = 0
+        self._bytes = len(URLSET_OPEN.encode('utf-8'))
+        self.parts.append(filename)
+
+    def _close_part(self):
+        if self._file:
+            self._file.write(URLSET_CLOSE)
+            self._file.close()
+            self._file = None
+
+    def write(self, entry):
+        lines = [f"    <loc>{escape(entry['loc'])}</loc>"]
+        for field in ('lastmod', 'changefreq', 'priority'):
+            if entry.get(field):
+                lines.append(f"    <{field}>{escape(entry[field])}</{field}>")
+        block = '  <url>\n' + '\n'.join(lines) + '\n  </url>\n'
+        size = len(block.encode('utf-8'))
+        if (self._file is None or self._urls >= self.max_urls
+                or self._bytes + size + len(URLSET_CLOSE) > self.max_bytes):
+            self._open_part()
+        self._file.write(block)
+        self._urls += 1
+        self._bytes += size
+
+    def close(self):
+        """Finish the last part; a single part keeps the original file name"""
+        self._close_part()
+        if len(self.parts) == 1:
+            single = os.path.join(self.output_dir, f"{self.base_name}.xml")
+            os.replace(self.parts[0], single)
+            self.parts = [single]
+        return self.parts
+
+def write_sitemap_index(parts, output_dir, site_url, filename='sitemap.xml'):
+    """Index over the parts; none for a single part, and sitemap_index.xml if a part is sitemap.xml"""
+    if len(parts) < 2:
+        return None
+    if any(os.path.basename(part) == filename for part in parts):
+        filename = 'sitemap_index.xml'
+    today = date.today().isoformat()
+    path = os.path.join(output_dir, filename)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n')
+        for part in parts:
+            f.write(f"  <sitemap>\n    <loc>{escape(site_url)}/{escape(os.path.basename(part))}</loc>\n"
+                    f"    <lastmod>{today}</lastmod>\n  </sitemap>\n")
+        f.write('</sitemapindex>\n')
+    return path
+
+def validate_sitemaps(sources, resolver, output_dir, site_url):
+    """One streaming pass over every sitemap; returns per-sitemap stats, all parts and the index"""
+    os.makedirs(output_dir, exist_ok=True)
+    seen = set()
+    stats = {}
+    parts = []
+    for source in sources:
+        base_name = os.path.splitext(os.path.basename(source))[0]
+        counts = {'total': 0, 'keep': 0, 'redirected': 0, 'gone': 0, 'flagged': 0,
+                  'external': 0, 'duplicate': 0, 'samples': []}
+        writer = SitemapWriter(output_dir, base_name)
+        for kind, entry in iter_sitemap(source):
+            if kind != 'url' or not entry.get('loc'):
+                continue
+            counts['total'] += 1
+            status, url = resolver.resolve(entry['loc'])
+            if url and url_key(url) in seen:
+                status, url = 'duplicate', None
+            counts[status] += 1
+            if status != 'keep' and len(counts['samples']) < SAMPLE_SIZE:
+                counts['samples'].append({'loc': entry['loc'], 'status': status, 'replacement': url})
+            if url:
+                seen.add(url_key(url))
+                writer.write(dict(entry, loc=url))
+        parts.extend(writer.close())
+        stats[os.path.basename(source)] = counts
+    index = write_sitemap_index(parts, output_dir, site_url)
+    return stats, parts, index
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate sitemaps and write corrected, split copies')
+    parser.add_argument('sitemaps', nargs='*', help='Sitemap files or a sitemap index (default: public/sitemap.xml)')
+    parser.add_argument('--redirects', action='append', help='Redirect map CSV(s) (default: redirects_map.csv if present)')
+    parser.add_argument('--permanent-redirects', help='permanent_redirects export (default: latest)')
+    parser.add_argument('--wrong-pages', help='wrong_pages_found_in_sitemap export (default: latest)')
+    parser.add_argument('--gone', help='Extra 410 list, one URL or path per line')
+    parser.add_argument('--site-url', default='https://siteoptz.ai')
+    parser.add_argument('--output-dir', default='sitemaps_corrected')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Validating Sitemaps for SiteOptz.ai")
+    print("=" * 60)
+
+    sources = expand_sources(args.sitemaps or ['public/sitemap.xml'])
+    print(f"\nSitemaps: {', '.join(sources)}")
+
+    redirect_files = args.redirects or [f for f in ['redirects_map.csv'] if os.path.exists(f)]
+    redirect_rows = []
+    for filename in redirect_files:
+        redirect_rows.extend(load_redirects(filename))
+    artifact = build_edge_artifact(parse_rules(redirect_rows, args.site_url)) if redirect_rows else None
+    gone_count = sum(1 for r in redirect_rows if r['action'] == '410')
+    print(f"Loaded {len(redirect_rows)} redirect map rules ({gone_count} gone)")
+
+    permanent_file = args.permanent_redirects or latest_export('siteoptz.ai_permanent_redirects_*.csv')
+    permanent = load_permanent_redirects(permanent_file) if permanent_file else {}
+    print(f"Loaded {len(permanent)} permanent redirects from {permanent_file or 'nowhere'}")
+
+    wrong_file = args.wrong_pages or latest_export('siteoptz.ai_wrong_pages_found_in_sitemap_*.csv')
+    wrong_pages = load_wrong_pages(wrong_file) if wrong_file else {}
+    print(f"Loaded {len(wrong_pages)} flagged sitemap URLs from {wrong_file or 'nowhere'}")
+
+    gone = load_gone_list(args.gone, args.site_url) if args.gone else set()
+
+    resolver = SitemapResolver(args.site_url, artifact, permanent, wrong_pages, gone)
+    stats, parts, index = validate_sitemaps(sources, resolver, args.output_dir, args.site_url)
+
+    with open(os.path.join(args.output_dir, 'sitemap_validation.json'), 'w') as f:
+        json.dump(stats, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    for name, counts in stats.items():
+        print(f"\n{name}: {counts['total']} URLs")
+        print(f"  • Kept: {counts['keep']}")
+        print(f"  • Replaced by redirect target: {counts['redirected']}")
+        print(f"  • Dropped (gone / flagged / external / duplicate): "
+              f"{counts['gone']} / {counts['flagged']} / {counts['external']} / {counts['duplicate']}")
+        for sample in counts['samples'][:3]:
+            replacement = f" → {sample['replacement']}" if sample['replacement'] else ''
+            print(f"    {sample['status']}: {sample['loc']}{replacement}")
+
+    index_note = f" and {os.path.basename(index)} index" if index else ""
+    print(f"\n✓ Wrote {len(parts)} sitemap files{index_note} to {args.output_dir}/")
+    print(f"✓ Saved {os.path.join(args.output_dir, 'sitemap_validation.json')}")
+
+if __name__ == '__main__':
+    main()